@@ -0,0 +1,94 @@
+"""Benchmark for rendering the DOCX news digest.
+
+Renders digests of synthetic articles through ``save_processsed_data`` and reports
+wall time and peak traced memory per size.
+
+Usage:
+    python -m benchmarks.bench_docx_render --sizes 100 1000 5000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from uuid import uuid4
+
+from src.utils.article import Article
+from src.utils.save_data import save_processsed_data
+
+CATEGORIES = ["Economy", "Business", "Politics", "Bangladesh", "International", "Others"]
+
+
+def generate_digest_data(n_articles: int) -> dict[str, list[Article]]:
+    """Generate category separated synthetic news data shaped like the pipeline output
+
+    Args:
+        n_articles (int): total number of articles across all categories
+
+    Returns:
+        dict[str, list[Article]]: the synthetic news data
+    """
+    data: dict[str, list[Article]] = {cat: [] for cat in CATEGORIES}
+    for i in range(n_articles):
+        category = CATEGORIES[i % len(CATEGORIES)]
+        article_id = str(uuid4())
+        summary_points = [f"প্রথম সারাংশ বাক্য {i}।", f"দ্বিতীয় সারাংশ বাক্য {i}।"]
+        data[category].append(
+            Article(
+                id=article_id,
+                title=f"সংবাদ শিরোনাম {i}",
+                body="\n".join(summary_points) * 10,
+                summary_points=summary_points,
+                published_at=str(datetime.now()),
+                fingerprint=article_id,
+                source="Benchmark",
+                source_url="https://www.example.com",
+                category=category,
+                scraped_at=str(datetime.now()).split(".")[0],
+                date=datetime.now().strftime("%B %d, %Y"),
+                language="Bangla",
+                url=f"https://www.example.com/news/{i}",
+            )
+        )
+    return data
+
+
+def bench_docx_render(sizes: list[int], template: str) -> list[dict[str, float | int]]:
+    results: list[dict[str, float | int]] = []
+    with tempfile.TemporaryDirectory() as save_location:
+        for size in sizes:
+            data = generate_digest_data(size)
+            tracemalloc.start()
+            start = time.perf_counter()
+            save_processsed_data(data=data, save_location=save_location, filename=f"digest_{size}.docx", template=template)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results.append(
+                {
+                    "articles": size,
+                    "seconds": round(elapsed, 4),
+                    "articles_per_second": round(size / elapsed, 2),
+                    "peak_memory_mb": round(peak / 1024 / 1024, 2),
+                    "file_size_kb": round(os.path.getsize(os.path.join(save_location, f"digest_{size}.docx")) / 1024, 2),
+                }
+            )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark DOCX digest rendering")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--template", default="./resources/newsdigest_template.docx")
+    parser.add_argument("--output", default=None, help="optional JSON file to write the results to")
+    args = parser.parse_args()
+
+    bench_results = bench_docx_render(sizes=args.sizes, template=args.template)
+    for result in bench_results:
+        print(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(bench_results, f, indent=2)
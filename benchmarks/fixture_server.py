@@ -0,0 +1,165 @@
+"""Offline fixture sites for the benchmark suite.
+
+Listing and article pages of every configured portal are generated from the site
+selectors in ``config/sites/*.yaml`` and saved under ``benchmarks/fixtures/<site>/``.
+They are served from a local HTTP server, so the scrapers can be benchmarked without
+touching the real portals.
+
+Usage:
+    python -m benchmarks.fixture_server --write   # regenerate fixtures after a selector change
+    python -m benchmarks.fixture_server --port 8765
+"""
+
+import argparse
+import html
+import os
+import re
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from omegaconf import OmegaConf
+
+from src.conf import ScraperSiteConfig
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+SITE_CONFIG_DIR = os.path.join(os.path.dirname(__file__), "..", "config", "sites")
+SITES = ["bonik_barta", "daily_star", "janakantha", "prothom_alo"]
+ARTICLES_PER_SITE = 20
+
+# Publishing datetime text as shown by each portal, in the shape its scraper parses
+DATETIME_TEXT = {
+    "bonik_barta": "প্রকাশ: রবিবার ৫ অক্টোবর ২০২৫, ১৫:০৯",
+    "daily_star": "শনিবার অক্টোবর ৪, ২০২৫ ০৬:১০ অপরাহ্ন",
+    "janakantha": "প্রকাশিত: ২৩:৫০, ৭ অক্টোবর ২০২৫; আপডেট: ০০:১০, ৮ অক্টোবর ২০২৫",
+    "prothom_alo": "প্রকাশ: ০৮ অক্টোবর ২০২৫, ০১: ৩৭",
+}
+
+# Selectors a scraper uses on listing pages besides ScraperSiteConfig.selectors.news_link_list
+EXTRA_LISTING_SELECTORS = {"janakantha": ["div.DCategoryPageTop div.DCatTopNews a"]}
+
+SELECTOR_TOKEN_RE = re.compile(r"^(?P<tag>[a-zA-Z0-9]+)(?P<rest>([.#][\w-]+)*)$")
+
+
+def load_site_config(site: str) -> ScraperSiteConfig:
+    return OmegaConf.load(os.path.join(SITE_CONFIG_DIR, f"{site}.yaml"))[site]  # type: ignore
+
+
+def _open_tag(token: str, extra_attrs: str = "") -> tuple[str, str]:
+    match = SELECTOR_TOKEN_RE.match(token)
+    if match is None:
+        raise ValueError(f"Unsupported selector token for fixtures: {token}")
+    tag, rest = match.group("tag"), match.group("rest")
+    classes = [part[1:] for part in re.findall(r"[.#][\w-]+", rest) if part.startswith(".")]
+    ids = [part[1:] for part in re.findall(r"[.#][\w-]+", rest) if part.startswith("#")]
+    attrs = ""
+    if classes:
+        attrs += f' class="{" ".join(classes)}"'
+    if ids:
+        attrs += f' id="{ids[0]}"'
+    return f"<{tag}{attrs}{extra_attrs}>", f"</{tag}>"
+
+
+def html_for_selector(selector: str, leaves: list[tuple[str, str]]) -> str:
+    """Build the nested HTML matched by a descendant CSS selector chain. The last
+    selector token is repeated once per leaf
+
+    Args:
+        selector (str): the descendant CSS selector (e.g. ``div.a div.b p``)
+        leaves (list[tuple[str, str]]): inner text and extra attributes of each leaf element
+
+    Returns:
+        str: the HTML fragment
+    """
+    *parents, leaf = selector.split()
+    inner = ""
+    for text, extra_attrs in leaves:
+        open_tag, close_tag = _open_tag(leaf, extra_attrs)
+        inner += f"{open_tag}{html.escape(text)}{close_tag}"
+    for token in reversed(parents):
+        open_tag, close_tag = _open_tag(token)
+        inner = f"{open_tag}{inner}{close_tag}"
+    return inner
+
+
+def _page(title: str, fragments: list[str]) -> str:
+    return (
+        f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{html.escape(title)}</title></head>\n<body>\n'
+        + "\n".join(fragments)
+        + "\n</body></html>\n"
+    )
+
+
+def build_fixture_pages(site: str, n_articles: int = ARTICLES_PER_SITE) -> dict[str, str]:
+    """Build the listing page and article pages of a portal
+
+    Args:
+        site (str): the site key (file name under config/sites)
+        n_articles (int, optional): number of article pages. Defaults to ARTICLES_PER_SITE.
+
+    Returns:
+        dict[str, str]: file name to page HTML
+    """
+    site_config = load_site_config(site)
+    selectors = site_config.selectors
+    links = [(f"খবরের শিরোনাম {i}", f' href="article_{i}.html"') for i in range(n_articles)]
+
+    listing = [html_for_selector(selectors.news_link_list, links)]
+    for selector in EXTRA_LISTING_SELECTORS.get(site, []):
+        listing.append(html_for_selector(selector, links[:1]))
+    pages = {"listing.html": _page(f"{site_config.name} listing", listing)}
+
+    for i in range(n_articles):
+        body = [(f"{site_config.name} এর প্রতিবেদন {i} এর অনুচ্ছেদ {p}। এটি দ্বিতীয় বাক্য। এটি তৃতীয় বাক্য।", "") for p in range(6)]
+        pages[f"article_{i}.html"] = _page(
+            f"article {i}",
+            [
+                html_for_selector(selectors.datetime, [(DATETIME_TEXT[site], "")]),
+                html_for_selector(selectors.title, [(f"খবরের শিরোনাম {i}", "")]),
+                html_for_selector(selectors.body, body),
+            ],
+        )
+    return pages
+
+
+def write_fixtures(n_articles: int = ARTICLES_PER_SITE) -> None:
+    for site in SITES:
+        site_dir = os.path.join(FIXTURE_DIR, site)
+        os.makedirs(site_dir, exist_ok=True)
+        for filename, page in build_fixture_pages(site, n_articles=n_articles).items():
+            with open(os.path.join(site_dir, filename), "w", encoding="utf-8") as f:
+                f.write(page)
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format: str, *args: object) -> None:
+        return
+
+
+def start_fixture_server(port: int = 0) -> ThreadingHTTPServer:
+    """Serve the saved fixtures on localhost from a daemon thread
+
+    Args:
+        port (int, optional): the port to listen on. 0 picks a free port. Defaults to 0.
+
+    Returns:
+        ThreadingHTTPServer: the running server. Pages are at ``http://127.0.0.1:<port>/<site>/<file>``
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), partial(_QuietHandler, directory=FIXTURE_DIR))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate or serve the offline benchmark fixture sites")
+    parser.add_argument("--write", action="store_true", help="regenerate the saved fixtures from the site selectors")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    if args.write:
+        write_fixtures()
+        print(f"Fixtures written to {FIXTURE_DIR}")
+    else:
+        fixture_server = start_fixture_server(port=args.port)
+        print(f"Serving fixtures at http://127.0.0.1:{fixture_server.server_port}/<site>/listing.html")
+        threading.Event().wait()
@@ -0,0 +1,291 @@
+"""Offline end-to-end benchmark suite.
+
+Runs every stage of the digest against the saved fixture sites (see ``fixture_server``)
+and writes per-stage latency, throughput and peak memory to a JSON file, so regressions
+can be compared between commits.
+
+Stages: discovery, feed_discovery, extraction, date_parsing, fingerprint, dedup, db_insert, docx_render, article_records.
+Discovery and extraction drive a real (headless) browser; dedup loads the translation
+and similarity models.
+
+Usage:
+    python -m benchmarks.run_benchmarks --output benchmark_results.json
+    python -m benchmarks.run_benchmarks --stages date_parsing fingerprint db_insert docx_render
+"""
+
+import argparse
+import json
+import logging
+import platform
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable
+
+from benchmarks.bench_docx_render import generate_digest_data
+from benchmarks.fixture_server import (
+    ARTICLES_PER_SITE,
+    DATETIME_TEXT,
+    SITES,
+    load_site_config,
+    start_fixture_server,
+)
+
+STAGES = ["discovery", "feed_discovery", "extraction", "date_parsing", "fingerprint", "dedup", "db_insert", "docx_render", "article_records"]
+
+# Datetime text fed to each portal's parser, after the scraper's own splitting
+PARSED_DATETIME_TEXT = {
+    "bonik_barta": (DATETIME_TEXT["bonik_barta"].split(": ")[1], "%A %d %B %Y, %H:%M"),
+    "daily_star": (DATETIME_TEXT["daily_star"].split("\n")[0], "%A %B %d, %Y %I:%M %p"),
+    "janakantha": (DATETIME_TEXT["janakantha"].split("; ")[0].split(": ")[1], "%H:%M, %d %B %Y"),
+    "prothom_alo": (": ".join(DATETIME_TEXT["prothom_alo"].split(": ")[1:]), "%d %B %Y, %H: %M"),
+}
+
+logger = logging.getLogger(__name__)
+
+
+def measure_stage(stage: str, n_items: int, func: Callable[[], Any]) -> dict[str, Any]:
+    """Run a stage once and measure it
+
+    Args:
+        stage (str): the stage name
+        n_items (int): number of items processed by the stage, for throughput
+        func (Callable[[], Any]): the stage body
+
+    Returns:
+        dict[str, Any]: latency, throughput and peak traced memory of the stage
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result = {
+        "stage": stage,
+        "items": n_items,
+        "seconds": round(elapsed, 4),
+        "ms_per_item": round(elapsed * 1000 / n_items, 3) if n_items else None,
+        "items_per_second": round(n_items / elapsed, 2) if elapsed else None,
+        "peak_memory_mb": round(peak / 1024 / 1024, 2),
+    }
+    logger.info(result)
+    return result
+
+
+def _synthetic_articles(n_articles: int) -> list[dict[str, str | list[str]]]:
+    # the raw data records of the synthetic articles
+    return [article.to_dict() for digest_articles in generate_digest_data(n_articles).values() for article in digest_articles]
+
+
+def bench_browser_stages(stages: list[str], driver_name: str, server_url: str) -> list[dict[str, Any]]:
+    from src.conf import WebDriverConfig
+    from src.news_scrapers import ScraperEnum
+    from src.pipelines import extract_from_single_news_link
+    from src.webdriver_bridge import WebDriverAdapter, load_webdriver
+
+    results: list[dict[str, Any]] = []
+    driver = load_webdriver(
+        driver_config=WebDriverConfig(driver_name=driver_name, options={"headless": True, "no-sandbox": True, "disable-dev-shm-usage": True})
+    )
+    adapter = WebDriverAdapter(driver=driver)
+    try:
+        for site in SITES:
+            scraper = ScraperEnum[site].value.class_obj(driver_adapter=adapter, logger=logger, site_config=load_site_config(site))
+            news_links: list[str] = []
+
+            def discover() -> None:
+                scraper.get_url(f"{server_url}/{site}/listing.html")
+                news_links.extend(scraper.extract_news_links())
+
+            discovery = measure_stage(f"discovery[{site}]", 1, discover)
+            if "discovery" in stages:
+                results.append(discovery)
+            if "extraction" in stages:
+                results.append(
+                    measure_stage(
+                        f"extraction[{site}]",
+                        len(news_links),
+                        lambda: [extract_from_single_news_link(scraper=scraper, news_link=news_link) for news_link in news_links],
+                    )
+                )
+    finally:
+        adapter.quit()
+    return results
+
+
+def run_benchmarks(stages: list[str], n_articles: int, driver_name: str) -> dict[str, Any]:
+    from src.utils import (
+        bangla_to_english_datetime_parsing,
+        compute_news_article_fingerprint,
+    )
+
+    results: list[dict[str, Any]] = []
+    server = start_fixture_server()
+    try:
+        if {"discovery", "extraction"} & set(stages):
+            results.extend(bench_browser_stages(stages, driver_name, f"http://127.0.0.1:{server.server_port}"))
+    finally:
+        server.shutdown()
+
+    articles = _synthetic_articles(n_articles)
+
+    if "feed_discovery" in stages:
+        results.append(bench_feed_discovery(articles))
+
+    if "date_parsing" in stages:
+        date_texts = [PARSED_DATETIME_TEXT[SITES[i % len(SITES)]] for i in range(n_articles)]
+        results.append(
+            measure_stage(
+                "date_parsing",
+                len(date_texts),
+                lambda: [datetime.strptime(bangla_to_english_datetime_parsing(text), fmt) for text, fmt in date_texts],
+            )
+        )
+
+    if "fingerprint" in stages:
+        results.append(
+            measure_stage(
+                "fingerprint",
+                len(articles),
+                lambda: [compute_news_article_fingerprint(str(article["title"]), str(article["body"])) for article in articles],
+            )
+        )
+
+    if "dedup" in stages:
+        from src.utils import find_similar_sentences, get_translation
+
+        sample = articles[: min(len(articles), 200)]
+        results.append(
+            measure_stage(
+                "dedup",
+                len(sample),
+                lambda: find_similar_sentences(
+                    {str(article["id"]): "। ".join(get_translation([str(article["title"])] + list(article["summary_points"]))) for article in sample}
+                ),
+            )
+        )
+
+    if "db_insert" in stages:
+        results.append(bench_db_insert(articles))
+
+    if "docx_render" in stages:
+        from src.utils import save_processsed_data
+
+        data = generate_digest_data(n_articles)
+        with tempfile.TemporaryDirectory() as save_location:
+            results.append(
+                measure_stage(
+                    "docx_render",
+                    n_articles,
+                    lambda: save_processsed_data(
+                        data=data, save_location=save_location, filename="digest.docx", template="./resources/newsdigest_template.docx"
+                    ),
+                )
+            )
+
+    if "article_records" in stages:
+        results.extend(bench_article_records(articles))
+
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "articles": n_articles,
+        "fixture_articles_per_site": ARTICLES_PER_SITE,
+        "results": results,
+    }
+
+
+def bench_feed_discovery(articles: list[dict[str, str | list[str]]]) -> dict[str, Any]:
+    """Parse an RSS feed of the synthetic articles and map its entries to categories (the feed counterpart of discovery)"""
+    import io
+
+    # escape only builds the synthetic feed; the stdlib XML parsers are not used here
+    from xml.sax.saxutils import escape  # nosec B406
+
+    from src.news_scrapers.feed_discovery import map_category, parse_feed
+
+    url_list = {str(article["category"]): f"https://example.com/{article['category']}" for article in articles}
+    items = "".join(
+        f"<item><title>{escape(str(article['title']))}</title><link>https://example.com/{article['category']}/{article['id']}</link>"
+        f"<pubDate>Mon, 06 Oct 2025 10:00:00 +0600</pubDate></item>"
+        for article in articles
+    )
+    feed = f'<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel>{items}</channel></rss>'.encode("utf-8")
+    return measure_stage("feed_discovery", len(articles), lambda: [map_category(entry, url_list) for entry in parse_feed(io.BytesIO(feed))])
+
+
+def bench_article_records(articles: list[dict[str, str | list[str]]]) -> list[dict[str, Any]]:
+    """Load the raw data records as dicts and as Article records (peak memory holds the whole list),
+    then serialize them back, as main does with the raw data of every site"""
+    from src.utils import Article
+
+    lines = [json.dumps(article, ensure_ascii=False) for article in articles]
+    records: dict[str, list[Any]] = {}
+
+    def load(record_type: str) -> None:
+        if record_type == "dict":
+            records[record_type] = [json.loads(line) for line in lines]
+        else:
+            records[record_type] = [Article.from_dict(json.loads(line)) for line in lines]
+
+    results = []
+    for record_type in ("dict", "Article"):
+        results.append(measure_stage(f"article_records[{record_type}].load", len(lines), partial(load, record_type)))
+        records.clear()
+    dicts = [json.loads(line) for line in lines]
+    results.append(measure_stage("article_records[dict].dump", len(dicts), lambda: [json.dumps(d, ensure_ascii=False) for d in dicts]))
+    article_records = [Article.from_dict(d) for d in dicts]
+    results.append(
+        measure_stage(
+            "article_records[Article].dump", len(article_records), lambda: [json.dumps(a.to_dict(), ensure_ascii=False) for a in article_records]
+        )
+    )
+    return results
+
+
+def bench_db_insert(articles: list[dict[str, str | list[str]]]) -> dict[str, Any]:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from src.db import NewsArticle, ensure_tables, insert_articles_batch
+
+    columns = set(NewsArticle.__table__.columns.keys())
+    rows = [
+        {
+            **{key: value for key, value in article.items() if key in columns},
+            "published_at": datetime.fromisoformat(str(article["published_at"])),
+            "scraped_at": datetime.fromisoformat(str(article["scraped_at"])),
+        }
+        for article in articles
+    ]
+    engine = create_engine("sqlite://")
+    ensure_tables(engine)
+
+    def insert() -> None:
+        with Session(engine) as session:
+            insert_articles_batch(session, rows)
+            session.commit()
+
+    try:
+        return measure_stage("db_insert", len(rows), insert)
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark suite")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--articles", type=int, default=1000, help="number of synthetic articles for the offline stages")
+    parser.add_argument("--driver", default="chrome", choices=["chrome", "firefox"])
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    report = run_benchmarks(stages=args.stages, n_articles=args.articles, driver_name=args.driver)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Benchmark results written to {args.output}")
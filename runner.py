@@ -1,32 +1,64 @@
-import json
 import os
+import smtplib
 import time
-from datetime import date
+from contextlib import ExitStack
+from datetime import date, datetime, timedelta
 from logging import getLogger
-from typing import Optional, cast
+from typing import Any, Iterator, Optional, cast
 
 import hydra
-from celery import group
-from celery.result import AsyncResult
+from celery import Task, group
+from celery.result import GroupResult
+from celery.schedules import crontab
 from dotenv import load_dotenv
+from hydra.core.hydra_config import HydraConfig
 from omegaconf import OmegaConf
 
-from src.celery_app import generate_celery_app
-from src.conf import ProjectConfig, ScraperSiteConfig, WebDriverConfig
-from src.db import ensure_tables, get_engine, save_scraped_items
+from src.celery_app import generate_celery_app, get_config
+from src.conf import (
+    DBConfig,
+    EmailConfig,
+    InterceptionConfig,
+    PageLoadConfig,
+    ProjectConfig,
+    ScraperSiteConfig,
+    WebDriverConfig,
+)
+from src.db import (
+    BatchedArticleWriter,
+    ensure_tables,
+    get_articles_scraped_since,
+    get_engine,
+    get_scraped_urls_since,
+    set_articles_in_digest,
+)
 from src.news_scrapers import BaseScraper, ScraperEnum
 from src.pipelines import (
+    article_from_db_row,
     data_extraction_pipeline,
-    remove_similar_news,
     separate_into_categories,
     sort_by_timestamp,
 )
 from src.utils import (
-    find_similar_sentences,
+    Article,
+    DigestState,
+    ListingValidatorCache,
+    RawDataWriter,
+    build_email_message,
+    configure_profiling,
+    configure_tracing,
     get_translation,
+    load_config_snapshot,
+    metrics,
+    new_run_id,
+    profile_stage,
+    push_metrics,
+    read_raw_data,
+    save_config_snapshot,
     save_processsed_data,
-    save_raw_data,
-    send_email,
+    send_emails,
+    span,
+    tracing,
 )
 from src.webdriver_bridge import WebDriverAdapter, load_webdriver
 
@@ -34,20 +66,120 @@ app = generate_celery_app()
 
 
 @app.task(name="run_pipeline_and_queue_data", queue="default")
-def run_pipeline_and_queue_data(
+def run_pipeline_and_queue_data(site: str, snapshot_id: str, task_store: str) -> dict[str, Any]:
+    """Scrapes a news portal. The task carries the site and the id of the run's config snapshot only, and
+    returns a reference to the raw data it streamed instead of the articles themselves
+
+    Args:
+        site (str): the news portal (ScraperEnum name)
+        snapshot_id (str): the config snapshot of the run (see save_run_snapshot)
+        task_store (str): the folder of the config snapshots
+
+    Returns:
+        dict[str, Any]: the raw data reference (raw_location, filename, first_part) and the number of articles
+    """
+    snapshot = load_config_snapshot(store_location=task_store, snapshot_id=snapshot_id)
+    site_config = _site_config(snapshot=snapshot, site=site)
+    db_config_name = snapshot["db_config_name"]
+    db_config = cast(DBConfig, get_config(location="../config/runtime/db", config_name=db_config_name)) if db_config_name else None
+    configure_profiling(profiling_config=snapshot["profiling"])
+    with profile_stage("run_pipeline_and_queue_data", tag=site_config.name):
+        raw_reference = _run_pipeline(
+            scraper_object=ScraperEnum[site].value.class_obj,
+            driver_config=snapshot["webdriver"],
+            site_config=site_config,
+            vault_location=snapshot["vault"],
+            max_retries=snapshot["max_retries"],
+            raw_location=snapshot["raw_location"],
+            raw_writer_config=snapshot["raw_writer"],
+            skip_links=snapshot["skip_links"].get(site, []),
+            validator_location=snapshot["validator_location"],
+            db_config=db_config,
+            db_writer_config=snapshot["db_writer"],
+        )
+    return raw_reference
+
+
+def save_run_snapshot(
+    cfg: ProjectConfig, profiling_config: dict, validator_location: str, skip_links: dict[str, list[str]], db_config_name: str
+) -> str:
+    """Saves the config the site tasks of a run need as a snapshot in resource.task_store
+
+    Args:
+        cfg (ProjectConfig): the project config
+        profiling_config (dict): the resolved profiling config
+        validator_location (str): the listing validator folder, empty to disable change detection
+        skip_links (dict[str, list[str]]): news links not to scrape again, per site
+        db_config_name (str): name of the db config the workers write the articles to as they scrape them
+        (resolved on the worker, like in crawl_site). Empty does not write them to the DB
+
+    Returns:
+        str: the snapshot id
+    """
+    return save_config_snapshot(
+        store_location=cfg.resource.task_store,
+        snapshot={
+            "webdriver": OmegaConf.to_container(cfg.webdriver, resolve=True),
+            "sites": OmegaConf.to_container(cast(Any, cfg.sites), resolve=True),
+            "vault": cfg.resource.vault,
+            "max_retries": cfg.max_retries,
+            "raw_location": cfg.output_location.raw,
+            "raw_writer": OmegaConf.to_container(cfg.raw_writer, resolve=True),
+            "profiling": profiling_config,
+            "validator_location": validator_location,
+            "skip_links": skip_links,
+            "db_config_name": db_config_name,
+            "db_writer": OmegaConf.to_container(cfg.db_writer, resolve=True),
+        },
+    )
+
+
+def _site_config(snapshot: dict[str, Any], site: str) -> ScraperSiteConfig:
+    site_config = OmegaConf.create(snapshot["sites"][site])
+    # Like in the Hydra config, optional keys a site does not set read as missing (getattr(..., None))
+    OmegaConf.set_struct(site_config, True)
+    return cast(ScraperSiteConfig, site_config)
+
+
+def _config_dict(config: Any, key: str) -> dict[str, Any]:
+    # an optional nested block of a Hydra config, as the keyword arguments of its dataclass
+    return cast(dict[str, Any], OmegaConf.to_container(getattr(config, key), resolve=True))
+
+
+def _run_pipeline(
     scraper_object: type[BaseScraper],
     driver_config: dict,
     site_config: ScraperSiteConfig,
     vault_location: str,
     max_retries: int,
-) -> list[dict[str, str | list[str]]]:
+    raw_location: str,
+    raw_writer_config: dict,
+    skip_links: list[str],
+    validator_location: str,
+    db_config: Optional[DBConfig] = None,
+    db_writer_config: Optional[dict] = None,
+) -> dict[str, Any]:
     logger = getLogger(__name__)
+    started_at = time.perf_counter()
 
     # Load webdriver and adapter
-    driver = load_webdriver(driver_config=WebDriverConfig(**driver_config))
-    logger.info("Web Driver Loaded")
+    interception = InterceptionConfig(**_config_dict(site_config, "interception")) if getattr(site_config, "interception", None) else None
+    page_load = PageLoadConfig(**_config_dict(site_config, "page_load")) if getattr(site_config, "page_load", None) else PageLoadConfig()
+    with span("webdriver.load", site=site_config.name):
+        driver = load_webdriver(
+            driver_config=WebDriverConfig(**driver_config), site_name=site_config.name, interception=interception, page_load=page_load
+        )
+    logger.info(f"Web Driver Loaded in {time.perf_counter() - started_at:.2f} seconds")
 
-    driver_adapter = WebDriverAdapter(driver=driver)
+    driver_adapter = WebDriverAdapter(
+        driver=driver,
+        site_name=site_config.name,
+        started_at=started_at,
+        track_traffic=bool(interception and interception.track_traffic),
+        ready_timeout=page_load.ready_timeout if page_load.strategy == "none" else None,
+        max_tabs=page_load.tabs,
+        interception=interception,
+    )
     logger.info("Web Driver Adapter Created")
 
     scraper = scraper_object(driver_adapter=driver_adapter, logger=logger, site_config=site_config)
@@ -55,13 +187,342 @@ def run_pipeline_and_queue_data(
     logger.info(f"{scraper.site_config.name} scraper loaded")
     logger.info("Running extraction...")
 
-    try:
-        compiled_data = data_extraction_pipeline(scraper=scraper, vault_location=vault_location, max_retries=max_retries)
-    finally:
+    # Every article is appended to the raw data sink as soon as it is compiled and is not kept in memory,
+    # so a crash late in the run does not lose the articles scraped before it
+    raw_writer = RawDataWriter(
+        save_location=raw_location, filename=f"{scraper.site_config.name.lower().replace(' ', '_')}.jsonl", **raw_writer_config
+    )
+    # Listing validators are only used in incremental mode, where skipped categories are already in today's digest
+    validator_cache = ListingValidatorCache(cache_location=validator_location, site_name=scraper.site_config.name) if validator_location else None
+    # The articles are also upserted into the DB in the background as they are scraped
+    db_writer = BatchedArticleWriter(database_config=db_config, name=scraper.site_config.name, **(db_writer_config or {})) if db_config else None
+
+    def on_article(article: Article) -> None:
+        raw_writer.write(article.to_dict())
+        if db_writer is not None:
+            db_writer.write(article)
+
+    def close_raw_writer() -> None:
+        raw_writer.close()
+        logger.info(f"{raw_writer.records_written} raw news data of {scraper.site_config.name} streamed to {raw_location}")
+
+    def close_db_writer() -> None:
+        with metrics.observe_stage("db_save"), span("db_save", site=scraper.site_config.name):
+            cast(BatchedArticleWriter, db_writer).close()
+
+    def quit_driver() -> None:
         driver_adapter.quit()
         logger.info(f"Web driver of {scraper.site_config.name} has gracefully quitted")
 
-    return compiled_data
+    # The cleanups run in reverse order of registration, each of them even if one before it raised
+    with ExitStack() as cleanup:
+        cleanup.callback(quit_driver)
+        if db_writer is not None:
+            cleanup.callback(close_db_writer)
+        cleanup.callback(close_raw_writer)
+        data_extraction_pipeline(
+            scraper=scraper,
+            vault_location=vault_location,
+            max_retries=max_retries,
+            on_article=on_article,
+            skip_links=set(skip_links),
+            validator_cache=validator_cache,
+        )
+
+    raw_reference = {
+        "raw_location": raw_location,
+        "filename": raw_writer.stem,
+        "first_part": raw_writer.first_part,
+        "articles": raw_writer.records_written,
+        "db_inserted": db_writer.rows_inserted if db_writer is not None else 0,
+    }
+    return raw_reference
+
+
+@app.task(name="send_digest_email", queue="default", bind=True)
+def send_digest_email(
+    self: Task,
+    email_config_name: str,
+    email_subject: str,
+    email_body: str,
+    attachment_path: str,
+    delivered_groups: Optional[list[int]] = None,
+) -> None:
+    """Deliver the digest in the background. Transient SMTP failures are retried with exponential
+    backoff; every recipient group is sent over the same SMTP connection. A retry only sends to the
+    recipient groups the failed attempt did not reach, so nobody gets the digest twice.
+
+    Args:
+        email_config_name (str): name of the email config under config/runtime/email (e.g. smtp_prod).
+        The config (and SMTP credentials) are resolved on the worker instead of travelling through the broker
+        email_subject (str): the email subject
+        email_body (str): the plain text email body
+        attachment_path (str): the digest document to attach
+        delivered_groups (Optional[list[int]], optional): recipient groups delivered by the previous attempts. Defaults to None.
+    """
+    logger = getLogger(__name__)
+    email_cfg = cast(EmailConfig, get_config(location="../config/runtime/email", config_name=email_config_name))
+
+    to_addr = [addr for addr in email_cfg.to_addr if addr]
+    cc_addr = [addr for addr in email_cfg.cc_addr if addr]
+    messages = [
+        (
+            build_email_message(email_subject, email_body, email_cfg.from_addr, to_addr=to_addr, cc_addr=cc_addr, attachment_path=attachment_path),
+            to_addr + cc_addr,
+        )
+    ]
+    for bcc_group in email_cfg.bcc_groups:
+        messages.append(
+            (build_email_message(email_subject, email_body, email_cfg.from_addr, to_addr=to_addr, attachment_path=attachment_path), bcc_group)
+        )
+
+    delivered = set(delivered_groups or [])
+    try:
+        with span("smtp.send", recipient_groups=len(messages) - len(delivered)):
+            send_emails(
+                smtp_config={"host": email_cfg.host, "port": email_cfg.port, "user": email_cfg.username, "password": email_cfg.password},
+                messages=messages,
+                starttls=email_cfg.starttls,
+                delivered=delivered,
+            )
+    except (smtplib.SMTPException, OSError) as e:
+        # 5xx replies are permanent (bad recipient, rejected message); retrying will not help
+        if isinstance(e, smtplib.SMTPResponseException) and e.smtp_code >= 500:
+            raise
+        countdown = min(email_cfg.retry.backoff_base * 2**self.request.retries, email_cfg.retry.backoff_max)
+        logger.warning(
+            f"Sending digest email failed after {len(delivered)} of {len(messages)} recipient group(s): {e}. "
+            f"Retrying the rest in {countdown} seconds (attempt {self.request.retries + 1})"
+        )
+        raise self.retry(
+            exc=e,
+            countdown=countdown,
+            max_retries=email_cfg.retry.max_retries,
+            kwargs={**(self.request.kwargs or {}), "delivered_groups": sorted(delivered)},
+        )
+    logger.info(f"Digest email sent to {len(messages)} recipient group(s)")
+
+
+@app.task(name="crawl_site", queue="default")
+def crawl_site(site: str, snapshot_id: str, task_store: str, db_config_name: str, lookback_hours: int) -> int:
+    """Continuous mode crawl of a site, sent by celery beat every few minutes. Only the links not saved
+    in the last lookback_hours are scraped, and the new articles are written to the DB as they are scraped.
+
+    Args:
+        site (str): the news portal (ScraperEnum name)
+        snapshot_id (str): the config snapshot of continuous mode (see save_run_snapshot)
+        task_store (str): the folder of the config snapshots
+        db_config_name (str): name of the db config under config/runtime/db (e.g. db_prod). Like the email config,
+        it is resolved on the worker, so the DB credentials do not travel through the broker
+        lookback_hours (int): links saved in this many hours are not scraped again
+
+    Returns:
+        int: the number of articles saved
+    """
+    logger = getLogger(__name__)
+    snapshot = load_config_snapshot(store_location=task_store, snapshot_id=snapshot_id)
+    site_config = _site_config(snapshot=snapshot, site=site)
+    db_config = cast(DBConfig, get_config(location="../config/runtime/db", config_name=db_config_name))
+    skip_links = get_scraped_urls_since(database_config=db_config, since=datetime.now() - timedelta(hours=lookback_hours), source=site_config.name)
+    logger.info(f"{len(skip_links)} news links of {site_config.name} already saved in the last {lookback_hours} hours")
+
+    configure_profiling(profiling_config=snapshot["profiling"])
+    with profile_stage("crawl_site", tag=site_config.name):
+        raw_reference = _run_pipeline(
+            scraper_object=ScraperEnum[site].value.class_obj,
+            driver_config=snapshot["webdriver"],
+            site_config=site_config,
+            vault_location=snapshot["vault"],
+            max_retries=snapshot["max_retries"],
+            raw_location=snapshot["raw_location"],
+            raw_writer_config=snapshot["raw_writer"],
+            skip_links=list(skip_links),
+            validator_location=snapshot["validator_location"],
+            db_config=db_config,
+            db_writer_config=snapshot["db_writer"],
+        )
+    db_inserted = int(raw_reference["db_inserted"])
+    logger.info(f"{db_inserted} new articles of {site_config.name} saved to the DB")
+    return db_inserted
+
+
+@app.task(name="compile_digest", queue="default")
+def compile_digest(db_config_name: str, email_config_name: str, processed_location: str, template: str, lookback_hours: int) -> int:
+    """Continuous mode digest, sent by celery beat at the digest time. The digest is compiled from the
+    articles the crawls saved to the DB, so nothing is scraped here.
+
+    Args:
+        db_config_name (str): name of the db config under config/runtime/db (e.g. db_prod)
+        email_config_name (str): name of the email config under config/runtime/email. Empty does not send the digest
+        processed_location (str): the folder where the digest document is saved
+        template (str): .DOCX template filepath to use for compiling news data
+        lookback_hours (int): the digest covers the articles saved in this many hours
+
+    Returns:
+        int: the number of news in the digest
+    """
+    logger = getLogger(__name__)
+    start_time = time.time()
+    since = datetime.now() - timedelta(hours=lookback_hours)
+    db_config = cast(DBConfig, get_config(location="../config/runtime/db", config_name=db_config_name))
+    with span("digest.load", lookback_hours=lookback_hours):
+        compiled_data = [article_from_db_row(row) for row in get_articles_scraped_since(database_config=db_config, since=since)]
+    logger.info(f"{len(compiled_data)} news saved since {since:%Y-%m-%d %H:%M} loaded from the DB")
+    if not compiled_data:
+        logger.warning("No news saved for the digest period. The digest is not compiled")
+        return 0
+
+    # The crawls ran on independent workers, so the articles they saved are clustered here, in the order they were scraped
+    digest = DigestState(state_location=processed_location, digest_date=date.today())
+    compiled_data.sort(key=lambda news: news.scraped_at)
+    with metrics.observe_stage("dedup"), profile_stage("dedup"), span("dedup", articles=len(compiled_data)):
+        compiled_data = digest.add_articles(news_list=compiled_data, sentence_dict=similarity_sentences(compiled_data))
+    logger.info(f"Removed similar news. {len(compiled_data)} best valid news found")
+
+    digest_path = compile_digest_document(digest_data=compiled_data, processed_location=processed_location, template=template)
+    set_articles_in_digest(database_config=db_config, urls=[news.url for news in compiled_data])
+    if email_config_name:
+        queue_digest_email(email_config_name=email_config_name, start_time=start_time, news_count=len(compiled_data), attachment_path=digest_path)
+    else:
+        logger.warning("Email not sent to intended users.")
+    return len(compiled_data)
+
+
+def similarity_sentences(news_list: list[Article]) -> dict[str, str]:
+    """The translated text each news is deduplicated by: its title and the sentences of its first summary point,
+    segmented when the article was compiled
+
+    Args:
+        news_list (list[Article]): the news
+
+    Returns:
+        dict[str, str]: news id to its translated text
+    """
+    return {news.id: "। ".join(get_translation([news.title, *news.lead_sentences])) for news in news_list}
+
+
+def iter_completed(group_result: GroupResult, interval: float = 1.0) -> Iterator[Any]:
+    """Yields the result of each task of a group as soon as it finishes, in the order they finish
+
+    Args:
+        group_result (GroupResult): the running group
+        interval (float, optional): seconds between polls of the unfinished tasks. Defaults to 1.0.
+
+    Yields:
+        Iterator[Any]: the task results. A failed task raises its exception
+    """
+    pending = list(group_result.results or [])
+    while pending:
+        finished = [result for result in pending if result.ready()]
+        for result in finished:
+            pending.remove(result)
+            yield result.get(propagate=True)
+        if pending and not finished:
+            time.sleep(interval)
+
+
+def compile_digest_document(digest_data: list[Article], processed_location: str, template: str) -> str:
+    """Separates the deduplicated news into categories and renders the digest document
+
+    Args:
+        digest_data (list[Article]): the news of the digest, one per story
+        processed_location (str): the folder where the digest document is saved
+        template (str): .DOCX template filepath to use for compiling news data
+
+    Returns:
+        str: the document path
+    """
+    logger = getLogger(__name__)
+    cat_separated_data = separate_into_categories(compiled_data=digest_data)
+    logger.info("News data separated into categories")
+
+    cat_separated_data = sort_by_timestamp(cat_separated_data=cat_separated_data)
+    logger.info("News data separated into categories")
+
+    filename = f"Bangla News Digest {date.today().strftime('%B %d, %Y')}.docx"
+    with metrics.observe_stage("render"), profile_stage("render"), span("render"):
+        save_processsed_data(data=cat_separated_data, save_location=processed_location, filename=filename, template=template)
+    logger.info(f"Processed Data saved at {processed_location}")
+    return os.path.abspath(os.path.join(processed_location, filename))
+
+
+def queue_digest_email(email_config_name: str, start_time: float, news_count: int, attachment_path: str) -> None:
+    """Queues the digest email for delivery by the send_digest_email task
+
+    Args:
+        email_config_name (str): name of the email config under config/runtime/email (e.g. smtp_prod)
+        start_time (float): when the run started (time.time()), for the time taken in the email body
+        news_count (int): the number of news in the digest
+        attachment_path (str): the digest document to attach
+    """
+    email_task = app.signature(
+        "send_digest_email",
+        kwargs={
+            "email_config_name": email_config_name,
+            "email_subject": "Today's Bangla News Digest",
+            "email_body": "\n".join(
+                [
+                    "Assalamu alaikum,",
+                    "Here is today's Bangla News Digest.",
+                    f"Time taken for the entire project: {round((time.time() - start_time) / 60, 2)} minutes in total",
+                    f"Total valid news scraped: {news_count}",
+                ]
+            ),
+            "attachment_path": attachment_path,
+        },
+    ).apply_async()
+    getLogger(__name__).info(f"Digest email queued for delivery. Task id: {email_task.id}")
+
+
+def run_continuous(cfg: ProjectConfig, profiling_config: dict) -> None:
+    """Continuous mode. Celery beat sends a crawl_site task for every site each crawl_interval_minutes
+    and the compile_digest task at digest_time. The workers do the work; this blocks until interrupted.
+
+    Args:
+        cfg (ProjectConfig): the project config
+        profiling_config (dict): the resolved profiling config
+    """
+    logger = getLogger(__name__)
+    choices = HydraConfig.get().runtime.choices
+    interval = cfg.continuous.crawl_interval_minutes * 60
+    hour, minute = (int(part) for part in cfg.continuous.digest_time.split(":"))
+    snapshot_id = save_run_snapshot(
+        cfg=cfg,
+        profiling_config=profiling_config,
+        validator_location=cfg.resource.listing_validators if cfg.change_detection else "",
+        skip_links={},
+        db_config_name=choices["runtime/db"],
+    )
+
+    beat_schedule: dict[str, dict[str, Any]] = {
+        f"crawl_{scraper.value.scraper_name}": {
+            "task": "crawl_site",
+            "schedule": interval,
+            "args": [scraper.value.scraper_name, snapshot_id, cfg.resource.task_store, choices["runtime/db"], cfg.continuous.lookback_hours],
+            # A crawl still queued when the next one of the site is due is dropped instead of piling up
+            "options": {"expires": interval},
+        }
+        for scraper in ScraperEnum
+    }
+    beat_schedule["compile_digest"] = {
+        "task": "compile_digest",
+        "schedule": crontab(hour=hour, minute=minute),
+        "kwargs": {
+            "db_config_name": choices["runtime/db"],
+            "email_config_name": choices["runtime/email"] if cfg.runtime.email_send else "",
+            "processed_location": os.path.abspath(cfg.output_location.processed),
+            "template": os.path.abspath(cfg.resource.news_digest_template),
+            "lookback_hours": cfg.continuous.lookback_hours,
+        },
+    }
+    app.conf.beat_schedule = beat_schedule
+
+    os.makedirs(os.path.dirname(cfg.continuous.schedule_file) or ".", exist_ok=True)
+    logger.info(
+        f"Continuous mode: crawling {len(ScraperEnum)} sites every {cfg.continuous.crawl_interval_minutes} minutes, "
+        f"digest compiled daily at {cfg.continuous.digest_time}"
+    )
+    app.Beat(schedule=cfg.continuous.schedule_file, loglevel="INFO", redirect_stdouts=False).run()
 
 
 @hydra.main(version_base=None, config_path="./config", config_name="default")
@@ -76,122 +537,118 @@ def main(cfg: ProjectConfig) -> None:
     # Environment Variables Initilization
     load_dotenv()
 
+    # Profiling is off unless enabled in the config or through BND_PROFILE. Workers get the same settings with their tasks
+    profiling_config = cast(dict, OmegaConf.to_container(cfg.profiling, resolve=True))
+    configure_profiling(profiling_config=profiling_config)
+
+    # Every span of this run, including the ones recorded by the workers, belongs to the trace of this run id
+    configure_tracing(tracing_config=cast(dict, OmegaConf.to_container(cfg.tracing, resolve=True)))
+
     # Database Inialization
     ensure_tables(get_engine(cfg.runtime.db))
     logger.info("Database connection established. Ensured that, news_article table exists in database")
 
+    if cfg.mode == "continuous":
+        # The crawls write to the DB as they go and the digest is compiled from it, so the DB is always used
+        run_continuous(cfg=cfg, profiling_config=profiling_config)
+        return
+
+    run_id = new_run_id()
+    tracing.attach(trace_id=run_id)
+    run_span = tracing.start_span("digest_run", run_id=run_id, incremental=cfg.incremental)
+    logger.info(f"Run id: {run_id}")
+
+    # In incremental mode, news already in today's digest are neither scraped nor processed again
+    digest_state = DigestState.load(state_location=cfg.resource.digest_state, digest_date=date.today()) if cfg.incremental else None
+    # Otherwise the run's news are clustered in a state of this run only, which is never saved
+    digest = digest_state or DigestState(state_location=cfg.resource.digest_state, digest_date=date.today())
+
+    # The tasks only carry the site and the id of this run's config snapshot
+    snapshot_id = save_run_snapshot(
+        cfg=cfg,
+        profiling_config=profiling_config,
+        validator_location=cfg.resource.listing_validators if cfg.incremental and cfg.change_detection else "",
+        skip_links=(
+            {
+                scraper.value.scraper_name: digest_state.links_of(cfg.sites.__dict__["_content"][scraper.value.scraper_name].name)
+                for scraper in ScraperEnum
+            }
+            if digest_state
+            else {}
+        ),
+        db_config_name=HydraConfig.get().runtime.choices["runtime/db"] if cfg.runtime.db_send else "",
+    )
+
     # Asynchronous task assignment to Celery app
     g = group(
-        app.signature(
-            "run_pipeline_and_queue_data",
-            args=[
-                scraper.value.class_obj,
-                cast(dict, OmegaConf.to_container(cfg.webdriver, resolve=True)),
-                cfg.sites.__dict__["_content"][scraper.value.scraper_name],  # loading scraper site config
-                cfg.resource.vault,
-                cfg.max_retries,
-            ],
-            options={"serializer": cfg.celery.task_serializer},
-        )
+        app.signature("run_pipeline_and_queue_data", args=[scraper.value.scraper_name, snapshot_id, cfg.resource.task_store])
         for scraper in ScraperEnum
     )
     logger.info("Environment Setup Completed")
     logger.info("Initiating Scraping...")
 
-    group_result: AsyncResult = g.apply_async()
-    # group_result by definition returns list of lists
-    results = cast(Optional[list[list[dict[str, str | list[str]]]]], group_result.get(propagate=True))  # blocks; like await
-    if results is None:
-        logger.warning("No result found from async tasks")
-        return
-    # [[{...}, {...}, ...], [...], ...] -> [{...}, {...}, ...]
-    compiled_data: list[dict[str, str | list[str]]] = []
-    for data in results:
-        compiled_data.extend(data)
+    group_result = cast(GroupResult, g.apply_async())
+    # Every site task returns a reference to the raw data it streamed. The news of a site are clustered as soon as
+    # its task finishes, while the other sites are still scraped, so dedup is done when the last site is
+    results: list[dict[str, Any]] = []
+    compiled_data: list[Article] = []  # the new news of the digest
+    news_count = 0
     # Removes all duplicate values if any comes by accident
-    unique_data = []
-    seen = set()
-    for d in compiled_data:
-        s = json.dumps(d, sort_keys=True)
-        if s not in seen:
-            seen.add(s)
-            unique_data.append(d)
-    compiled_data = unique_data
+    seen: set[str] = set()
+    with metrics.observe_stage("scraping"), span("scraping"):
+        for raw_reference in iter_completed(group_result):
+            results.append(raw_reference)
+            site_data: list[Article] = []
+            for record in read_raw_data(
+                save_location=raw_reference["raw_location"], filename=raw_reference["filename"], first_part=raw_reference["first_part"]
+            ):
+                if record["url"] not in seen:
+                    seen.add(record["url"])
+                    site_data.append(Article.from_dict(record))
+            news_count += len(site_data)
+            with metrics.observe_stage("dedup"), profile_stage("dedup"), span("dedup", articles=len(site_data)):
+                # Only the new news are clustered, against the clusters of the sites (and, incrementally, the runs) before
+                compiled_data += digest.add_articles(news_list=site_data, sentence_dict=similarity_sentences(site_data))
+            if digest_state is not None:
+                digest_state.save()
     logger.info("News extraction completed.")
-    logger.info(f"All news data compiled. Total {len(compiled_data)} news found.")
+    logger.info(f"All news data compiled. Total {news_count} news found.")
+    logger.info(f"Raw Data streamed to {cfg.output_location.raw}")
+    logger.info(f"{len(compiled_data)} new news added to the digest. {len(digest.digest_articles)} news in the digest in total")
 
-    save_raw_data(
-        data=compiled_data,
-        save_location=cfg.output_location.raw,
-        filename="bangla_news_digest.json",
-    )
-    logger.info(f"Raw Data saved at {cfg.output_location.raw}")
-
-    # TODO: Need to remove news similar to previously scraped ones
-    compiled_data = remove_similar_news(
-        news_list=compiled_data,
-        similar_news_dict=find_similar_sentences(
-            {str(news["id"]): "। ".join(get_translation(list(news["title"]) + news["summary_points"][0].split("।"))) for news in compiled_data}
-        ),
-        id_to_date={str(news["id"]): str(news["scraped_at"]) for news in compiled_data},
-    )
-    logger.info(f"Removed similar news. {len(compiled_data)} best valid news found")
-
-    cat_separated_data = separate_into_categories(compiled_data=compiled_data)
-    logger.info("News data separated into categories")
-
-    cat_separated_data = sort_by_timestamp(cat_separated_data=cat_separated_data)
-    logger.info("News data separated into categories")
-
-    save_processsed_data(
-        data=cat_separated_data,
-        save_location=cfg.output_location.processed,
-        filename=f"Bangla News Digest {date.today().strftime('%B %d, %Y')}.docx",
+    digest_path = compile_digest_document(
+        digest_data=digest.digest_articles,
+        processed_location=cfg.output_location.processed,
         template=cfg.resource.news_digest_template,
     )
-    logger.info(f"Processed Data saved at {cfg.output_location.processed}")
 
     if cfg.runtime.db_send:
-        inserted_articles = save_scraped_items(database_config=cfg.runtime.db, items=compiled_data)
-        logger.info(f"Processed Data saved at db. No. of articles saved: {inserted_articles}")
+        # The workers wrote every scraped article to the DB while scraping. Only the digest selection is left to record
+        logger.info(f"{sum(raw_reference['db_inserted'] for raw_reference in results)} new articles saved to the DB by the workers")
+        with span("db_mark_digest", articles=len(compiled_data)):
+            marked_articles = set_articles_in_digest(database_config=cfg.runtime.db, urls=[news.url for news in compiled_data])
+        logger.info(f"{marked_articles} articles marked as in today's digest")
     else:
         logger.warning("Data not saved to DB. You might be losing valuable data.")
 
     if cfg.runtime.email_send:
-        try:
-            send_email(
-                smtp_config={
-                    "host": cfg.runtime.email.host,
-                    "port": cfg.runtime.email.port,
-                    "user": cfg.runtime.email.username,
-                    "password": cfg.runtime.email.password,
-                },
-                email_subject="Today's Bangla News Digest",
-                email_body="\n".join(
-                    [
-                        "Assalamu alaikum,",
-                        "Here is today's Bangla News Digest.",
-                        f"Time taken for the entire project: {round((time.time() - start_time) / 60, 2)} minutes in total",
-                        f"Total valid news scraped: {len(compiled_data)}",
-                    ]
-                ),
-                from_addr=cfg.runtime.email.from_addr,
-                to_addr=cfg.runtime.email.to_addr,
-                cc_addr=cfg.runtime.email.cc_addr,
-                attachment_path=os.path.join(
-                    cfg.output_location.processed,
-                    f"Bangla News Digest {date.today().strftime('%B %d, %Y')}.docx",
-                ),
-            )
-        except Exception as e:
-            logger.exception(
-                f"Something went wrong. Exception found when sending email. \
-                    The exception found: {e}. "
-            )
+        # Delivery (with retries) happens on a worker, so the orchestrator is done once the document is written
+        queue_digest_email(
+            email_config_name=HydraConfig.get().runtime.choices["runtime/email"],
+            start_time=start_time,
+            news_count=len(compiled_data),
+            attachment_path=digest_path,
+        )
     else:
         logger.warning("Email not sent to intended users.")
 
     logger.info(f"Time taken for total process: {round((time.time() - start_time) / 60, 2)} minutes")
+    metrics.stage_duration_seconds.labels(stage="total").observe(time.time() - start_time)
+    if cfg.metrics.enabled and cfg.metrics.pushgateway_url:
+        push_metrics(gateway_url=cfg.metrics.pushgateway_url, job_name=cfg.metrics.job_name)
+    if run_span is not None:
+        run_span.end()
+    tracing.flush_spans()
     logger.info("System is shutting down...")
 
 
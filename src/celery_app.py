@@ -1,16 +1,34 @@
 import logging
+import time
 from datetime import datetime
-from typing import Any, cast
+from typing import Any, Optional, cast
 
 import hydra
 from celery import Celery
 from celery.apps.worker import Worker
-from celery.signals import after_setup_logger, after_setup_task_logger
+from celery.signals import (
+    after_setup_logger,
+    after_setup_task_logger,
+    before_task_publish,
+    task_postrun,
+    task_prerun,
+)
 from dotenv import load_dotenv
 from omegaconf import DictConfig, OmegaConf
 
 from src.conf import CeleryConfig
-from src.utils import configure_child_logging, init_logging, log_queue
+from src.utils import (
+    configure_child_logging,
+    configure_rate_limiting,
+    configure_tracing,
+    init_logging,
+    metrics,
+    start_metrics_server,
+    tracing,
+)
+
+_task_started_at: dict[str, float] = {}
+_task_spans: dict[str, tuple[Any, Optional[tracing.Span]]] = {}
 
 
 def get_config(location: str, config_name: str) -> DictConfig:
@@ -31,6 +49,7 @@ def generate_celery_app() -> Celery:
         task_serializer=cfg.task_serializer,
         accept_content=cast(list[str], OmegaConf.to_container(cfg.accept_content)),
         result_serializer=cfg.result_serializer,
+        result_expires=cfg.result_expires,
         task_time_limit=cfg.task_config.max_time_limit,
         task_soft_time_limit=cfg.task_config.soft_time_limit,
         task_acks_late=cfg.task_config.acks_late,
@@ -50,17 +69,56 @@ def generate_celery_app() -> Celery:
 
 @after_setup_logger.connect
 def _setup_root(logger: logging.Logger, *args: Any, **kwargs: Any) -> None:
-    init_logging(root_logger=logger)
+    cfg = cast(CeleryConfig, get_config(location="../config/celery", config_name="celery"))
+    init_logging(root_logger=logger, logger_config=cast(dict, OmegaConf.to_container(cfg.logging, resolve=True)))
 
 
 @after_setup_task_logger.connect
 def _setup_task(logger: logging.Logger, *args: Any, **kwargs: Any) -> None:
-    configure_child_logging(root_logger=logger, log_queue=log_queue)
+    configure_child_logging(root_logger=logger)
+
+
+@before_task_publish.connect
+def _stamp_publish_time(headers: dict[str, Any], *args: Any, **kwargs: Any) -> None:
+    headers["published_at"] = time.time()
+    # The run id travels with the task, so the worker spans join the trace of the run
+    headers.update(tracing.current_trace_context())
+
+
+@task_prerun.connect
+def _record_task_start(task_id: str, task: Any, *args: Any, **kwargs: Any) -> None:
+    published_at = getattr(task.request, "published_at", None)
+    if published_at is not None:
+        metrics.task_queue_lag_seconds.labels(task=task.name).observe(max(time.time() - float(published_at), 0))
+    _task_started_at[task_id] = time.perf_counter()
+    trace_id = getattr(task.request, "trace_id", None)
+    if trace_id:
+        token = tracing.attach(trace_id=trace_id, parent_span_id=getattr(task.request, "parent_span_id", "") or "")
+        _task_spans[task_id] = (token, tracing.start_span(f"task {task.name}", task_id=task_id, retries=task.request.retries or 0))
+
+
+@task_postrun.connect
+def _record_task_end(task_id: str, task: Any, retval: Any = None, state: str | None = None, *args: Any, **kwargs: Any) -> None:
+    started_at = _task_started_at.pop(task_id, None)
+    if started_at is not None:
+        metrics.task_duration_seconds.labels(task=task.name, state=state or "UNKNOWN").observe(time.perf_counter() - started_at)
+    if task_id in _task_spans:
+        token, task_span = _task_spans.pop(task_id)
+        if task_span is not None:
+            task_span.set_attribute("state", state or "UNKNOWN")
+            task_span.end(error=retval if isinstance(retval, BaseException) else None)
+        tracing.detach(token)
+        tracing.flush_spans()
 
 
 if __name__ == "__main__":
     load_dotenv()
     app = generate_celery_app()
+    celery_cfg = cast(CeleryConfig, get_config(location="../config/celery", config_name="celery"))
+    if celery_cfg.metrics.enabled and celery_cfg.metrics.port > 0:
+        start_metrics_server(port=celery_cfg.metrics.port)
+    configure_tracing(tracing_config=cast(dict, OmegaConf.to_container(celery_cfg.tracing, resolve=True)))
+    configure_rate_limiting(redis_url=celery_cfg.rate_limit_redis_url)
     app.control.purge()
     celery_worker = Worker(app=app, hostname=f"worker_{datetime.now()}", loglevel="INFO")  # type: ignore
     celery_worker.start()  # type: ignore
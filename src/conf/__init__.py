@@ -1,9 +1,39 @@
 from .celery import CeleryConfig
+from .continuous import ContinuousConfig
 from .db import DBConfig
 from .default import ProjectConfig
 from .email import EmailConfig
+from .logger import LoggerConfig
+from .metrics import MetricsConfig
+from .profiling import ProfilingConfig
 from .runtime import RuntimeConfig
-from .site_config import ScraperSiteConfig
+from .site_config import (
+    CircuitBreakerConfig,
+    FeedConfig,
+    InterceptionConfig,
+    PageLoadConfig,
+    RateLimitConfig,
+    ScraperSiteConfig,
+)
+from .tracing import TracingConfig
 from .webdriver import WebDriverConfig
 
-__all__ = ["DBConfig", "ProjectConfig", "EmailConfig", "RuntimeConfig", "ScraperSiteConfig", "WebDriverConfig", "CeleryConfig"]
+__all__ = [
+    "DBConfig",
+    "ProjectConfig",
+    "EmailConfig",
+    "RuntimeConfig",
+    "ScraperSiteConfig",
+    "WebDriverConfig",
+    "CeleryConfig",
+    "MetricsConfig",
+    "ProfilingConfig",
+    "TracingConfig",
+    "LoggerConfig",
+    "InterceptionConfig",
+    "PageLoadConfig",
+    "FeedConfig",
+    "ContinuousConfig",
+    "RateLimitConfig",
+    "CircuitBreakerConfig",
+]
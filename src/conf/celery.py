@@ -1,5 +1,9 @@
 from dataclasses import dataclass
 
+from .logger import LoggerConfig
+from .metrics import MetricsConfig
+from .tracing import TracingConfig
+
 
 @dataclass
 class CeleryBrokerConfig:
@@ -41,8 +45,10 @@ class CeleryConfig:
     worker: CeleryWorkerConfig
     task_serializer: str
     result_serializer: str
+    result_expires: int  # seconds results are kept in the result backend
     accept_content: list[str]
     enable_utc: bool
-
-
-# TODO: May add prometheus for monitoring celery tasks
+    metrics: MetricsConfig
+    tracing: TracingConfig
+    logging: LoggerConfig
+    rate_limit_redis_url: str  # per domain token buckets shared by the workers. Empty keeps them per worker
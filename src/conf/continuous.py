@@ -0,0 +1,9 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class ContinuousConfig:
+    crawl_interval_minutes: int  # every site is crawled for new links this often
+    digest_time: str  # HH:MM (local time) at which the digest is compiled from the DB
+    lookback_hours: int  # the digest (and the new link check) covers the articles saved in this many hours
+    schedule_file: str  # celery beat schedule state
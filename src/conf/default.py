@@ -1,8 +1,13 @@
 from dataclasses import dataclass
+from typing import Optional
 
 from .celery import CeleryConfig
+from .continuous import ContinuousConfig
+from .metrics import MetricsConfig
+from .profiling import ProfilingConfig
 from .runtime import RuntimeConfig
 from .site_config import ScraperSiteConfig
+from .tracing import TracingConfig
 from .webdriver import WebDriverConfig
 
 
@@ -20,10 +25,28 @@ class OutputLocationConfig:
     processed: str
 
 
+@dataclass
+class RawWriterConfig:
+    compression: Optional[str]  # gzip, zstd or null
+    fsync_every: int  # records between fsyncs
+    max_bytes: int  # on-disk size of a part before rotation
+
+
+@dataclass
+class DBWriterConfig:
+    batch_size: int  # articles per upsert
+    flush_interval: float  # seconds an article waits at most for its batch to fill
+    max_pending: int  # queued articles before the scraper is blocked (backpressure)
+    max_retries: int  # retries of a failed batch
+
+
 @dataclass
 class ProjectResourceConfig:
     news_digest_template: str
     vault: str
+    digest_state: str
+    listing_validators: str
+    task_store: str
 
 
 @dataclass
@@ -33,5 +56,14 @@ class ProjectConfig:
     celery: CeleryConfig
     sites: ScraperSiteList
     max_retries: int
+    incremental: bool  # refresh today's digest with new news only
+    change_detection: bool  # in incremental mode, skip categories whose listing did not change since the last run
+    mode: str  # batch (one run, one digest) or continuous (crawl all day, digest at a cutoff)
+    continuous: ContinuousConfig
     output_location: OutputLocationConfig
+    raw_writer: RawWriterConfig
+    db_writer: DBWriterConfig
+    metrics: MetricsConfig
+    profiling: ProfilingConfig
+    tracing: TracingConfig
     resource: ProjectResourceConfig
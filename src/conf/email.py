@@ -1,6 +1,13 @@
 from dataclasses import dataclass
 
 
+@dataclass
+class EmailRetryConfig:
+    max_retries: int
+    backoff_base: int  # seconds before the first retry, doubled on every retry
+    backoff_max: int
+
+
 @dataclass
 class EmailConfig:
     host: str
@@ -10,3 +17,6 @@ class EmailConfig:
     from_addr: str
     to_addr: list[str]
     cc_addr: list[str]
+    bcc_groups: list[list[str]]  # each group gets its own copy, over the same SMTP connection
+    starttls: bool
+    retry: EmailRetryConfig
@@ -0,0 +1,13 @@
+from dataclasses import dataclass, field
+
+
+@dataclass
+class LoggerConfig:
+    queue_maxsize: int  # bounded log queue. A full queue drops records instead of growing memory
+    overflow: str  # "drop": drop any record on a full queue, "block": WARNING and above wait up to block_timeout first
+    block_timeout: float  # seconds
+    sampled_loggers: list[str] = field(default_factory=list)  # high-volume loggers whose INFO and lower records are sampled
+    sample_every: int = 1  # keep 1 of every N records from the sampled loggers. 1 keeps all
+    batch_size: int = 256  # records formatted and written per write by the listener
+    exception_rate_limit: int = 5  # stack traces per site (or logger) per window. The rest are logged without the traceback
+    exception_window: float = 60.0  # seconds
@@ -0,0 +1,9 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class MetricsConfig:
+    enabled: bool
+    port: int  # worker exporter port scraped by Prometheus. 0 disables the exporter
+    pushgateway_url: str  # orchestrator pushes its metrics here at the end of a run. Empty disables pushing
+    job_name: str
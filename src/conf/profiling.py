@@ -0,0 +1,11 @@
+from dataclasses import dataclass, field
+
+
+@dataclass
+class ProfilingConfig:
+    enabled: bool  # BND_PROFILE env variable overrides this (comma separated stages, "all" or "0")
+    stages: list[str] = field(default_factory=list)  # stages (and tasks) to profile. Empty means every stage
+    output_dir: str = "./profiles"
+    deterministic: bool = True  # cProfile -> <stage>.pstats
+    sampling: bool = True  # stack sampler -> <stage>.collapsed (flamegraph.pl / speedscope ready)
+    sample_interval: float = 0.005  # seconds between two stack samples
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
 
@@ -11,10 +11,52 @@ class ScraperSiteSelectorConfig:
     cloudflare: Optional[str]
 
 
+@dataclass
+class InterceptionConfig:
+    # image, media, font, stylesheet, iframe, third_party_script
+    block_resource_types: list[str] = field(default_factory=list)
+    block_url_patterns: list[str] = field(default_factory=list)  # extra URL patterns to block, e.g. "*example-ads.com/*"
+    allow_url_patterns: list[str] = field(default_factory=list)  # never blocked, even when a blocked type matches
+    track_traffic: bool = False  # record blocked requests and transferred bytes per page (Chrome only)
+
+
+@dataclass
+class PageLoadConfig:
+    # eager: a page is loaded at DOMContentLoaded. none: a page is ready as soon as the selectors
+    # the scraper needs are present, and the rest of its loading is stopped
+    strategy: str = "eager"
+    javascript: bool = True  # disable for server rendered sites
+    ready_timeout: float = 30.0  # seconds to wait for the page content with the none strategy
+    tabs: int = 1  # browser tabs. With more, the next article links load in background tabs while the current one is scraped
+
+
+@dataclass
+class RateLimitConfig:
+    requests_per_minute: float = 0  # per domain, shared by every worker (token bucket). 0 means unlimited
+    burst: int = 1  # requests allowed back to back after an idle period
+    respect_robots: bool = True  # lower the rate to the Crawl-delay (or Request-rate) of robots.txt
+
+
+@dataclass
+class CircuitBreakerConfig:
+    failure_threshold: int = 5  # consecutive failed pages that stop the site's scraping. 0 never stops it
+    reset_timeout: float = 300  # seconds before a single probe request is let through
+
+
+@dataclass
+class FeedConfig:
+    url: str  # RSS/Atom feed or (news) sitemap
+    category: Optional[str] = None  # category of every entry. None maps entries by their feed category or URL path
+
+
 @dataclass
 class ScraperSiteConfig:
     name: str
     base_url: str
     url_list: dict[str, str]
     selectors: ScraperSiteSelectorConfig
-    rate_limiter: int
+    rate_limit: Optional[RateLimitConfig] = None
+    circuit_breaker: Optional[CircuitBreakerConfig] = None
+    interception: Optional[InterceptionConfig] = None
+    page_load: Optional[PageLoadConfig] = None
+    feeds: list[FeedConfig] = field(default_factory=list)  # discovery over plain HTTP, before the browser
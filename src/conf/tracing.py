@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class TracingConfig:
+    enabled: bool
+    output_dir: str  # spans are appended to <output_dir>/spans-<pid>.jsonl as OTLP/JSON. Empty disables the file exporter
+    otlp_endpoint: str  # OTLP/HTTP JSON endpoint, e.g. http://localhost:4318/v1/traces. Empty disables it
+    service_name: str
+    batch_size: int  # spans buffered before an export
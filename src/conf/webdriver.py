@@ -5,3 +5,7 @@ from dataclasses import dataclass
 class WebDriverConfig:
     driver_name: str
     options: dict[str, str | bool]
+    cache_dir: str = ""  # driver paths, user agents and per site profiles are cached here. Empty disables the cache
+    cache_ttl_hours: float = 24
+    user_agent_pool_size: int = 50
+    reuse_profile: bool = True  # reuse one profile (and its HTTP cache) per site across runs
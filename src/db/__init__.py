@@ -1,41 +1,67 @@
 from .crud import (
+    ArticleCursor,
+    SearchCursor,
     bulk_delete_by_source,
     count_articles,
     create_article,
     delete_article_by_id,
     delete_article_by_url,
+    ensure_search_index,
     ensure_tables,
     get_article_by_date,
     get_article_by_id,
     get_article_by_url,
     get_articles_by_start_and_end_date,
+    get_articles_scraped_since,
+    get_scraped_urls_since,
+    get_urls_scraped_since,
     insert_articles_batch,
     list_articles,
+    list_articles_page,
+    mark_articles_in_digest,
+    rebuild_search_index,
     save_scraped_items,
+    search_articles,
+    set_articles_in_digest,
     update_article_by_id,
     update_article_by_url,
+    upsert_articles_batch,
 )
 from .models import Base, NewsArticle
 from .session import get_engine, get_session
+from .writer import BatchedArticleWriter
 
 __all__ = [
+    "ArticleCursor",
+    "SearchCursor",
     "bulk_delete_by_source",
     "count_articles",
     "create_article",
     "delete_article_by_id",
     "delete_article_by_url",
+    "ensure_search_index",
     "ensure_tables",
     "get_article_by_id",
     "get_article_by_url",
     "get_article_by_date",
     "get_articles_by_start_and_end_date",
+    "get_articles_scraped_since",
+    "get_scraped_urls_since",
+    "get_urls_scraped_since",
     "insert_articles_batch",
     "list_articles",
+    "list_articles_page",
+    "mark_articles_in_digest",
+    "rebuild_search_index",
     "save_scraped_items",
+    "search_articles",
+    "set_articles_in_digest",
     "update_article_by_id",
     "update_article_by_url",
+    "upsert_articles_batch",
     "Base",
     "NewsArticle",
     "get_engine",
     "get_session",
+    "BatchedArticleWriter",
 ]
@@ -1,33 +1,134 @@
 import logging
+import time
 from datetime import date, datetime, timedelta
 from typing import Any, Optional, Sequence, cast
 
+from sqlalchemy import MetaData, Table, column
 from sqlalchemy import delete as sql_delete
 from sqlalchemy import func
 from sqlalchemy import insert as sql_insert
-from sqlalchemy import select
+from sqlalchemy import inspect, literal, literal_column, or_, select
+from sqlalchemy import table as sql_table
+from sqlalchemy import text
 from sqlalchemy import update as sql_update
 
 # dialect helpers
+from sqlalchemy.dialects import mysql as mysql_dialects
 from sqlalchemy.dialects import postgresql as pg_dialects
-from sqlalchemy.engine import Engine, CursorResult
+from sqlalchemy.dialects import sqlite as sqlite_dialects
+from sqlalchemy.engine import CursorResult, Engine
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from sqlalchemy.sql._typing import _DMLTableArgument
 
 from src.conf import DBConfig
+from src.utils import Article, metrics, normalize, tracing
 
-from .models import Base, NewsArticle
+from .models import SEARCH_TABLE, SEARCH_TOKENIZER, Base, NewsArticle
 from .session import get_session
 
 log = logging.getLogger(__name__)
 
 BATCH_SIZE = 1
 
+# Position of the last article of a keyset page: its (published_at, id)
+ArticleCursor = tuple[Optional[datetime], str]
+# Position of the last result of a search page: its (score, id)
+SearchCursor = tuple[float, str]
+# Indexes the model no longer has, superseded by the (source,) published_at, id indexes of keyset pagination
+SUPERSEDED_INDEXES = {"ix_articles_published_at", "ix_articles_source_published"}
+
 
 # ---------- Schema helper ----------
 def ensure_tables(engine: Engine) -> None:
     """Create tables from models (dev helper). Production: use Alembic migrations."""
     Base.metadata.create_all(bind=engine)
+    # create_all skips existing tables, so columns and indexes added to the model later are created here
+    table = NewsArticle.__tablename__
+    if "in_digest" not in {column["name"] for column in inspect(engine).get_columns(table)}:
+        with engine.begin() as connection:
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN in_digest BOOLEAN NOT NULL DEFAULT FALSE"))
+    for index in cast(Table, NewsArticle.__table__).indexes:
+        index.create(bind=engine, checkfirst=True)
+    # Dropped through a reflected copy of the table, so the model's metadata is left alone
+    for index in Table(table, MetaData(), autoload_with=engine).indexes:
+        if index.name in SUPERSEDED_INDEXES:
+            log.info(f"Dropping index {index.name}, superseded by the keyset pagination indexes")
+            index.drop(bind=engine)
+    ensure_search_index(engine)
+
+
+# ---------- Full-text search index ----------
+def ensure_search_index(engine: Engine) -> None:
+    """
+    Create the full-text index of search_articles. MySQL keeps its FULLTEXT index (see the model) up to
+    date by itself. On SQLite, an external content FTS5 table is kept up to date incrementally by
+    triggers, and is filled from the existing rows when it is first created. An index built with another
+    tokenizer is dropped and built again.
+
+    The DDL is formatted from the fixed table names of the models (and no input), hence the nosec comments.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    table = NewsArticle.__tablename__
+    with engine.begin() as connection:
+        existing = connection.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": SEARCH_TABLE}).scalar()
+        if existing is not None:
+            if SEARCH_TOKENIZER in existing:
+                return
+            log.info(f"Full-text search index {SEARCH_TABLE} was built with another tokenizer. Building it again")
+            for trigger in ("ai", "ad", "au"):
+                connection.execute(text(f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_{trigger}"))
+            connection.execute(text(f"DROP TABLE {SEARCH_TABLE}"))
+        try:
+            connection.execute(
+                text(
+                    f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(title, body, content='{table}', content_rowid='rowid', "
+                    f'tokenize="{SEARCH_TOKENIZER}")'
+                )
+            )
+        except Exception as e:
+            log.warning(f"SQLite FTS5 is not available ({e}). search_articles falls back to scanning the articles")
+            return
+        connection.execute(
+            text(
+                f"CREATE TRIGGER {SEARCH_TABLE}_ai AFTER INSERT ON {table} BEGIN "  # nosec: B608
+                f"INSERT INTO {SEARCH_TABLE}(rowid, title, body) VALUES (new.rowid, new.title, new.body); END"
+            )
+        )
+        connection.execute(
+            text(
+                f"CREATE TRIGGER {SEARCH_TABLE}_ad AFTER DELETE ON {table} BEGIN "  # nosec: B608
+                f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, title, body) VALUES ('delete', old.rowid, old.title, old.body); END"
+            )
+        )
+        connection.execute(
+            text(
+                f"CREATE TRIGGER {SEARCH_TABLE}_au AFTER UPDATE OF title, body ON {table} BEGIN "  # nosec: B608
+                f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, title, body) VALUES ('delete', old.rowid, old.title, old.body); "
+                f"INSERT INTO {SEARCH_TABLE}(rowid, title, body) VALUES (new.rowid, new.title, new.body); END"
+            )
+        )
+        connection.execute(text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')"))  # nosec: B608
+    log.info(f"Full-text search index {SEARCH_TABLE} created")
+
+
+def rebuild_search_index(engine: Engine) -> None:
+    """
+    Maintenance of the full-text index, e.g. from a nightly job. SQLite rebuilds the FTS5 table from the
+    articles (needed after a VACUUM, which can renumber the rowids it refers to) and merges its segments.
+    MySQL runs OPTIMIZE TABLE, which also purges the FULLTEXT entries of deleted rows. MariaDB has no
+    ngram parser, so no FULLTEXT index, and nothing to rebuild.
+    """
+    table = NewsArticle.__tablename__
+    with engine.begin() as connection:
+        if engine.dialect.name == "sqlite":
+            if not inspect(connection).has_table(SEARCH_TABLE):
+                return
+            connection.execute(text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')"))  # nosec: B608
+            connection.execute(text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')"))  # nosec: B608
+        elif engine.dialect.name == "mysql":
+            connection.execute(text(f"OPTIMIZE TABLE {table}"))
 
 
 # ---------- Create ----------
@@ -45,28 +146,38 @@ def create_article(session: Session, payload: dict[str, Any]) -> NewsArticle:
 
 
 # ---------- Read ----------
-def get_article_by_id(session: Session, article_id: int) -> Optional[NewsArticle]:
-    stmt = select(NewsArticle).where(NewsArticle.id == article_id).order_by(NewsArticle.scraped_at)
-    return session.execute(stmt).scalars().first()
+def get_article_by_id(session: Session, article_id: str) -> Optional[NewsArticle]:
+    # id and url are unique, so there is nothing to order
+    stmt = select(NewsArticle).where(NewsArticle.id == article_id)
+    return session.execute(stmt).scalar_one_or_none()
 
 
 def get_article_by_url(session: Session, url: str) -> Optional[NewsArticle]:
-    stmt = select(NewsArticle).where(NewsArticle.url == url).order_by(NewsArticle.scraped_at)
-    return session.execute(stmt).scalars().first()
+    stmt = select(NewsArticle).where(NewsArticle.url == url)
+    return session.execute(stmt).scalar_one_or_none()
+
+
+def _scraped_between(start_date: date, end_date: date) -> Any:
+    """Half-open [start_date, end_date) predicate on scraped_at. The bounds are datetimes, not
+    strings, so the scraped_at index is used on every backend"""
+    start = datetime.combine(start_date, datetime.min.time())
+    end = datetime.combine(end_date, datetime.min.time())
+    return (NewsArticle.scraped_at >= start) & (NewsArticle.scraped_at < end)
 
 
 def get_article_by_date(session: Session, search_datetime: date) -> list[NewsArticle]:
-    stmt = (
-        select(NewsArticle)
-        .filter(
-            (NewsArticle.scraped_at >= str(datetime.combine(search_datetime, datetime.min.time())))
-            & (NewsArticle.scraped_at <= str(datetime.combine(search_datetime, datetime.max.time())))
-        )
-        .order_by(NewsArticle.scraped_at)
-    )
+    stmt = select(NewsArticle).where(_scraped_between(search_datetime, search_datetime + timedelta(days=1))).order_by(NewsArticle.scraped_at)
     return list(session.execute(stmt).scalars().all())
 
 
+def get_urls_scraped_since(session: Session, since: datetime, source: Optional[str] = None) -> set[str]:
+    """URLs of the articles scraped since the given time, optionally of one source only"""
+    stmt = select(NewsArticle.url).where(NewsArticle.scraped_at >= since)
+    if source is not None:
+        stmt = stmt.where(NewsArticle.source == source)
+    return set(session.execute(stmt).scalars().all())
+
+
 def list_articles(
     session: Session,
     *,
@@ -77,6 +188,7 @@ def list_articles(
 ) -> list[NewsArticle]:
     """
     List articles with simple filters and pagination.
+    OFFSET pages get slower with depth; use list_articles_page to walk deep into the table.
     """
     stmt = select(NewsArticle)
     if source is not None:
@@ -89,6 +201,150 @@ def list_articles(
     return list(session.execute(stmt).scalars().all())
 
 
+def list_articles_page(
+    session: Session,
+    *,
+    source: Optional[str] = None,
+    limit: int = 100,
+    after: Optional[ArticleCursor] = None,
+    order_by_newest: bool = True,
+) -> tuple[list[NewsArticle], Optional[ArticleCursor]]:
+    """Keyset (seek) pagination of the articles on (published_at, id). Unlike list_articles, a page
+    costs the same at any depth, as it seeks the (source,) published_at, id index to the cursor
+    instead of skipping `offset` rows. Articles without published_at come last in both orders.
+
+    Args:
+        session (Session): the database session
+        source (Optional[str], optional): only the articles of this source. Defaults to None.
+        limit (int, optional): the page size. Defaults to 100.
+        after (Optional[ArticleCursor], optional): the cursor returned with the previous page. Defaults to None (the first page).
+        order_by_newest (bool, optional): newest first. Defaults to True.
+
+    Returns:
+        tuple[list[NewsArticle], Optional[ArticleCursor]]: the page, and the cursor of the next page (None after the last page)
+    """
+    base = select(NewsArticle)
+    if source is not None:
+        base = base.where(NewsArticle.source == source)
+
+    articles: list[NewsArticle] = []
+    after_published_at, after_id = after if after is not None else (None, None)
+    # Dated articles first. The cursor is inside them if it has a published_at (or there is no cursor yet)
+    if after is None or after_published_at is not None:
+        stmt = base.where(NewsArticle.published_at.is_not(None))
+        if after_published_at is not None:
+            # The leading bound on published_at alone keeps this a single range scan of the index
+            # (an OR of the two cases would make SQLite and MySQL merge two scans and sort)
+            if order_by_newest:
+                seek = (NewsArticle.published_at <= after_published_at) & (
+                    (NewsArticle.published_at < after_published_at) | (NewsArticle.id < after_id)
+                )
+            else:
+                seek = (NewsArticle.published_at >= after_published_at) & (
+                    (NewsArticle.published_at > after_published_at) | (NewsArticle.id > after_id)
+                )
+            stmt = stmt.where(seek)
+        if order_by_newest:
+            stmt = stmt.order_by(NewsArticle.published_at.desc(), NewsArticle.id.desc())
+        else:
+            stmt = stmt.order_by(NewsArticle.published_at.asc(), NewsArticle.id.asc())
+        articles = list(session.execute(stmt.limit(limit)).scalars().all())
+
+    # Then the undated ones, by id
+    if len(articles) < limit:
+        stmt = base.where(NewsArticle.published_at.is_(None))
+        if after is not None and after_published_at is None:
+            stmt = stmt.where(NewsArticle.id < after_id if order_by_newest else NewsArticle.id > after_id)
+        stmt = stmt.order_by(NewsArticle.id.desc() if order_by_newest else NewsArticle.id.asc())
+        articles += list(session.execute(stmt.limit(limit - len(articles))).scalars().all())
+
+    if len(articles) < limit:
+        return articles, None
+    return articles, (articles[-1].published_at, articles[-1].id)
+
+
+def _fts5_query(query: str) -> str:
+    """Quotes every term, so punctuation in the user's query is not read as FTS5 syntax. Terms are ANDed and
+    matched as prefixes, so a Bangla word also finds its inflected forms (ঢাকা finds ঢাকার and ঢাকায়)"""
+    return " ".join('"' + term.replace('"', '""') + '"*' for term in query.split())
+
+
+def search_articles(
+    session: Session,
+    query: str,
+    *,
+    source: Optional[str] = None,
+    published_from: Optional[datetime] = None,
+    published_until: Optional[datetime] = None,
+    limit: int = 20,
+    after: Optional[SearchCursor] = None,
+) -> tuple[list[tuple[NewsArticle, float]], Optional[SearchCursor]]:
+    """Full-text search of the articles' title and body, best match first. Pages are keyset paginated on (score, id).
+
+    MySQL matches the query against the ngram FULLTEXT index in natural language mode, SQLite against
+    the FTS5 index (every term must match, ranked by bm25). Other backends (or SQLite without FTS5)
+    fall back to a case-insensitive scan for the whole query, with a score of 0.
+
+    Args:
+        session (Session): the database session
+        query (str): the search terms, e.g. a company name
+        source (Optional[str], optional): only the articles of this source. Defaults to None.
+        published_from (Optional[datetime], optional): only the articles published at or after it. Defaults to None.
+        published_until (Optional[datetime], optional): only the articles published before it. Defaults to None.
+        limit (int, optional): the page size. Defaults to 20.
+        after (Optional[SearchCursor], optional): the cursor returned with the previous page. Defaults to None (the first page).
+
+    Returns:
+        tuple[list[tuple[NewsArticle, float]], Optional[SearchCursor]]: the articles with their score, and the cursor
+        of the next page (None after the last page)
+    """
+    # The articles are stored NFC normalized (see src.utils.bangla_text), so must be the query
+    query = normalize(query).strip()
+    if not query:
+        return [], None
+
+    dialect = session.bind.dialect.name.lower()  # type: ignore
+    table_name = NewsArticle.__tablename__
+    # Only MySQL has the FULLTEXT index (MariaDB has no ngram parser), MariaDB falls back to the scan
+    if dialect == "mysql":
+        match = mysql_dialects.match(NewsArticle.title.expression, NewsArticle.body.expression, against=query).in_natural_language_mode()
+        ranked = select(NewsArticle.id.label("id"), match.label("score")).where(match)
+    elif dialect == "sqlite" and inspect(session.connection()).has_table(SEARCH_TABLE):
+        # bm25 is lower for better matches
+        search_table = sql_table(SEARCH_TABLE, column("rowid"))
+        ranked = (
+            select(NewsArticle.id.label("id"), (-func.bm25(literal_column(SEARCH_TABLE))).label("score"))
+            .select_from(NewsArticle)
+            .join(search_table, search_table.c.rowid == literal_column(f"{table_name}.rowid"))
+            .where(literal_column(SEARCH_TABLE).op("MATCH")(_fts5_query(query)))
+        )
+    else:
+        pattern = f"%{query}%"
+        ranked = select(NewsArticle.id.label("id"), literal(0.0).label("score")).where(
+            or_(NewsArticle.title.ilike(pattern), NewsArticle.body.ilike(pattern))
+        )
+
+    if source is not None:
+        ranked = ranked.where(NewsArticle.source == source)
+    if published_from is not None:
+        ranked = ranked.where(NewsArticle.published_at >= published_from)
+    if published_until is not None:
+        ranked = ranked.where(NewsArticle.published_at < published_until)
+    ranked_subquery = ranked.subquery()
+
+    stmt = select(NewsArticle, ranked_subquery.c.score).join(ranked_subquery, NewsArticle.id == ranked_subquery.c.id)
+    if after is not None:
+        after_score, after_id = after
+        stmt = stmt.where((ranked_subquery.c.score < after_score) | ((ranked_subquery.c.score == after_score) & (ranked_subquery.c.id > after_id)))
+    stmt = stmt.order_by(ranked_subquery.c.score.desc(), ranked_subquery.c.id.asc()).limit(limit)
+
+    with tracing.span("db.search", query=query):
+        results = [(article, float(score)) for article, score in session.execute(stmt).all()]
+    if len(results) < limit:
+        return results, None
+    return results, (results[-1][1], results[-1][0].id)
+
+
 def count_articles(session: Session, *, source: Optional[str] = None) -> int:
     stmt = select(func.count(NewsArticle.id))
     if source is not None:
@@ -161,13 +417,17 @@ def insert_articles_batch(
 
     for i in range(0, len(items), batch_size):
         chunk = items[i : i + batch_size]
+        start = time.perf_counter()
         try:
-            if ignore_conflicts and dialect.startswith("postgres"):
-                stmt = pg_dialects.insert(table).on_conflict_do_nothing(index_elements=["url"])
-                session.execute(stmt, chunk)
-            else:
-                _insert_chunk_plain(session, table, chunk)
+            with tracing.span("db.insert_chunk", rows=len(chunk)):
+                if ignore_conflicts and dialect.startswith("postgres"):
+                    stmt = pg_dialects.insert(table).on_conflict_do_nothing(index_elements=["url"])
+                    session.execute(stmt, chunk)
+                else:
+                    _insert_chunk_plain(session, table, chunk)
             total += len(chunk)
+            metrics.db_rows_inserted.inc(len(chunk))
+            metrics.db_insert_seconds.observe(time.perf_counter() - start)
         except Exception:
             # This exception should be rare.
             log.warning(f"Error found while inserting chunk {i}..{i + len(chunk) - 1}. Skipping this entry...")
@@ -175,20 +435,106 @@ def insert_articles_batch(
     return total
 
 
+def upsert_articles_batch(session: Session, items: Sequence[dict[str, Any]], batch_size: int = 500) -> int:
+    """
+    Idempotent insert: rows whose id, url or fingerprint is already stored are skipped, so a batch
+    can be written again after a failure (or by a retried task) without duplicates or errors.
+    Returns the rows actually inserted; skipped duplicates are not counted.
+    """
+    if not items:
+        return 0
+
+    table = cast(_DMLTableArgument, NewsArticle.__table__)
+    dialect = session.bind.dialect.name.lower()  # type: ignore
+    total = 0
+    for i in range(0, len(items), batch_size):
+        chunk = list(items[i : i + batch_size])
+        start = time.perf_counter()
+        inserted = 0
+        with tracing.span("db.upsert_chunk", rows=len(chunk)):
+            if dialect.startswith("postgres"):
+                res = session.execute(pg_dialects.insert(table).values(chunk).on_conflict_do_nothing())
+            elif dialect == "sqlite":
+                res = session.execute(sqlite_dialects.insert(table).values(chunk).on_conflict_do_nothing())
+            elif dialect in ("mysql", "mariadb"):
+                # IGNORE skips the duplicates. Unlike a no-op ON DUPLICATE KEY UPDATE, they are then not in
+                # the affected rows (the MySQL drivers of SQLAlchemy count matched rows as affected)
+                res = session.execute(mysql_dialects.insert(table).values(chunk).prefix_with("IGNORE"))
+            else:
+                res = None
+                for row in chunk:
+                    try:
+                        with session.begin_nested():
+                            session.execute(sql_insert(table).values(row))
+                        inserted += 1
+                    except IntegrityError:
+                        continue
+        if res is not None:
+            inserted = max(cast(CursorResult, res).rowcount or 0, 0)
+        total += inserted
+        metrics.db_rows_inserted.inc(inserted)
+        metrics.db_insert_seconds.observe(time.perf_counter() - start)
+    return total
+
+
+def mark_articles_in_digest(session: Session, urls: Sequence[str], batch_size: int = 500) -> int:
+    """Flags the articles that were selected for a digest. Returns rows updated."""
+    total = 0
+    for i in range(0, len(urls), batch_size):
+        stmt = sql_update(NewsArticle).where(NewsArticle.url.in_(urls[i : i + batch_size])).values(in_digest=True)
+        res = cast(CursorResult, session.execute(stmt))
+        total += res.rowcount or 0
+    return total
+
+
+def _to_row(item: Article | dict[str, Any]) -> dict[str, Any]:
+    """Keeps the table columns of a compiled article, with its datetimes parsed"""
+    if isinstance(item, Article):
+        return item.to_db_row()
+    columns = NewsArticle.__table__.columns.keys()
+    row = {key: value for key, value in item.items() if key in columns}
+    for key in ("published_at", "scraped_at"):
+        if isinstance(row.get(key), str):
+            row[key] = datetime.fromisoformat(row[key])
+    return row
+
+
 # ---------- Convenience wrappers that manage sessions ----------
-def save_scraped_items(database_config: DBConfig, items: list[dict[str, Any]]) -> int:
+def save_scraped_items(database_config: DBConfig, items: Sequence[Article | dict[str, Any]]) -> int:
     """
     Convenience entrypoint: upsert (default) or insert items into DB.
     """
     if not items:
         return 0
     with get_session(database_config) as session:
-        return insert_articles_batch(session, items)
+        return upsert_articles_batch(session, [_to_row(item) for item in items])
+
+
+def set_articles_in_digest(database_config: DBConfig, urls: Sequence[str]) -> int:
+    """Convenience wrapper of mark_articles_in_digest managing its session"""
+    if not urls:
+        return 0
+    with get_session(database_config) as session:
+        return mark_articles_in_digest(session=session, urls=urls)
+
+
+def get_scraped_urls_since(database_config: DBConfig, since: datetime, source: Optional[str] = None) -> set[str]:
+    """URLs already saved since the given time, used to only scrape new links in continuous mode"""
+    with get_session(database_config) as session:
+        return get_urls_scraped_since(session=session, since=since, source=source)
+
+
+def get_articles_scraped_since(database_config: DBConfig, since: datetime) -> list[dict[str, Any]]:
+    """Articles saved since the given time as plain dicts of their columns, oldest first"""
+    columns = NewsArticle.__table__.columns.keys()
+    with get_session(database_config) as session:
+        stmt = select(NewsArticle).where(NewsArticle.scraped_at >= since).order_by(NewsArticle.scraped_at)
+        return [{column: getattr(article, column) for column in columns} for article in session.execute(stmt).scalars().all()]
 
 
 def get_articles_by_start_and_end_date(database_config: DBConfig, start_date: date, end_date: date) -> list[dict[str, Any]]:
-    news_articles = []
+    """Articles scraped from start_date up to (not including) end_date as plain dicts of their columns, oldest first"""
+    columns = NewsArticle.__table__.columns.keys()
     with get_session(database_config) as session:
-        for day in (start_date + timedelta(n) for n in range((end_date - start_date).days)):
-            news_articles.extend([article.__dict__ for article in get_article_by_date(session=session, search_datetime=day)])
-    return news_articles
+        stmt = select(NewsArticle).where(_scraped_between(start_date, end_date)).order_by(NewsArticle.scraped_at)
+        return [{column: getattr(article, column) for column in columns} for article in session.execute(stmt).scalars().all()]
@@ -1,7 +1,15 @@
+from datetime import datetime
+from typing import Optional
 from uuid import uuid4
 
-from sqlalchemy import TIMESTAMP, Column, Index, MetaData, String, Text, func
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy import TIMESTAMP, Boolean, Index, MetaData, String, Text, false, func
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+# SQLite FTS5 index of the articles' title and body (MySQL uses the FULLTEXT index of the table instead)
+SEARCH_TABLE = "bd_news_digest_articles_fts"
+# Bangla vowel signs and the virama are marks (Mc, Mn). unicode61 splits words at marks by default, which
+# leaves only the consonants as tokens (so রাম and রুম both index as র and ম); they are kept inside tokens here
+SEARCH_TOKENIZER = "unicode61 remove_diacritics 0 categories 'L* N* Co Mc Mn'"
 
 # Use naming_convention so Alembic generates deterministic names across DBs
 # ix = Index, uq = Unique, fk = Foreign key, pk = Primary key, ck =
@@ -21,24 +29,29 @@ class Base(DeclarativeBase):
 class NewsArticle(Base):
     __tablename__ = "bd_news_digest_articles"
 
-    id = Column(String(36), primary_key=True, unique=True, default=str(uuid4()))
-    url = Column(String(512), nullable=False, unique=True)  # long enough for URLs
-    title = Column(String(512), nullable=True)
-    body = Column(Text, nullable=True)
-    fingerprint = Column(String(128), nullable=False, unique=True)  # e.g. sha256 hex
-    published_at = Column(TIMESTAMP(timezone=True), nullable=True)
-    source = Column(String(128), nullable=True)  # site identifier
-    source_url = Column(String(512), nullable=True)  # site url
-    category = Column(String(50), nullable=True)
-    scraped_at = Column(TIMESTAMP(timezone=True), nullable=False, default=func.now())
-    language = Column(String(10), nullable=True)
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, unique=True, default=str(uuid4()))
+    url: Mapped[str] = mapped_column(String(512), nullable=False, unique=True)  # long enough for URLs
+    title: Mapped[Optional[str]] = mapped_column(String(512), nullable=True)
+    body: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    fingerprint: Mapped[str] = mapped_column(String(128), nullable=False, unique=True)  # e.g. sha256 hex
+    published_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+    source: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)  # site identifier
+    source_url: Mapped[Optional[str]] = mapped_column(String(512), nullable=True)  # site url
+    category: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    scraped_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False, default=func.now())
+    language: Mapped[Optional[str]] = mapped_column(String(10), nullable=True)
+    # selected for a digest (see mark_articles_in_digest)
+    in_digest: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default=false())
 
     __table_args__ = (
         # Useful indexes
-        Index("ix_articles_published_at", "published_at"),
+        # (published_at, id) is the keyset of list_articles_page, with or without a source filter
+        Index("ix_articles_published_id", "published_at", "id"),
         Index("ix_articles_scraped_at", "scraped_at"),
-        Index("ix_articles_source_published", "source", "published_at"),
+        Index("ix_articles_source_published_id", "source", "published_at", "id"),
         Index("ix_articles_source_url", "source_url"),
+        # Full-text search of search_articles. The ngram parser tokenizes Bangla, which has no word list in MySQL
+        Index("ix_articles_fulltext", "title", "body", mysql_prefix="FULLTEXT", mysql_with_parser="ngram").ddl_if(dialect="mysql"),
         # MySQL-specific table options
         {
             "mysql_engine": "InnoDB",
@@ -0,0 +1,124 @@
+import logging
+import queue
+import threading
+import time
+from typing import Any, Optional
+
+from sqlalchemy.orm import sessionmaker
+
+from src.conf import DBConfig
+from src.utils import Article, metrics
+
+from .crud import upsert_articles_batch
+from .session import get_engine
+
+log = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class BatchedArticleWriter:
+    """Background DB writer of a scraper worker. Articles are queued as soon as they are compiled and a
+    thread upserts them in batches, flushed once `batch_size` articles are waiting or `flush_interval`
+    seconds after the first of them, so DB I/O overlaps with scraping.
+
+    The queue is bounded: when the DB falls behind by `max_pending` articles, write blocks the scraper
+    (backpressure) instead of growing memory. Upserts are idempotent, so a failed batch is simply
+    retried, and a batch that still fails is logged and left to the raw data files.
+    """
+
+    def __init__(
+        self,
+        database_config: DBConfig,
+        name: str,
+        batch_size: int = 100,
+        flush_interval: float = 5.0,
+        max_pending: int = 1000,
+        max_retries: int = 3,
+    ) -> None:
+        """
+        Args:
+            database_config (DBConfig): the database to write to
+            name (str): the writer name in logs and metrics, e.g. the news portal name
+            batch_size (int, optional): articles per upsert. Defaults to 100.
+            flush_interval (float, optional): maximum seconds an article waits for its batch to fill. Defaults to 5.0.
+            max_pending (int, optional): queued articles before write blocks. Defaults to 1000.
+            max_retries (int, optional): retries of a failed batch, with exponential backoff. Defaults to 3.
+        """
+        self.name = name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.rows_written = 0  # articles flushed, including ones the upsert found already stored
+        self.rows_inserted = 0  # articles flushed that were not stored yet
+        self.rows_failed = 0
+        self._engine = get_engine(cfg=database_config)
+        self._session_factory = sessionmaker(bind=self._engine, autoflush=False)
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name=f"db-writer-{name}", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "BatchedArticleWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def write(self, article: Article) -> None:
+        """Queues an article. Blocks while the queue is full
+
+        Args:
+            article (Article): the compiled article
+        """
+        started_at = time.perf_counter()
+        self._queue.put(article.to_db_row())
+        waited = time.perf_counter() - started_at
+        if waited > 0.01:
+            metrics.db_writer_blocked_seconds.labels(site=self.name).observe(waited)
+        metrics.db_writer_pending.labels(site=self.name).set(self._queue.qsize())
+
+    def close(self) -> None:
+        """Flushes the queued articles and stops the writer"""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        self._engine.dispose()
+        metrics.db_writer_pending.labels(site=self.name).set(0)
+        log.info(f"DB writer of {self.name} closed. {self.rows_written} articles written ({self.rows_inserted} new), {self.rows_failed} failed")
+
+    def _run(self) -> None:
+        batch: list[dict[str, Any]] = []
+        deadline: Optional[float] = None
+        stopping = False
+        while not stopping:
+            try:
+                timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+                item = self._queue.get(timeout=timeout)
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+                    deadline = deadline or time.monotonic() + self.flush_interval
+            except queue.Empty:
+                pass
+            if batch and (stopping or len(batch) >= self.batch_size or time.monotonic() >= (deadline or 0)):
+                self._flush(batch)
+                batch, deadline = [], None
+            metrics.db_writer_pending.labels(site=self.name).set(self._queue.qsize())
+
+    def _flush(self, batch: list[dict[str, Any]]) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self._session_factory() as session, session.begin():
+                    inserted = upsert_articles_batch(session, batch, batch_size=len(batch))
+                self.rows_written += len(batch)
+                self.rows_inserted += inserted
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self.rows_failed += len(batch)
+                    log.error(f"DB writer of {self.name} dropped a batch of {len(batch)} articles after {attempt + 1} attempts: {e}")
+                    return
+                backoff = 2**attempt
+                log.warning(f"DB writer of {self.name} failed to write {len(batch)} articles: {e}. Retrying in {backoff} seconds")
+                time.sleep(backoff)
@@ -4,10 +4,11 @@ from enum import Enum
 from .base_scraper import BaseScraper
 from .bonik_barta_scraper import BonikBartaScraper
 from .daily_star_scraper import DailyStarScraper
+from .feed_discovery import discover_links_from_feeds
 from .janakantha_scraper import JanakanthaScraper
 from .prothom_alo_scraper import ProthomAloScraper
 
-__all__ = ["BaseScraper", "BonikBartaScraper", "DailyStarScraper", "JanakanthaScraper", "ProthomAloScraper"]
+__all__ = ["BaseScraper", "BonikBartaScraper", "DailyStarScraper", "JanakanthaScraper", "ProthomAloScraper", "discover_links_from_feeds"]
 
 
 @dataclass
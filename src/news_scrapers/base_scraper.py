@@ -1,8 +1,10 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
 from logging import Logger
+from typing import Optional
 
 from src.conf import ScraperSiteConfig
+from src.utils import metrics
 from src.webdriver_bridge import WebDriverAdapter
 
 
@@ -14,13 +16,16 @@ class BaseScraper(ABC):
         self.site_config = site_config
         self.logger = logger
 
-    def get_url(self, url: str) -> None:
+    def get_url(self, url: str, ready_selectors: Optional[list[str]] = None) -> None:
         """Retrieves the URL to be scraped
 
         Args:
             url (str): the URL
+            ready_selectors (Optional[list[str]], optional): the selectors of the elements to be scraped. With selector
+            driven page readiness, the page counts as loaded once they are present. Defaults to None.
         """
-        self.adapter.retrieve_url(url=url)
+        self.adapter.retrieve_url(url=url, ready_selectors=ready_selectors)
+        metrics.pages_fetched.labels(site=self.site_config.name).inc()
 
     def extract_news_links(self) -> list[str]:
         """Extracts all news links published today
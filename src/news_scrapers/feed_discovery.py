@@ -0,0 +1,192 @@
+import gzip
+import logging
+import urllib.request
+from dataclasses import dataclass, field
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import IO, Any, Callable, Iterator, Optional, cast
+from urllib.error import URLError
+from urllib.parse import urlparse
+
+from defusedxml import DefusedXmlException
+from defusedxml.ElementTree import ParseError, iterparse
+
+from src.conf import ScraperSiteConfig
+from src.utils import CircuitBreaker, metrics, tracing
+
+logger = logging.getLogger(__name__)
+
+FEED_TIMEOUT = 15  # seconds
+FEED_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+MAX_CHILD_SITEMAPS = 5  # newest sitemaps read from a sitemap index
+
+
+@dataclass(slots=True)
+class FeedEntry:
+    url: str
+    published_at: Optional[datetime] = None  # local time, without tzinfo (like the scraped publishing datetimes)
+    categories: list[str] = field(default_factory=list)
+    is_sitemap: bool = False  # an entry of a sitemap index, pointing to another sitemap
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _parse_datetime(text: Optional[str]) -> Optional[datetime]:
+    """Parses RFC 822 (RSS) and ISO 8601 (Atom, sitemaps) dates into naive local time"""
+    if not text:
+        return None
+    text = text.strip()
+    try:
+        parsed = parsedate_to_datetime(text) if text[:1].isalpha() else datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except (TypeError, ValueError):
+        return None
+    return parsed.astimezone().replace(tzinfo=None) if parsed.tzinfo else parsed
+
+
+def parse_feed(stream: IO[bytes]) -> Iterator[FeedEntry]:
+    """Streaming parser of RSS 2.0, Atom, sitemaps (with the news extension) and sitemap indexes.
+    Every entry is yielded as soon as its element ends and is then cleared, so memory stays flat on big feeds.
+
+    Args:
+        stream (IO[bytes]): the feed document
+
+    Yields:
+        Iterator[FeedEntry]: the feed entries, in document order
+    """
+    # feeds are remote documents, so DTDs and entity expansion are refused (DefusedXmlException)
+    for _, element in iterparse(stream, events=("end",), forbid_dtd=True):
+        name = _local_name(element.tag)
+        if name not in ("item", "entry", "url", "sitemap"):
+            continue
+
+        url = ""
+        published: Optional[str] = None
+        categories: list[str] = []
+        for child in element.iter():
+            child_name = _local_name(child.tag)
+            if child_name in ("link", "loc") and not url:
+                # Atom links are in the href attribute, RSS links and sitemap locations in the text
+                if child.get("rel", "alternate") == "alternate":
+                    url = (child.get("href") or child.text or "").strip()
+            elif child_name in ("pubDate", "published", "publication_date") or (child_name in ("updated", "lastmod") and published is None):
+                published = child.text
+            elif child_name == "category":
+                term = child.get("term") or child.text
+                if term:
+                    categories.append(term.strip())
+        if url:
+            yield FeedEntry(url=url, published_at=_parse_datetime(published), categories=categories, is_sitemap=name == "sitemap")
+        element.clear()
+
+
+def fetch_feed(url: str, timeout: float = FEED_TIMEOUT, before_request: Optional[Callable[[], Any]] = None) -> Iterator[FeedEntry]:
+    """Fetches a feed over plain HTTP and parses it while it downloads. The newest sitemaps of a sitemap index are followed.
+
+    Args:
+        url (str): the RSS/Atom feed or (news) sitemap URL. A .gz URL is decompressed on the fly
+        timeout (float, optional): the request timeout in seconds. Defaults to FEED_TIMEOUT.
+        before_request (Optional[Callable[[], Any]], optional): called right before each request, the child sitemaps'
+        included, e.g. to wait for a rate limiter token. Defaults to None.
+
+    Yields:
+        Iterator[FeedEntry]: the article entries of the feed
+    """
+    request = urllib.request.Request(url, headers={"User-Agent": FEED_USER_AGENT})
+    child_sitemaps: list[FeedEntry] = []
+    if before_request is not None:
+        before_request()
+    with urllib.request.urlopen(request, timeout=timeout) as response:  # nosec: B310
+        stream = cast(IO[bytes], gzip.GzipFile(fileobj=response)) if url.endswith(".gz") else response
+        for entry in parse_feed(stream):
+            if entry.is_sitemap:
+                child_sitemaps.append(entry)
+            else:
+                yield entry
+
+    child_sitemaps.sort(key=lambda entry: entry.published_at or datetime.min, reverse=True)
+    for child in child_sitemaps[:MAX_CHILD_SITEMAPS]:
+        yield from fetch_feed(child.url, timeout=timeout, before_request=before_request)
+
+
+def map_category(entry: FeedEntry, url_list: dict[str, str]) -> Optional[str]:
+    """Maps a feed entry to one of the site categories: by a feed category of the same name,
+    else by the category page whose path is the longest prefix of the article path
+
+    Args:
+        entry (FeedEntry): the feed entry
+        url_list (dict[str, str]): the categories of the site and their listing page URLs
+
+    Returns:
+        Optional[str]: the category, None if the entry is of none of our categories
+    """
+    categories = {category.casefold(): category for category in url_list}
+    for term in entry.categories:
+        if term.casefold() in categories:
+            return categories[term.casefold()]
+
+    article_path = urlparse(entry.url).path
+    best_category, best_length = None, 0
+    for category, category_url in url_list.items():
+        category_path = urlparse(category_url).path.rstrip("/")
+        if category_path and article_path.startswith(category_path + "/") and len(category_path) > best_length:
+            best_category, best_length = category, len(category_path)
+    return best_category
+
+
+def discover_links_from_feeds(
+    site_config: ScraperSiteConfig,
+    since: datetime,
+    before_request: Optional[Callable[[], Any]] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+) -> dict[str, list[str]]:
+    """Discovers the news links of each category from the feeds of the site, newest first.
+    Entries published before `since` are dropped. A feed that can not be fetched or parsed is skipped;
+    its categories are then discovered in the browser
+
+    Args:
+        site_config (ScraperSiteConfig): the site config, with its `feeds`
+        since (datetime): the oldest publishing time of interest
+        before_request (Optional[Callable[[], Any]], optional): called right before each feed or sitemap request, e.g. to wait
+        for a token of the site's rate limiter. Defaults to None.
+        circuit_breaker (Optional[CircuitBreaker], optional): the site's circuit breaker. While it is open no feed is fetched,
+        and every feed read or failed is recorded on it. Defaults to None.
+
+    Returns:
+        dict[str, list[str]]: news links per category. Categories without feed entries are missing
+    """
+    entries: dict[str, list[FeedEntry]] = {}
+    seen: set[str] = set()
+    for feed in getattr(site_config, "feeds", None) or []:
+        feed_entries: list[tuple[str, FeedEntry]] = []
+        if circuit_breaker is not None and not circuit_breaker.allow_request():
+            logger.warning(f"Circuit of {site_config.name} is open. Skipping feed {feed.url}")
+            continue
+        with tracing.span("discovery.feed", site=site_config.name, url=feed.url):
+            try:
+                for entry in fetch_feed(feed.url, before_request=before_request):
+                    if entry.published_at is not None and entry.published_at < since:
+                        continue
+                    category = feed.category or map_category(entry, dict(site_config.url_list))
+                    if category is not None:
+                        feed_entries.append((category, entry))
+            except (URLError, ParseError, DefusedXmlException, OSError, EOFError) as e:
+                # A partly read feed may miss links, so none of its entries are used
+                logger.warning(f"Could not read feed {feed.url} of {site_config.name}: {e}. Falling back to the browser")
+                if circuit_breaker is not None:
+                    circuit_breaker.record_failure()
+                continue
+        if circuit_breaker is not None:
+            circuit_breaker.record_success()
+        for category, entry in feed_entries:
+            if entry.url not in seen:
+                seen.add(entry.url)
+                entries.setdefault(category, []).append(entry)
+
+    news_links: dict[str, list[str]] = {}
+    for category, category_entries in entries.items():
+        category_entries.sort(key=lambda entry: entry.published_at or datetime.max, reverse=True)
+        news_links[category] = [entry.url for entry in category_entries]
+        metrics.links_discovered.labels(site=site_config.name, source="feed").inc(len(news_links[category]))
+    return news_links
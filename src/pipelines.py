@@ -1,22 +1,56 @@
 import logging
-import time
 from datetime import date, datetime
-from random import randint
+from functools import partial
+from typing import Any, Callable, Optional
 from uuid import uuid4
 
 from tqdm import tqdm
 
-from src.news_scrapers import BaseScraper
+from src.news_scrapers import BaseScraper, discover_links_from_feeds
 from src.utils import (
+    Article,
+    CircuitBreaker,
+    DomainRateLimiter,
+    ListingValidatorCache,
     clear_from_vault,
     compute_news_article_fingerprint,
+    get_circuit_breaker,
+    get_rate_limiter,
     get_start_and_end_date,
+    metrics,
+    normalize,
+    profile_stage,
     read_from_vault,
     save_to_vault,
+    split_sentences,
+    tracing,
 )
 
 logger = logging.getLogger(__name__)
 
+# Callback receiving every compiled article as soon as it is produced (e.g. RawDataWriter.write).
+# The pipeline keeps no list of the articles, so a worker's memory does not grow with the articles it scrapes
+ArticleSink = Callable[[Article], None]
+
+
+def segment_news_body(news_body: str) -> tuple[list[str], list[str]]:
+    """Segments the news body once, into its summary and the sentences the similarity step compares
+
+    Args:
+        news_body (str): the news body
+
+    Returns:
+        tuple[list[str], list[str]]: the (at most) two bullet points, and the sentences of the first one.
+        An empty body gives a single placeholder bullet point and no sentences
+    """
+    paragraphs = news_body.split("\n")
+    if len(paragraphs) == 1:
+        sentences = [sentence if sentence.endswith(("।", "?", "!")) else f"{sentence}।" for sentence in split_sentences(news_body)[:2]]
+        if not sentences:
+            return ["।"], []
+        return sentences, sentences[:1]
+    return paragraphs[:2], split_sentences(paragraphs[0])
+
 
 def news_summary_generator(news_body: str) -> list[str]:
     """This is the news summary generator. It will generate the news summary
@@ -28,9 +62,53 @@ def news_summary_generator(news_body: str) -> list[str]:
     Returns:
         list[str]: the two bullet points
     """
-    if len(news_body.split("\n")) == 1:
-        return [f"{x}।" for x in news_body.split("।")[:2]]
-    return news_body.split("\n")[:2]
+    return segment_news_body(news_body)[0]
+
+
+def site_rate_limiter(scraper: BaseScraper) -> DomainRateLimiter:
+    """The rate limiter of the scraper's news portal, configured by its rate_limit site config
+
+    Args:
+        scraper (BaseScraper): the scraper
+
+    Returns:
+        DomainRateLimiter: the rate limiter, shared with every other task hitting the same domain
+    """
+    rate_limit = getattr(scraper.site_config, "rate_limit", None)
+    return get_rate_limiter(
+        base_url=scraper.site_config.base_url,
+        requests_per_minute=rate_limit.requests_per_minute if rate_limit else 0,
+        burst=rate_limit.burst if rate_limit else 1,
+        respect_robots=bool(rate_limit and rate_limit.respect_robots),
+    )
+
+
+def site_circuit_breaker(scraper: BaseScraper) -> CircuitBreaker:
+    """The circuit breaker of the scraper's news portal, configured by its circuit_breaker site config
+
+    Args:
+        scraper (BaseScraper): the scraper
+
+    Returns:
+        CircuitBreaker: the circuit breaker, shared with the other tasks of this worker
+    """
+    circuit_breaker = getattr(scraper.site_config, "circuit_breaker", None)
+    return get_circuit_breaker(
+        name=scraper.site_config.name,
+        failure_threshold=circuit_breaker.failure_threshold if circuit_breaker else 0,
+        reset_timeout=circuit_breaker.reset_timeout if circuit_breaker else 0,
+    )
+
+
+def wait_for_rate_limit(scraper: BaseScraper) -> None:
+    """Waits for a rate limiter token of the scraper's news portal. Every request to the portal, in the
+    browser or over plain HTTP, takes one
+
+    Args:
+        scraper (BaseScraper): the scraper
+    """
+    with tracing.span("rate_limit.wait", site=scraper.site_config.name):
+        site_rate_limiter(scraper).acquire()
 
 
 def extract_news_links_list(scraper: BaseScraper, url: str, max_retries: int) -> list[str]:
@@ -43,15 +121,28 @@ def extract_news_links_list(scraper: BaseScraper, url: str, max_retries: int) ->
         max_retries (int, optional): max retries for news links extraction.
 
     Returns:
-        list[str]: the news links list
+        list[str]: the news links list. Empty if the listing page could not be loaded
     """
-    scraper.get_url(url)
+    wait_for_rate_limit(scraper)
+    with tracing.span("discovery.listing", site=scraper.site_config.name, url=url):
+        try:
+            scraper.get_url(url, ready_selectors=[scraper.site_config.selectors.news_link_list])
+        except Exception as e:
+            # A failed listing only costs its category; the rest of the site is still scraped
+            site_circuit_breaker(scraper).record_failure()
+            logger.warning(f"Could not load the listing page {url} of {scraper.site_config.name}: {e}. Skipping its category")
+            return []
     news_links = []
     for _ in range(max_retries):
         try:
             news_links = scraper.extract_news_links()
+            site_circuit_breaker(scraper).record_success()
+            break
         except Exception:
             scraper.adapter.browser_refresh()
+    else:
+        site_circuit_breaker(scraper).record_failure()
+    metrics.links_discovered.labels(site=scraper.site_config.name, source="browser").inc(len(news_links))
     return news_links
 
 
@@ -65,14 +156,18 @@ def extract_from_single_news_link(scraper: BaseScraper, news_link: str) -> tuple
     Returns:
         tuple[str, datetime, str]: a tuple containing news title, publishing date and body (in this serial)
     """
-    scraper.get_url(news_link)
-    date_and_time = scraper.extract_publishing_datetime()
-    title = scraper.extract_news_title()
-    body = scraper.extract_news_body()
+    with tracing.span("article.extract", site=scraper.site_config.name, url=news_link):
+        scraper.get_url(
+            news_link,
+            ready_selectors=[scraper.site_config.selectors.datetime, scraper.site_config.selectors.title, scraper.site_config.selectors.body],
+        )
+        date_and_time = scraper.extract_publishing_datetime()
+        title = scraper.extract_news_title()
+        body = scraper.extract_news_body()
     return (title, date_and_time, body)
 
 
-def compile_extracted_data(scraper: BaseScraper, news_links: list[str], news_cat: str, vault_location: str) -> list[dict[str, str | list[str]]]:
+def compile_extracted_data(scraper: BaseScraper, news_links: list[str], news_cat: str, vault_location: str, on_article: ArticleSink) -> int:
     """Compile extracted data from news links using each scraper
 
     Args:
@@ -80,59 +175,105 @@ def compile_extracted_data(scraper: BaseScraper, news_links: list[str], news_cat
         news_links (list[str]): the list of news links
         news_cat (str): the news category mentioned in the news portal
         vault_location (str): vault for saving unscraped news links
+        on_article (ArticleSink): called with each article as soon as it is compiled
 
     Returns:
-        list[dict[str, str]]: news data compiled into a list. Each entry contains
-        a title, body and link of each news
+        int: the number of articles compiled
     """
     today, yesterday = get_start_and_end_date(end_timedelta=3 if datetime.now().strftime("%A") == "Sunday" else 1)
 
-    compiled_data: list[dict[str, str | list[str]]] = []
-    for news_link in tqdm(news_links):
-        time.sleep(randint(1, scraper.site_config.rate_limiter) if scraper.site_config.rate_limiter > 0 else 0)  # nosec: B311
+    compiled_count = 0
+    rate_limiter = site_rate_limiter(scraper)
+    circuit_breaker = site_circuit_breaker(scraper)
+    # Clearing the browser session after an article can wait, so it is done while waiting for the
+    # next rate limiter token instead of idling. Its failures are only logged
+    pending: list[Callable[[], None]] = []
+
+    def run_pending() -> None:
+        while pending:
+            try:
+                pending.pop(0)()
+            except Exception:
+                logger.warning(
+                    "Clearing the browser session after the previous article failed", exc_info=True, extra={"scraper": scraper.site_config.name}
+                )
+
+    # disable=None turns the progress bar off when not attached to a terminal (workers, cron), so it does not flood the logs
+    for i, news_link in enumerate(tqdm(news_links, disable=None, mininterval=5)):
+        if not circuit_breaker.allow_request():
+            # The site is failing. Its remaining links wait in the vault for a later probe, and the worker moves on
+            logger.warning(
+                f"Circuit of {scraper.site_config.name} is open. {len(news_links) - i} news links of {news_cat} handed to the vault",
+                extra={"scraper": scraper.site_config.name},
+            )
+            save_to_vault(website_name=scraper.site_config.name, news_cat=news_cat, vault_location=vault_location, link_list=news_links[i:])
+            break
+        # A prefetched link took its token when its background tab was opened
+        if not scraper.adapter.is_prefetched(news_link):
+            with tracing.span("rate_limit.wait", site=scraper.site_config.name):
+                rate_limiter.acquire(while_waiting=run_pending)
+        run_pending()
+        # The next links load in background tabs while this one is scraped, as long as the site's
+        # rate limit has tokens to spare, so prefetching never raises its request rate
+        scraper.adapter.prefetch(news_links[i + 1 :], can_request=lambda: rate_limiter.try_acquire() == 0)
         try:
-            title, date_and_time, body = extract_from_single_news_link(scraper=scraper, news_link=news_link)
+            try:
+                title, date_and_time, body = extract_from_single_news_link(scraper=scraper, news_link=news_link)
+            except Exception:
+                # Only the page loads count against the site; a failing sink is not the site's fault
+                circuit_breaker.record_failure()
+                raise
+            circuit_breaker.record_success()
+            # The same text encoded differently by two portals must give the same fingerprint and summary
+            title, body = normalize(title), normalize(body)
             if not (date_and_time > yesterday) and (date_and_time <= today):
                 continue
 
-            summary_points = news_summary_generator(news_body=body)
-            compiled_data.append(
-                {
-                    "id": str(uuid4()),
-                    "title": title,
-                    "body": body,
-                    "summary_points": summary_points,
-                    "published_at": str(date_and_time),
-                    "fingerprint": compute_news_article_fingerprint(title, body),
-                    "source": scraper.site_config.name,
-                    "source_url": scraper.site_config.base_url,
-                    "category": news_cat,
-                    "scraped_at": str(datetime.now()).split(".")[0],  # removing the micro second part
-                    "date": date.today().strftime("%B %d, %Y"),
-                    "language": "Bangla",
-                    "url": news_link,
-                }
+            summary_points, lead_sentences = segment_news_body(news_body=body)
+            article = Article(
+                id=str(uuid4()),
+                title=title,
+                body=body,
+                summary_points=summary_points,
+                published_at=str(date_and_time),
+                fingerprint=compute_news_article_fingerprint(title, body),
+                source=scraper.site_config.name,
+                source_url=scraper.site_config.base_url,
+                category=news_cat,
+                scraped_at=str(datetime.now()).split(".")[0],  # removing the micro second part
+                date=date.today().strftime("%B %d, %Y"),
+                language="Bangla",
+                url=news_link,
+                lead_sentences=lead_sentences,
             )
+            # A sink failure lands in the except below, so the link goes to the vault instead of being lost
+            on_article(article)
+            compiled_count += 1
+            metrics.articles_compiled.labels(site=scraper.site_config.name).inc()
             # Clearing browser session between sites
-            scraper.adapter.driver.delete_all_cookies()
-            scraper.adapter.driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            pending.append(scraper.adapter.driver.delete_all_cookies)
+            pending.append(partial(scraper.adapter.driver.execute_script, "window.localStorage.clear(); window.sessionStorage.clear();"))
         except Exception:
             logger.exception(
                 "Saving news link to vault",
                 extra={"scraper": scraper.site_config.name, "news_link": news_link},
             )
+            metrics.articles_failed.labels(site=scraper.site_config.name).inc()
 
-            save_to_vault(
-                website_name=scraper.site_config.name,
-                news_cat=news_cat,
-                vault_location=vault_location,
-                link_list=[news_link],
-            )
-    logger.info(f"{len(compiled_data)} valid news data compiled from {news_cat} in {scraper.site_config.name}")
-    return compiled_data
+            with tracing.span("vault.save", site=scraper.site_config.name, url=news_link):
+                save_to_vault(
+                    website_name=scraper.site_config.name,
+                    news_cat=news_cat,
+                    vault_location=vault_location,
+                    link_list=[news_link],
+                )
+    run_pending()
+    scraper.adapter.close_prefetched()
+    logger.info(f"{compiled_count} valid news data compiled from {news_cat} in {scraper.site_config.name}")
+    return compiled_count
 
 
-def extract_from_unscraped(scraper: BaseScraper, vault_location: str, max_retries: int = 5) -> list[dict[str, str | list[str]]]:
+def extract_from_unscraped(scraper: BaseScraper, vault_location: str, on_article: ArticleSink, max_retries: int = 5) -> int:
     """This method is intended to extract from those links that could not be scraped from
     using compile_extracted_data() method. This function will take the unscraped news links
     from the vault and scrap till the number of max_retries expires
@@ -140,14 +281,18 @@ def extract_from_unscraped(scraper: BaseScraper, vault_location: str, max_retrie
     Args:
         scraper (BaseScraper): the scraper to be used for scraping
         vault_location (str): vault to retrieve the list of unscraped news links from
+        on_article (ArticleSink): called with each article as soon as it is compiled
         max_retries (int): the number of retries the scraper should make to extract. Defaults to 5
 
     Returns:
-        list[dict[str, str]]: news data compiled into a list. Each entry contains
-        a title, body and link of each news
+        int: the number of articles compiled
     """
-    compiled_data: list[dict[str, str | list[str]]] = []
+    compiled_count = 0
+    circuit_breaker = site_circuit_breaker(scraper)
     for _ in range(max_retries):
+        if circuit_breaker.is_open:
+            logger.info(f"Circuit of {scraper.site_config.name} is open. Unscraped news links are kept in the vault for a later probe")
+            break
         logger.info("Attempting extraction from initially unscraped links...")
         unscraped_news_links = read_from_vault(website_name=scraper.site_config.name, vault_location=vault_location)
         if unscraped_news_links == {}:
@@ -160,17 +305,16 @@ def extract_from_unscraped(scraper: BaseScraper, vault_location: str, max_retrie
         # This step also adds any news link to the vault
         # that might have survived the extraction process
         for news_cat, news_links in unscraped_news_links.items():
-            compiled_data.extend(
-                compile_extracted_data(
-                    scraper=scraper,
-                    news_links=news_links,
-                    news_cat=news_cat,
-                    vault_location=vault_location,
-                )
+            compiled_count += compile_extracted_data(
+                scraper=scraper,
+                news_links=news_links,
+                news_cat=news_cat,
+                vault_location=vault_location,
+                on_article=on_article,
             )
 
     unscraped_news_links = read_from_vault(website_name=scraper.site_config.name, vault_location=vault_location)
-    if unscraped_news_links != {}:
+    if unscraped_news_links != {} and circuit_breaker.is_closed:
         logger.warning(
             f"News links from {len(unscraped_news_links)} categories still remain to be scraped even after {max_retries} retries",
             extra={"unscraped_news_links": unscraped_news_links},
@@ -178,40 +322,184 @@ def extract_from_unscraped(scraper: BaseScraper, vault_location: str, max_retrie
         clear_from_vault(website_name=scraper.site_config.name, vault_location=vault_location)
 
     logger.info(
-        f"{len(compiled_data)} valid news data compiled from unscraped news links \
+        f"{compiled_count} valid news data compiled from unscraped news links \
             list found under '{scraper.site_config.name}' in vault"
     )
-    return compiled_data
+    return compiled_count
+
+
+def extract_category(
+    scraper: BaseScraper,
+    news_cat: str,
+    news_cat_url: str,
+    vault_location: str,
+    max_retries: int,
+    on_article: ArticleSink,
+    feed_links: Optional[list[str]] = None,
+    skip_links: Optional[set[str]] = None,
+    validator_cache: Optional[ListingValidatorCache] = None,
+) -> int:
+    """Discovers the news links of a category and compiles its articles, unless its listing did not change
 
+    Args:
+        scraper (BaseScraper): the scraper to be used for extracting news data
+        news_cat (str): the news category
+        news_cat_url (str): the listing page URL of the category
+        vault_location (str): the vault location for storing unscraped news links
+        max_retries (int): number of times to retry the news links extraction
+        on_article (ArticleSink): called with each article as soon as it is compiled
+        feed_links (Optional[list[str]], optional): the news links of the category found in the site feeds. None discovers
+        them in the browser. Defaults to None.
+        skip_links (Optional[set[str]], optional): news links already scraped earlier today. Defaults to None.
+        validator_cache (Optional[ListingValidatorCache], optional): listing validators of the last run of the day. Defaults to None.
 
-def data_extraction_pipeline(scraper: BaseScraper, vault_location: str, max_retries: int) -> list[dict[str, str | list[str]]]:
+    Returns:
+        int: the number of articles compiled
+    """
+    # Feed and browser discovery of a category extract different link sets, so they are validated separately
+    validator_key = f"{news_cat_url}#feed" if feed_links is not None else news_cat_url
+    if (
+        validator_cache is not None
+        and feed_links is None
+        and validator_cache.is_not_modified(news_cat_url, before_request=partial(wait_for_rate_limit, scraper))
+    ):
+        logger.info(f"Listing of {news_cat} in {scraper.site_config.name} not modified since the last run. Skipping it")
+        return 0
+    if feed_links is None and not site_circuit_breaker(scraper).allow_request():
+        logger.warning(f"Circuit of {scraper.site_config.name} is open. Skipping the listing of {news_cat}")
+        return 0
+    with (
+        metrics.observe_stage("discovery"),
+        profile_stage("discovery", tag=f"{scraper.site_config.name}-{news_cat}"),
+        tracing.span("discovery", site=scraper.site_config.name, category=news_cat, source="feed" if feed_links is not None else "browser"),
+    ):
+        if feed_links is not None:
+            news_links = feed_links
+        else:
+            news_links = extract_news_links_list(scraper=scraper, url=news_cat_url, max_retries=max_retries)
+    logger.info(f"{len(news_links)} news links found for {news_cat} in {scraper.site_config.name}")
+    if validator_cache is not None and validator_cache.links_unchanged(validator_key, news_links):
+        logger.info(f"News links of {news_cat} in {scraper.site_config.name} unchanged since the last run. Skipping it")
+        validator_cache.commit(validator_key)
+        return 0
+    if skip_links:
+        news_links = [news_link for news_link in news_links if news_link not in skip_links]
+        logger.info(f"{len(news_links)} news links for {news_cat} in {scraper.site_config.name} are new since the last run")
+    with (
+        metrics.observe_stage("extraction"),
+        profile_stage("extraction", tag=f"{scraper.site_config.name}-{news_cat}"),
+        tracing.span("extraction", site=scraper.site_config.name, category=news_cat, links=len(news_links)),
+    ):
+        compiled_count = compile_extracted_data(
+            scraper=scraper,
+            news_links=news_links,
+            news_cat=news_cat,
+            vault_location=vault_location,
+            on_article=on_article,
+        )
+    if validator_cache is not None and news_links:
+        # An empty listing is most likely a failed one, so its validators are not kept and it is checked again next run
+        validator_cache.commit(validator_key)
+    return compiled_count
+
+
+def data_extraction_pipeline(
+    scraper: BaseScraper,
+    vault_location: str,
+    max_retries: int,
+    on_article: ArticleSink,
+    skip_links: Optional[set[str]] = None,
+    validator_cache: Optional[ListingValidatorCache] = None,
+) -> int:
     """The total pipeline for extracting news data from each scraper
 
     Args:
         scraper (BaseScraper): the scraper to be used for extracting news data
         vault_location (str): the vault location for storing unscraped news links
         max_retries (int): number of times to retry scraping news
+        on_article (ArticleSink): called with each article as soon as it is compiled, e.g. to stream raw data to disk
+        skip_links (Optional[set[str]], optional): news links already scraped earlier today, which are not scraped again. Defaults to None.
+        validator_cache (Optional[ListingValidatorCache], optional): listing validators of the last run of the day. A category whose
+        listing did not change since then is skipped. Defaults to None.
 
     Returns:
-        list[dict[str, str | list[str]]]: the compiled news data after extraction
+        int: the number of articles compiled
     """
-    compiled_data: list[dict[str, str | list[str]]] = []
+    compiled_count = 0
+    # Sites with feeds discover their links with a plain HTTP fetch per feed. A category without
+    # feed entries (or whose feed failed) is discovered in the browser
+    feed_links: dict[str, list[str]] = {}
+    if getattr(scraper.site_config, "feeds", None):
+        _, since = get_start_and_end_date(end_timedelta=3 if datetime.now().strftime("%A") == "Sunday" else 1)
+        with metrics.observe_stage("feed_discovery"):
+            feed_links = discover_links_from_feeds(
+                site_config=scraper.site_config,
+                since=since,
+                before_request=partial(wait_for_rate_limit, scraper),
+                circuit_breaker=site_circuit_breaker(scraper),
+            )
+
     for news_cat, news_cat_url in scraper.site_config.url_list.items():
-        news_links = extract_news_links_list(scraper=scraper, url=news_cat_url, max_retries=max_retries)
-        logger.info(f"{len(news_links)} news links found for {news_cat} in {scraper.site_config.name}")
-        compiled_data += compile_extracted_data(
+        compiled_count += extract_category(
             scraper=scraper,
-            news_links=news_links,
             news_cat=news_cat,
+            news_cat_url=news_cat_url,
             vault_location=vault_location,
+            max_retries=max_retries,
+            on_article=on_article,
+            feed_links=feed_links.get(news_cat),
+            skip_links=skip_links,
+            validator_cache=validator_cache,
         )
-        compiled_data += extract_from_unscraped(scraper=scraper, vault_location=vault_location, max_retries=max_retries)
-        del news_links  # destroying variable to save resource
-    return compiled_data
+        # The vault holds the unscraped links of every earlier category (and run), so it is retried
+        # whether or not the listing of this category was skipped
+        with (
+            metrics.observe_stage("unscraped_retry"),
+            profile_stage("unscraped_retry", tag=f"{scraper.site_config.name}-{news_cat}"),
+            tracing.span("unscraped_retry", site=scraper.site_config.name, category=news_cat),
+        ):
+            compiled_count += extract_from_unscraped(scraper=scraper, vault_location=vault_location, on_article=on_article, max_retries=max_retries)
+    return compiled_count
+
+
+def article_from_db_row(row: dict[str, Any]) -> Article:
+    """Rebuilds a compiled article from its database row (see get_articles_scraped_since), e.g. to
+    compile the digest of continuous mode. The summary points are not stored, so they are generated again
+
+    Args:
+        row (dict[str, Any]): the article columns
+
+    Returns:
+        Article: the article, in the form compile_extracted_data produces it
+    """
+
+    def _local(value: Optional[datetime]) -> str:
+        if value is None:
+            return ""
+        # timezone aware backends (Postgres) return aware datetimes, the pipeline works with naive local time
+        return str(value.astimezone().replace(tzinfo=None) if value.tzinfo else value).split(".")[0]
+
+    summary_points, lead_sentences = segment_news_body(news_body=row["body"] or "")
+    return Article(
+        id=row["id"],
+        title=row["title"] or "",
+        body=row["body"] or "",
+        summary_points=summary_points,
+        published_at=_local(row["published_at"]),
+        fingerprint=row["fingerprint"],
+        source=row["source"] or "",
+        source_url=row["source_url"] or "",
+        category=row["category"] or "",
+        scraped_at=_local(row["scraped_at"]),
+        date=date.today().strftime("%B %d, %Y"),
+        language=row["language"] or "",
+        url=row["url"],
+        lead_sentences=lead_sentences,
+    )
 
 
-def separate_into_categories(compiled_data: list[dict[str, str | list[str]]]) -> dict[str, list[dict[str, str | list[str]]]]:
-    cat_separated_data: dict[str, list[dict[str, str | list[str]]]] = {
+def separate_into_categories(compiled_data: list[Article]) -> dict[str, list[Article]]:
+    cat_separated_data: dict[str, list[Article]] = {
         "Economy": [],
         "Business": [],
         "Politics": [],
@@ -220,44 +508,48 @@ def separate_into_categories(compiled_data: list[dict[str, str | list[str]]]) ->
         "Others": [],
     }
     for data in compiled_data:
-        if str(data["category"]) == "National":
+        if data.category == "National":
             cat_separated_data["Bangladesh"].append(data)
-        elif str(data["category"]) in {"Sports", "Education", "Migration"}:
+        elif data.category in {"Sports", "Education", "Migration"}:
             cat_separated_data["Others"].append(data)
-        elif str(data["category"]) == "World":
+        elif data.category == "World":
             cat_separated_data["International"].append(data)
         else:
-            cat_separated_data[str(data["category"])].append(data)
+            cat_separated_data[data.category].append(data)
     return cat_separated_data
 
 
-def sort_by_timestamp(cat_separated_data: dict[str, list[dict[str, str | list[str]]]]) -> dict[str, list[dict[str, str | list[str]]]]:
+def sort_by_timestamp(cat_separated_data: dict[str, list[Article]]) -> dict[str, list[Article]]:
     for cat, news_list in cat_separated_data.items():
-        cat_separated_data[cat] = sorted(news_list, key=lambda x: x["published_at"])
+        cat_separated_data[cat] = sorted(news_list, key=lambda x: x.published_at)
     return cat_separated_data
 
 
 def remove_similar_news(
-    news_list: list[dict[str, str | list[str]]], similar_news_dict: dict[str, dict[str, str]], id_to_date: dict[str, str]
-) -> list[dict[str, str | list[str]]]:
+    news_list: list[Article],
+    similar_news_dict: dict[str, dict[str, str]],
+    id_to_date: dict[str, str],
+    since: Optional[datetime] = None,
+) -> list[Article]:
     """Keep only one instance of similar news
 
     Args:
-        news_list (list[dict[str, str | list[str]]]): today's scraped news list
+        news_list (list[Article]): today's scraped news list
         similar_news_dict (dict[str, dict[str, str]]): the news title list arranged based on similarity (found from model output)
         id_to_date (dict[str, str]): key-value pair of id and published date of news
+        since (Optional[datetime], optional): start of the digest period. Similar news collected before it are dropped. Defaults to today's midnight.
 
     Returns:
-        list[dict[str, str | list[str]]]: Reduced compiled news data
+        list[Article]: Reduced compiled news data
     """
-    id_to_news = {news["id"]: news for news in news_list}
+    id_to_news = {news.id: news for news in news_list}
     reduced_news_list = []
     for sent_list in similar_news_dict:
         # At first, we extract and sort the dates of each similar news list in ascending order.
         # We then check whether date_list has previous dates or not.
         # If found, it proves that similar news were collected before. We then skip the entire similar news list
         date_list = [id_to_date[id] for id in similar_news_dict[sent_list]]
-        if datetime.fromisoformat(sorted(date_list)[0]) < datetime.today().replace(hour=0, minute=0, second=0):
+        if datetime.fromisoformat(sorted(date_list)[0]) < (since or datetime.today().replace(hour=0, minute=0, second=0)):
             continue
         reduced_news_list.append(id_to_news[list(similar_news_dict[sent_list].keys())[0]])
     return reduced_news_list
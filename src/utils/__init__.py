@@ -1,27 +1,68 @@
-from .logger_setup import configure_child_logging, init_logging, log_queue
+from . import metrics, tracing
+from .article import Article
+from .bangla_text import bangla_to_english_datetime_parsing, normalize, split_sentences
+from .circuit_breaker import CircuitBreaker, get_circuit_breaker
+from .digest_state import DigestState
+from .listing_cache import ListingValidatorCache, hash_links
+from .logger_setup import configure_child_logging, get_log_queue, init_logging
+from .metrics import observe_stage, push_metrics, start_metrics_server
+from .online_clustering import OnlineClusterer
 from .other_utils import (
-    bangla_to_english_datetime_parsing,
+    build_email_message,
     compute_news_article_fingerprint,
     get_start_and_end_date,
     send_email,
+    send_emails,
 )
-from .save_data import save_processsed_data, save_raw_data
+from .profiler import configure_profiling, profile_stage
+from .rate_limiter import DomainRateLimiter, configure_rate_limiting, get_rate_limiter
+from .save_data import RawDataWriter, read_raw_data, save_processsed_data
 from .similarity_scorer import find_similar_sentences, get_translation
+from .task_store import load_config_snapshot, save_config_snapshot
+from .tracing import configure_tracing, current_trace_context, new_run_id, span
 from .vault import clear_from_vault, read_from_vault, save_to_vault
 
 __all__ = [
+    "Article",
     "compute_news_article_fingerprint",
     "get_start_and_end_date",
     "send_email",
+    "send_emails",
+    "build_email_message",
     "bangla_to_english_datetime_parsing",
+    "normalize",
+    "split_sentences",
     "save_processsed_data",
-    "save_raw_data",
+    "RawDataWriter",
+    "read_raw_data",
     "clear_from_vault",
     "read_from_vault",
     "save_to_vault",
     "init_logging",
     "configure_child_logging",
-    "log_queue",
+    "get_log_queue",
     "get_translation",
     "find_similar_sentences",
+    "DigestState",
+    "OnlineClusterer",
+    "ListingValidatorCache",
+    "hash_links",
+    "metrics",
+    "observe_stage",
+    "push_metrics",
+    "start_metrics_server",
+    "configure_profiling",
+    "profile_stage",
+    "tracing",
+    "configure_tracing",
+    "current_trace_context",
+    "new_run_id",
+    "span",
+    "DomainRateLimiter",
+    "configure_rate_limiting",
+    "get_rate_limiter",
+    "CircuitBreaker",
+    "get_circuit_breaker",
+    "load_config_snapshot",
+    "save_config_snapshot",
 ]
@@ -0,0 +1,79 @@
+import sys
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from typing import Any, Optional
+
+# Columns of the news article table, in the order Article.to_db_row returns them
+DB_COLUMNS = ("id", "url", "title", "body", "fingerprint", "published_at", "source", "source_url", "category", "scraped_at", "language")
+
+
+@dataclass(slots=True)
+class Article:
+    """A compiled news article. Slotted, so a record costs a fraction of the equivalent dict, and the
+    low-cardinality fields (source, source_url, category, date, language) are interned, so every
+    article of a site or day shares one string.
+
+    Code written against the old article dicts can still read it with article["title"] or
+    article.get("title"). to_dict/from_dict convert at the JSON boundaries (raw data, digest state)
+    and to_db_row at the database one.
+
+    lead_sentences are the sentences of the first summary point, segmented once when the article is
+    compiled and reused by the similarity step.
+    """
+
+    id: str
+    title: str
+    body: str
+    summary_points: list[str]
+    published_at: str
+    fingerprint: str
+    source: str
+    source_url: str
+    category: str
+    scraped_at: str
+    date: str
+    language: str
+    url: str
+    lead_sentences: list[str] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self.source = sys.intern(self.source)
+        self.source_url = sys.intern(self.source_url)
+        self.category = sys.intern(self.category)
+        self.date = sys.intern(self.date)
+        self.language = sys.intern(self.language)
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        return getattr(self, key, default)
+
+    def to_dict(self) -> dict[str, Any]:
+        """The article as the plain dict written to the raw data and digest state files"""
+        return {name: getattr(self, name) for name in ARTICLE_FIELDS}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Article":
+        """Builds an article from its dict form. Unknown keys are ignored, and fields with a default may be missing
+
+        Args:
+            data (dict[str, Any]): the article dict, e.g. a raw data record
+
+        Returns:
+            Article: the article
+        """
+        return cls(**{name: data[name] for name in ARTICLE_FIELDS if name in data})
+
+    def to_db_row(self) -> dict[str, Any]:
+        """The news article table row of the article, with its datetimes parsed"""
+        row = {name: getattr(self, name) for name in DB_COLUMNS}
+        row["published_at"] = datetime.fromisoformat(self.published_at) if self.published_at else None
+        row["scraped_at"] = datetime.fromisoformat(self.scraped_at)
+        return row
+
+
+ARTICLE_FIELDS = tuple(field.name for field in fields(Article))
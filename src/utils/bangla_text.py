@@ -0,0 +1,78 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+# Bangla digits to ASCII digits
+DIGIT_MAP = str.maketrans("০১২৩৪৫৬৭৮৯", "0123456789")
+# Bangla day, month and period names to their English equivalent, as strptime expects them
+DATETIME_TOKENS = {
+    "রবিবার": "Sunday",
+    "রোববার": "Sunday",
+    "সোমবার": "Monday",
+    "মঙ্গলবার": "Tuesday",
+    "বুধবার": "Wednesday",
+    "বৃহস্পতিবার": "Thursday",
+    "শুক্রবার": "Friday",
+    "শনিবার": "Saturday",
+    "জানুয়ারি": "January",
+    "ফেব্রুয়ারি": "February",
+    "মার্চ": "March",
+    "এপ্রিল": "April",
+    "মে": "May",
+    "জুন": "June",
+    "জুলাই": "July",
+    "আগস্ট": "August",
+    "সেপ্টেম্বর": "September",
+    "অক্টোবর": "October",
+    "নভেম্বর": "November",
+    "ডিসেম্বর": "December",
+    "পূর্বাহ্ন": "AM",
+    "অপরাহ্ন": "PM",
+}
+SENTENCE_TERMINATORS = "।?!"
+
+
+def normalize(text: str) -> str:
+    """NFC normalization of Bangla text. Portals encode letters like য় either precomposed or as
+    য + nukta, and NFC maps both to the same code points
+
+    Args:
+        text (str): the text
+
+    Returns:
+        str: the normalized text
+    """
+    return unicodedata.normalize("NFC", text)
+
+
+_TOKENS = {normalize(bn): en for bn, en in DATETIME_TOKENS.items()}
+# Longest first, so a token is never replaced by a shorter one it contains
+_TOKEN_RE = re.compile("|".join(re.escape(token) for token in sorted(_TOKENS, key=len, reverse=True)))
+_SENTENCE_RE = re.compile(rf"[^{SENTENCE_TERMINATORS}\n]+[{SENTENCE_TERMINATORS}]*")
+
+
+@lru_cache(maxsize=4096)
+def bangla_to_english_datetime_parsing(bd_date_and_time: str) -> str:
+    """Parse bangla date and time and transform it into its english equivalent. The articles of a
+    listing share a handful of date strings, so the results are cached
+
+    Args:
+        bd_date_and_time (str): the bangla date and time
+
+    Returns:
+        str: the transformed english date and time
+    """
+    return _TOKEN_RE.sub(lambda match: _TOKENS[match.group()], normalize(bd_date_and_time).translate(DIGIT_MAP))
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split Bangla text into sentences, on the dari (।), ? and ! and on line breaks. Every sentence
+    keeps its terminator
+
+    Args:
+        text (str): the text
+
+    Returns:
+        list[str]: the non-empty sentences, stripped
+    """
+    return [sentence for sentence in (match.group().strip() for match in _SENTENCE_RE.finditer(text)) if sentence.strip(SENTENCE_TERMINATORS)]
@@ -0,0 +1,109 @@
+import logging
+import threading
+import time
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+_breakers: dict[str, "CircuitBreaker"] = {}
+_breakers_lock = threading.Lock()
+
+
+class CircuitBreaker:
+    """Circuit breaker of a news portal. It opens after `failure_threshold` consecutive failed page
+    loads, and while it is open no page of the portal is fetched. After `reset_timeout` seconds it is
+    half-open: a single probe request is let through, which closes the circuit on success or opens it
+    again on failure.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float) -> None:
+        """
+        Args:
+            name (str): the news portal name (ScraperSiteConfig.name)
+            failure_threshold (int): consecutive failures that open the circuit. 0 or less never opens it
+            reset_timeout (float): seconds the circuit stays open before a probe is let through
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return CLOSED
+        if self._probing or time.monotonic() - self._opened_at < self.reset_timeout:
+            return OPEN
+        return HALF_OPEN
+
+    @property
+    def is_open(self) -> bool:
+        """Open and not yet due for a probe"""
+        return self.state == OPEN
+
+    @property
+    def is_closed(self) -> bool:
+        return self.state == CLOSED
+
+    def allow_request(self) -> bool:
+        """Whether a page of the portal may be fetched now. In the half-open state, only the first
+        caller gets True (the probe) until its outcome is recorded
+
+        Returns:
+            bool: True if the request may go ahead
+        """
+        with self._lock:
+            state = self.state
+            if state == HALF_OPEN:
+                self._probing = True
+                logger.info(f"Circuit of {self.name} is half-open. Probing the site")
+                return True
+            return state == CLOSED
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info(f"Circuit of {self.name} closed")
+            self.consecutive_failures = 0
+            self._opened_at = None
+            self._probing = False
+            metrics.circuit_state.labels(site=self.name).set(_STATE_VALUES[CLOSED])
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            if self._probing or (0 < self.failure_threshold <= self.consecutive_failures and self._opened_at is None):
+                self._opened_at = time.monotonic()
+                self._probing = False
+                metrics.circuit_opened.labels(site=self.name).inc()
+                metrics.circuit_state.labels(site=self.name).set(_STATE_VALUES[OPEN])
+                logger.warning(
+                    f"Circuit of {self.name} opened after {self.consecutive_failures} consecutive failures. "
+                    f"No page of the site is fetched for {self.reset_timeout} seconds"
+                )
+
+
+def get_circuit_breaker(name: str, failure_threshold: int, reset_timeout: float) -> CircuitBreaker:
+    """The circuit breaker of a news portal, shared by every task of this worker process
+
+    Args:
+        name (str): the news portal name (ScraperSiteConfig.name)
+        failure_threshold (int): consecutive failures that open the circuit. 0 or less never opens it
+        reset_timeout (float): seconds the circuit stays open before a probe is let through
+
+    Returns:
+        CircuitBreaker: the circuit breaker
+    """
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name=name, failure_threshold=failure_threshold, reset_timeout=reset_timeout)
+        return _breakers[name]
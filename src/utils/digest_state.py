@@ -0,0 +1,118 @@
+import json
+import logging
+import os
+from datetime import date
+
+from .article import Article
+from .online_clustering import OnlineClusterer
+from .similarity_scorer import SIMILARITY_DISTANCE_THRESHOLD, get_sentence_embeddings
+
+logger = logging.getLogger(__name__)
+
+
+class DigestState:
+    """Persistent state of a single day's digest, used to refresh the digest incrementally.
+
+    It keeps every accepted article link (so later runs only scrape new links), the online
+    dedup clusters of the articles, and the articles selected for the digest (one per cluster).
+    A refresh only translates, embeds and clusters the new articles. A state that is never saved
+    deduplicates the articles of a single run, added as each site finishes.
+    """
+
+    def __init__(self, state_location: str, digest_date: date) -> None:
+        """
+        Args:
+            state_location (str): the folder location where the daily state files are saved
+            digest_date (date): the date of the digest
+        """
+        self.filepath = os.path.join(state_location, f"digest_state_{digest_date.isoformat()}.json")
+        # article id -> {"url", "source", "cluster"}
+        self.articles: dict[str, dict[str, str]] = {}
+        # dedup clusters of the accepted articles, the representative of each is in the digest
+        self.clusterer = OnlineClusterer(distance_threshold=SIMILARITY_DISTANCE_THRESHOLD)
+        # articles chosen for the digest, in the order their clusters were created
+        self.digest_articles: list[Article] = []
+
+    @classmethod
+    def load(cls, state_location: str, digest_date: date) -> "DigestState":
+        """Load the state of the given date, or an empty state if none was saved yet
+
+        Args:
+            state_location (str): the folder location where the daily state files are saved
+            digest_date (date): the date of the digest
+
+        Returns:
+            DigestState: the digest state
+        """
+        state = cls(state_location=state_location, digest_date=digest_date)
+        if os.path.exists(state.filepath):
+            with open(state.filepath, "r") as f:
+                data = json.load(f)
+            state.articles = data["articles"]
+            if "clusterer" in data:
+                state.clusterer = OnlineClusterer.from_dict(data["clusterer"])
+            else:
+                # state saved before the online clusterer, with the representative of each cluster only
+                members: dict[str, list[str]] = {}
+                for id, article in state.articles.items():
+                    members.setdefault(article["cluster"], []).append(id)
+                clusters = {
+                    label: {
+                        **cluster,
+                        "members": [cluster["representative"]] + [id for id in members.get(label, []) if id != cluster["representative"]],
+                    }
+                    for label, cluster in data["clusters"].items()
+                }
+                state.clusterer = OnlineClusterer.from_dict({"distance_threshold": SIMILARITY_DISTANCE_THRESHOLD, "clusters": clusters})
+            state.digest_articles = [Article.from_dict(article) for article in data["digest_articles"]]
+            logger.info(f"Digest state loaded with {len(state.articles)} articles in {len(state.clusterer)} clusters")
+        return state
+
+    def save(self) -> None:
+        """Atomically write the state to disk"""
+        os.makedirs(os.path.dirname(self.filepath) or ".", exist_ok=True)
+        tmp_path = f"{self.filepath}.tmp"
+        with open(tmp_path, "w") as f:
+            digest_articles = [article.to_dict() for article in self.digest_articles]
+            json.dump({"articles": self.articles, "clusterer": self.clusterer.to_dict(), "digest_articles": digest_articles}, f)
+        os.replace(tmp_path, self.filepath)
+
+    def links_of(self, source: str) -> list[str]:
+        """Links of a news portal already accepted into today's digest state
+
+        Args:
+            source (str): the news portal name (ScraperSiteConfig.name)
+
+        Returns:
+            list[str]: the accepted news links
+        """
+        return [article["url"] for article in self.articles.values() if article["source"] == source]
+
+    def add_articles(self, news_list: list[Article], sentence_dict: dict[str, str]) -> list[Article]:
+        """Add new articles to the state. One by one, each new article either joins the closest
+        existing cluster (under the same cosine threshold used for deduplication) or starts a new
+        cluster and is added to the digest.
+
+        Args:
+            news_list (list[Article]): newly scraped news, not yet in the state
+            sentence_dict (dict[str, str]): id to the (translated) text used for similarity of each new news
+
+        Returns:
+            list[Article]: the new articles added to the digest
+        """
+        known_links = {article["url"] for article in self.articles.values()}
+        id_to_news = {news.id: news for news in news_list if news.url not in known_links}
+        ids = [id for id in sentence_dict if id in id_to_news]
+        if not ids:
+            return []
+
+        embeddings = get_sentence_embeddings([sentence_dict[id] for id in ids])
+        added_to_digest: list[Article] = []
+        for id, (label, created) in zip(ids, self.clusterer.add_many(ids, embeddings)):
+            news = id_to_news[id]
+            self.articles[id] = {"url": news.url, "source": news.source, "cluster": label}
+            if created:
+                added_to_digest.append(news)
+
+        self.digest_articles.extend(added_to_digest)
+        return added_to_digest
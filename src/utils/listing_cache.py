@@ -0,0 +1,139 @@
+import hashlib
+import json
+import logging
+import os
+import urllib.request
+from datetime import date
+from typing import Any, Callable, Optional
+from urllib.error import HTTPError, URLError
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+CONDITIONAL_GET_TIMEOUT = 10  # seconds
+CONDITIONAL_GET_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+
+def hash_links(links: list[str]) -> str:
+    """Order independent hash of a news link set
+
+    Args:
+        links (list[str]): the news links
+
+    Returns:
+        str: the hex digest
+    """
+    return hashlib.sha256("\n".join(sorted(set(links))).encode("utf-8")).hexdigest()
+
+
+class ListingValidatorCache:
+    """Persistent per-URL validators of the listing pages (and feeds) of a news portal, used to skip
+    the categories that did not change since the last run of the day.
+
+    A listing URL is checked in two steps: a conditional GET with the ETag/Last-Modified of the last
+    run (a 304 answer means the page is unchanged and the browser never loads it), then a hash of the
+    extracted link set. Validators are kept for the day only, so the first run of a day sees every
+    category. An entry is only committed after its category was processed, so a crashed run does not
+    make the next run skip unscraped news.
+    """
+
+    def __init__(self, cache_location: str, site_name: str, cache_date: Optional[date] = None) -> None:
+        """
+        Args:
+            cache_location (str): the folder location where the validator files are saved
+            site_name (str): the news portal name (ScraperSiteConfig.name)
+            cache_date (Optional[date], optional): the day the validators are valid for. Defaults to today.
+        """
+        self.site_name = site_name
+        self.cache_date = (cache_date or date.today()).isoformat()
+        self.filepath = os.path.join(cache_location, f"{site_name.lower().replace(' ', '_')}.json")
+        # url -> {"date", "etag", "last_modified", "conditional", "links_hash"}
+        self.entries: dict[str, dict[str, Any]] = {}
+        # validators seen in this run, committed once their category is processed
+        self._pending: dict[str, dict[str, Any]] = {}
+        if os.path.exists(self.filepath):
+            try:
+                with open(self.filepath, "r") as f:
+                    self.entries = {url: entry for url, entry in json.load(f).items() if entry.get("date") == self.cache_date}
+            except (OSError, ValueError):
+                logger.warning(f"Listing validator cache {self.filepath} is unreadable. Starting with an empty cache")
+
+    def save(self) -> None:
+        """Atomically write the validators to disk"""
+        os.makedirs(os.path.dirname(self.filepath) or ".", exist_ok=True)
+        tmp_path = f"{self.filepath}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.filepath)
+
+    def is_not_modified(self, url: str, timeout: float = CONDITIONAL_GET_TIMEOUT, before_request: Optional[Callable[[], Any]] = None) -> bool:
+        """Conditional GET of a listing page with the validators of the last run. Only the response
+        headers are read. A server that sent no validators, or answered with an HTTP error, is not asked
+        again for the rest of the day.
+
+        Args:
+            url (str): the listing page URL
+            timeout (float, optional): the request timeout in seconds. Defaults to CONDITIONAL_GET_TIMEOUT.
+            before_request (Optional[Callable[[], Any]], optional): called right before the request is sent, e.g. to wait
+            for a rate limiter token. Defaults to None.
+
+        Returns:
+            bool: True if the server answered 304 Not Modified
+        """
+        entry = self.entries.get(url, {})
+        if entry.get("conditional") is False:
+            return False
+        headers = {"User-Agent": CONDITIONAL_GET_USER_AGENT}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        if before_request is not None:
+            before_request()
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=timeout) as response:  # nosec: B310
+                etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        except HTTPError as e:
+            if e.code == 304:
+                metrics.categories_skipped.labels(site=self.site_name, reason="not_modified").inc()
+                return True
+            logger.info(f"Conditional GET of {url} failed with HTTP {e.code}. Loading it in the browser from now on")
+            self._pending.setdefault(url, {})["conditional"] = False
+            return False
+        except (URLError, OSError) as e:
+            logger.info(f"Conditional GET of {url} failed: {e}. Loading it in the browser")
+            return False
+
+        self._pending.setdefault(url, {}).update({"etag": etag, "last_modified": last_modified, "conditional": bool(etag or last_modified)})
+        return False
+
+    def links_unchanged(self, url: str, links: list[str]) -> bool:
+        """Compares the extracted link set of a listing page (or feed category) with the one of the last run
+
+        Args:
+            url (str): the listing page or feed URL the links were discovered from
+            links (list[str]): the extracted news links
+
+        Returns:
+            bool: True if the same links were extracted in the last run of the day
+        """
+        links_hash = hash_links(links)
+        self._pending.setdefault(url, {})["links_hash"] = links_hash
+        if links and self.entries.get(url, {}).get("links_hash") == links_hash:
+            metrics.categories_skipped.labels(site=self.site_name, reason="unchanged_links").inc()
+            return True
+        return False
+
+    def commit(self, url: str) -> None:
+        """Persists the validators seen for a URL in this run. Call it once the category is processed
+
+        Args:
+            url (str): the listing page or feed URL
+        """
+        pending = self._pending.pop(url, None)
+        if pending is None:
+            return
+        self.entries[url] = {**self.entries.get(url, {}), **pending, "date": self.cache_date}
+        self.save()
@@ -1,32 +1,232 @@
 import logging
 import os
+import queue
 import sys
-from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+import threading
+import time
+from collections import defaultdict, deque
+from logging.handlers import QueueHandler, TimedRotatingFileHandler
 from multiprocessing import Queue
+from typing import Any, Mapping, Optional, cast
 
 from pythonjsonlogger.json import JsonFormatter
 
-# Multiprocessing queue for log records
-log_queue: Queue = Queue(-1)  # infinite queue size
+from . import metrics
 
+DEFAULT_QUEUE_MAXSIZE = 10000
+_STOP = None  # listener sentinel
 
-def init_logging(root_logger: logging.Logger) -> None:
+# Multiprocessing queue for log records. Bounded, so a slow sink drops records instead of growing memory
+log_queue: Queue = Queue(DEFAULT_QUEUE_MAXSIZE)
+_logger_config: dict[str, Any] = {}
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Puts records on the bounded log queue without stalling the caller. On a full queue a record is dropped,
+    except with the `block` overflow policy, where WARNING and above wait up to `block_timeout` for room first.
+    The number of dropped records is logged as soon as the queue has room again.
+    """
+
+    def __init__(self, queue: Queue, overflow: str = "drop", block_timeout: float = 0.5) -> None:
+        super().__init__(queue)
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        block = self.overflow == "block" and record.levelno >= logging.WARNING
+        try:
+            if self.dropped:
+                self.queue.put_nowait(self._dropped_record())
+                self.dropped = 0
+            cast(Queue, self.queue).put(record, block=block, timeout=self.block_timeout if block else None)
+        except queue.Full:
+            self.dropped += 1
+            metrics.log_records_dropped.labels(reason="overflow").inc()
+
+    def _dropped_record(self) -> logging.LogRecord:
+        return logging.LogRecord(
+            name=__name__,
+            level=logging.WARNING,
+            pathname=__file__,
+            lineno=0,
+            msg=f"{self.dropped} log records dropped. The log queue was full",
+            args=None,
+            exc_info=None,
+        )
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps 1 of every `sample_every` INFO (and lower) records of the high-volume loggers. WARNING and above always pass"""
+
+    def __init__(self, sampled_loggers: list[str], sample_every: int) -> None:
+        super().__init__()
+        self.sampled_loggers = tuple(sampled_loggers)
+        self.sample_every = max(sample_every, 1)
+        self._seen: dict[str, int] = defaultdict(int)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.sample_every == 1 or record.levelno >= logging.WARNING or not record.name.startswith(self.sampled_loggers):
+            return True
+        self._seen[record.name] += 1
+        if (self._seen[record.name] - 1) % self.sample_every == 0:
+            return True
+        metrics.log_records_dropped.labels(reason="sampled").inc()
+        return False
+
+
+class ExceptionRateLimitFilter(logging.Filter):
+    """Limits the stack traces logged per site (the `scraper` extra, else the logger name) to `limit` per `window` seconds.
+    Records over the limit are kept, without the traceback. A bad run then logs every failure, but not thousands of stack dumps.
+    """
+
+    def __init__(self, limit: int, window: float) -> None:
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self._recent: dict[str, deque[float]] = defaultdict(deque)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not record.exc_info or self.limit < 0:
+            return True
+        key = str(getattr(record, "scraper", record.name))
+        now = time.monotonic()
+        recent = self._recent[key]
+        while recent and now - recent[0] > self.window:
+            recent.popleft()
+        if len(recent) < self.limit:
+            recent.append(now)
+            return True
+        exc_type = record.exc_info[0]
+        record.msg = (
+            f"{record.msg} [{exc_type.__name__ if exc_type else 'Exception'}, traceback suppressed: over {self.limit} in {self.window:g}s for {key}]"
+        )
+        record.exc_info = None
+        record.exc_text = None
+        return True
+
+
+class _BatchEmitMixin:
+    """Formats a batch of records and writes them with a single write and flush"""
+
+    def emit_batch(self, records: list[logging.LogRecord]) -> None:
+        handler: logging.StreamHandler = self  # type: ignore[assignment]
+        lines = []
+        for record in records:
+            try:
+                lines.append(handler.format(record) + handler.terminator)
+            except Exception:
+                handler.handleError(record)
+        if not lines:
+            return
+        with handler.lock:  # type: ignore[union-attr]
+            try:
+                if isinstance(handler, TimedRotatingFileHandler) and handler.shouldRollover(records[0]):
+                    handler.doRollover()
+                if handler.stream is None and isinstance(handler, logging.FileHandler):
+                    handler.stream = handler._open()
+                handler.stream.write("".join(lines))
+                handler.flush()
+            except Exception:
+                handler.handleError(records[0])
+
+
+class BatchStreamHandler(_BatchEmitMixin, logging.StreamHandler):
+    pass
+
+
+class BatchTimedRotatingFileHandler(_BatchEmitMixin, TimedRotatingFileHandler):
+    pass
+
+
+class BatchingQueueListener:
+    """Drains the log queue in a background thread. Records are taken from the queue in batches of up to
+    `batch_size`, and each handler formats and writes a batch at once instead of record by record
+    """
+
+    def __init__(self, queue: Queue, *handlers: logging.Handler, batch_size: int = 256) -> None:
+        self.queue = queue
+        self.handlers = handlers
+        self.batch_size = max(batch_size, 1)
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._monitor, name="log-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self.queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    def _monitor(self) -> None:
+        while True:
+            records = [self.queue.get()]
+            while records[-1] is not _STOP and len(records) < self.batch_size:
+                try:
+                    records.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = records[-1] is _STOP
+            if stop:
+                records.pop()
+            if records:
+                self.handle_batch(records)
+            if stop:
+                return
+
+    def handle_batch(self, records: list[logging.LogRecord]) -> None:
+        for handler in self.handlers:
+            batch = [record for record in records if record.levelno >= handler.level]
+            if not batch:
+                continue
+            if isinstance(handler, _BatchEmitMixin):
+                handler.emit_batch(batch)
+            else:
+                for record in batch:
+                    handler.handle(record)
+
+
+def get_log_queue() -> Queue:
+    """Returns:
+    Queue: the log queue of this process (replaced by init_logging when the configured size differs)
+    """
+    return log_queue
+
+
+def _queue_handler(log_queue: Queue) -> BoundedQueueHandler:
+    qh = BoundedQueueHandler(log_queue, overflow=_logger_config.get("overflow", "drop"), block_timeout=_logger_config.get("block_timeout", 0.5))
+    qh.addFilter(SamplingFilter(_logger_config.get("sampled_loggers", []), _logger_config.get("sample_every", 1)))
+    qh.addFilter(ExceptionRateLimitFilter(_logger_config.get("exception_rate_limit", 5), _logger_config.get("exception_window", 60.0)))
+    return qh
+
+
+def init_logging(root_logger: logging.Logger, logger_config: Optional[Mapping[str, Any]] = None) -> None:
     """This method updates the logger configuration already produced by Hydra
     with the custom logger configuration with a QueueListener to add multiprocessing logging
 
-    Returns:
-        tuple[logging.Logger, Queue, QueueListener]: logger, log_queue and the queue listener
+    Args:
+        root_logger (logging.Logger): the logger to send through the log queue
+        logger_config (Optional[Mapping[str, Any]], optional): the log pipeline config (see src.conf.LoggerConfig). Defaults to None.
     """
+    global log_queue, _logger_config
+    _logger_config = dict(logger_config or {})
+    queue_maxsize = _logger_config.get("queue_maxsize", DEFAULT_QUEUE_MAXSIZE)
+    if queue_maxsize != DEFAULT_QUEUE_MAXSIZE:
+        log_queue = Queue(queue_maxsize)
+
     # Logger String Format
     fmt = "%(asctime)s %(processName)s %(name)s %(levelname)s %(message)s"
 
     # STDOUT handler with JSON formatting
-    stdout_handler = logging.StreamHandler(sys.stdout)
+    stdout_handler = BatchStreamHandler(sys.stdout)
     stdout_fmt = JsonFormatter(fmt=fmt)
     stdout_handler.setFormatter(stdout_fmt)
 
     # File handler with daily rotation
-    file_handler = TimedRotatingFileHandler(
+    file_handler = BatchTimedRotatingFileHandler(
         filename=os.path.join("./outputs", "celery_app.log"),  # TODO: Fix logger location
         when="midnight",
         backupCount=7,  # keep one week of logs
@@ -35,19 +235,17 @@ def init_logging(root_logger: logging.Logger) -> None:
     file_fmt = JsonFormatter(fmt=fmt)
     file_handler.setFormatter(file_fmt)
 
-    # QueueListener for the main process
-    listener = QueueListener(log_queue, stdout_handler, file_handler, respect_handler_level=True)
+    # Batching listener for the main process
+    listener = BatchingQueueListener(log_queue, stdout_handler, file_handler, batch_size=_logger_config.get("batch_size", 256))
     listener.start()
 
     # Base Logger
-    qh = QueueHandler(log_queue)
     root_logger.setLevel(logging.INFO)
     root_logger.handlers = []  # ensures listener is the one writing logs
-    root_logger.addHandler(qh)
+    root_logger.addHandler(_queue_handler(log_queue))
 
 
-def configure_child_logging(root_logger: logging.Logger, log_queue: Queue) -> None:
-    qh = QueueHandler(log_queue)
+def configure_child_logging(root_logger: logging.Logger, log_queue: Optional[Queue] = None) -> None:
     root_logger.handlers = []
-    root_logger.addHandler(qh)
+    root_logger.addHandler(_queue_handler(log_queue if log_queue is not None else get_log_queue()))
     root_logger.setLevel(logging.INFO)
@@ -0,0 +1,108 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Generator
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    push_to_gateway,
+    start_http_server,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _metric(kind: str, name: str, documentation: str, labelnames: tuple[str, ...] = (), **kwargs: Any) -> Any:
+    metric_class = {"counter": Counter, "gauge": Gauge, "histogram": Histogram}[kind]
+    return metric_class(name, documentation, labelnames, registry=registry, **kwargs)
+
+
+# All project metrics live in their own registry, so pushes only carry project metrics
+registry = CollectorRegistry()
+
+WAIT_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+STAGE_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+driver_cold_start_seconds = _metric(
+    "histogram", "bnd_driver_cold_start_seconds", "Time from task start to the first page load of the browser", ("site",), buckets=WAIT_BUCKETS
+)
+pages_fetched = _metric("counter", "bnd_pages_fetched_total", "Pages loaded in the browser", ("site",))
+element_wait_seconds = _metric(
+    "histogram", "bnd_element_wait_seconds", "Time WebDriverAdapter.extract_elements waited for elements", ("site", "outcome"), buckets=WAIT_BUCKETS
+)
+stage_duration_seconds = _metric(
+    "histogram", "bnd_stage_duration_seconds", "Duration of crawl and pipeline stages", ("stage",), buckets=STAGE_BUCKETS
+)
+links_discovered = _metric("counter", "bnd_links_discovered_total", "News links discovered per source (feed or browser)", ("site", "source"))
+rate_limit_wait_seconds = _metric(
+    "histogram", "bnd_rate_limit_wait_seconds", "Time spent waiting for a rate limiter token", ("domain",), buckets=WAIT_BUCKETS
+)
+circuit_state = _metric("gauge", "bnd_circuit_state", "Circuit breaker state per site (0 closed, 1 half-open, 2 open)", ("site",))
+circuit_opened = _metric("counter", "bnd_circuit_opened_total", "Times the circuit breaker of a site opened", ("site",))
+categories_skipped = _metric("counter", "bnd_categories_skipped_total", "Categories skipped because their listing did not change", ("site", "reason"))
+articles_compiled = _metric("counter", "bnd_articles_compiled_total", "Articles successfully compiled", ("site",))
+articles_failed = _metric("counter", "bnd_articles_failed_total", "Article links that failed and went to the vault", ("site",))
+requests_blocked = _metric("counter", "bnd_requests_blocked_total", "Requests blocked by the interception policy", ("site", "resource_type"))
+bytes_blocked_estimate = _metric("counter", "bnd_bytes_blocked_estimate_total", "Estimated bytes not downloaded due to blocked requests", ("site",))
+page_bytes_transferred = _metric(
+    "histogram",
+    "bnd_page_bytes_transferred",
+    "Bytes transferred per page load",
+    ("site",),
+    buckets=(50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000, 10_000_000),
+)
+vault_links = _metric("gauge", "bnd_vault_links", "Unscraped news links currently waiting in the vault", ("site",))
+model_batch_seconds = _metric("histogram", "bnd_model_batch_seconds", "Latency of a translation / embedding batch", ("model",), buckets=WAIT_BUCKETS)
+model_batch_items = _metric("counter", "bnd_model_items_total", "Sentences sent through translation / embedding", ("model",))
+db_rows_inserted = _metric("counter", "bnd_db_rows_inserted_total", "Article rows inserted into the database")
+db_insert_seconds = _metric("histogram", "bnd_db_insert_seconds", "Latency of a database insert chunk", buckets=WAIT_BUCKETS)
+db_writer_pending = _metric("gauge", "bnd_db_writer_pending", "Articles queued in the batched DB writer of a site", ("site",))
+db_writer_blocked_seconds = _metric(
+    "histogram", "bnd_db_writer_blocked_seconds", "Time the scraper waited on a full DB writer queue", ("site",), buckets=WAIT_BUCKETS
+)
+task_queue_lag_seconds = _metric(
+    "histogram", "bnd_task_queue_lag_seconds", "Time between publishing a Celery task and a worker starting it", ("task",), buckets=STAGE_BUCKETS
+)
+log_records_dropped = _metric("counter", "bnd_log_records_dropped_total", "Log records dropped by the log pipeline", ("reason",))
+task_duration_seconds = _metric("histogram", "bnd_task_duration_seconds", "Celery task run time", ("task", "state"), buckets=STAGE_BUCKETS)
+
+
+@contextmanager
+def observe_stage(stage: str) -> Generator[None]:
+    """Record the duration of a pipeline stage
+
+    Args:
+        stage (str): the stage name used as metric label
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_duration_seconds.labels(stage=stage).observe(time.perf_counter() - start)
+
+
+def start_metrics_server(port: int) -> None:
+    """Expose the project metrics over HTTP for Prometheus to scrape (worker side)
+
+    Args:
+        port (int): the port to listen on
+    """
+    start_http_server(port, registry=registry)
+    logger.info(f"Metrics exporter listening on port {port}")
+
+
+def push_metrics(gateway_url: str, job_name: str) -> None:
+    """Push the project metrics to a Prometheus pushgateway (orchestrator side, short-lived runs)
+
+    Args:
+        gateway_url (str): the pushgateway address, e.g. localhost:9091
+        job_name (str): the job label of the pushed metrics
+    """
+    try:
+        push_to_gateway(gateway_url, job=job_name, registry=registry)
+        logger.info(f"Metrics pushed to {gateway_url}")
+    except OSError as e:
+        logger.warning(f"Could not push metrics to {gateway_url}: {e}")
@@ -0,0 +1,128 @@
+from typing import Any, Optional
+
+import numpy as np
+
+
+class OnlineClusterer:
+    """Incremental clustering of sentence embeddings. Each new embedding joins the cluster with the
+    closest centroid if its cosine distance is within `distance_threshold`, or starts a new cluster,
+    so items can be clustered one by one as they arrive instead of once the whole batch exists.
+
+    Centroids are kept as running means, and the first member of a cluster is its representative.
+    to_dict/from_dict give its JSON state, which DigestState persists with the rest of the day's digest.
+    """
+
+    def __init__(self, distance_threshold: float) -> None:
+        """
+        Args:
+            distance_threshold (float): cosine distance under which an embedding joins a cluster
+        """
+        self.distance_threshold = distance_threshold
+        self.labels: list[str] = []
+        # cluster label -> item ids, representative first
+        self.members: dict[str, list[str]] = {}
+        # item id -> cluster label
+        self.assignments: dict[str, str] = {}
+        # Row i is the centroid of labels[i]. Rows are preallocated and doubled when full, so adding a
+        # cluster does not copy every centroid
+        self._centroids = np.empty((0, 0), dtype=np.float32)
+        self._norms = np.empty(0, dtype=np.float32)
+        self._sizes: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def add(self, item_id: str, embedding: np.ndarray) -> tuple[str, bool]:
+        """Assigns an item to its cluster. An item already added keeps its cluster
+
+        Args:
+            item_id (str): the unique item id (e.g. the article id)
+            embedding (np.ndarray): the item's sentence embedding
+
+        Returns:
+            tuple[str, bool]: the cluster label, and whether the item started a new cluster
+        """
+        if item_id in self.assignments:
+            return self.assignments[item_id], False
+        embedding = np.asarray(embedding, dtype=np.float32)
+        index = self._closest_cluster(embedding)
+        if index is None:
+            label = self._new_cluster(embedding, size=1)
+            self.members[label] = [item_id]
+            created = True
+        else:
+            label = self.labels[index]
+            self.members[label].append(item_id)
+            # running mean of the centroid
+            self._sizes[index] += 1
+            self._centroids[index] += (embedding - self._centroids[index]) / self._sizes[index]
+            self._norms[index] = np.linalg.norm(self._centroids[index])
+            created = False
+        self.assignments[item_id] = label
+        return label, created
+
+    def add_many(self, item_ids: list[str], embeddings: np.ndarray) -> list[tuple[str, bool]]:
+        """Adds items in order. See add
+
+        Args:
+            item_ids (list[str]): the unique item ids
+            embeddings (np.ndarray): the sentence embeddings, one row per item
+
+        Returns:
+            list[tuple[str, bool]]: the cluster label of each item, and whether it started a new cluster
+        """
+        return [self.add(item_id, embedding) for item_id, embedding in zip(item_ids, embeddings)]
+
+    def representative(self, label: str) -> str:
+        return self.members[label][0]
+
+    def _new_cluster(self, centroid: np.ndarray, size: int, label: Optional[str] = None) -> str:
+        index = len(self.labels)
+        if index == len(self._centroids):
+            grown = np.empty((max(2 * index, 16), len(centroid)), dtype=np.float32)
+            if index:
+                grown[:index] = self._centroids[:index]
+            self._centroids = grown
+            self._norms = np.resize(self._norms, len(grown))
+        self._centroids[index] = centroid
+        self._norms[index] = np.linalg.norm(centroid)
+        self._sizes.append(size)
+        label = label if label is not None else str(index)
+        self.labels.append(label)
+        return label
+
+    def _closest_cluster(self, embedding: np.ndarray) -> Optional[int]:
+        n_clusters = len(self.labels)
+        if not n_clusters:
+            return None
+        similarities = self._centroids[:n_clusters] @ embedding / (self._norms[:n_clusters] * np.linalg.norm(embedding) + 1e-12)
+        best = int(np.argmax(similarities))
+        return best if 1 - similarities[best] <= self.distance_threshold else None
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON serializable state of the clusterer"""
+        return {
+            "distance_threshold": self.distance_threshold,
+            "clusters": {
+                label: {"centroid": self._centroids[index].tolist(), "size": self._sizes[index], "members": self.members[label]}
+                for index, label in enumerate(self.labels)
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "OnlineClusterer":
+        """Rebuilds a clusterer from its to_dict state
+
+        Args:
+            data (dict[str, Any]): the state
+
+        Returns:
+            OnlineClusterer: the clusterer
+        """
+        clusterer = cls(distance_threshold=data["distance_threshold"])
+        for label, cluster in data["clusters"].items():
+            clusterer._new_cluster(np.asarray(cluster["centroid"], dtype=np.float32), size=cluster["size"], label=label)
+            clusterer.members[label] = list(cluster["members"])
+            for item_id in cluster["members"]:
+                clusterer.assignments[item_id] = label
+        return clusterer
@@ -4,6 +4,11 @@ import os
 import smtplib
 from datetime import datetime, timedelta
 from email.message import EmailMessage
+from typing import Mapping, Optional
+
+# Most providers cap a message at 25 MB; base64 encoding inflates an attachment by about a third
+MAX_ATTACHMENT_BYTES = 18 * 1024 * 1024
+SMTP_TIMEOUT = 60
 
 
 # TODO: Need to update
@@ -30,52 +35,6 @@ def get_start_and_end_date(end_timedelta: int, today: bool = True, start_timedel
     )
 
 
-def bangla_to_english_datetime_parsing(bd_date_and_time: str) -> str:
-    """Parse bangla date and time and transform it into its english equivalent
-
-    Args:
-        bd_date_and_time (str): the bangla date and time
-
-    Returns:
-        str: the transformed english date and time
-    """
-    time_map = str.maketrans("০১২৩৪৫৬৭৮৯", "0123456789")
-    month_map = {
-        "জানুয়ারি": "January",
-        "জানুয়ারি": "January",  # same but different. check utf code
-        "ফেব্রুয়ারি": "February",
-        "মার্চ": "March",
-        "এপ্রিল": "April",
-        "মে": "May",
-        "জুন": "June",
-        "জুলাই": "July",
-        "আগস্ট": "August",
-        "সেপ্টেম্বর": "September",
-        "অক্টোবর": "October",
-        "নভেম্বর": "November",
-        "ডিসেম্বর": "December",
-    }
-    day_map = {
-        "রবিবার": "Sunday",
-        "রোববার": "Sunday",
-        "সোমবার": "Monday",
-        "মঙ্গলবার": "Tuesday",
-        "বুধবার": "Wednesday",
-        "বৃহস্পতিবার": "Thursday",
-        "শুক্রবার": "Friday",
-        "শনিবার": "Saturday",
-    }
-    period_map = {"পূর্বাহ্ন": "AM", "অপরাহ্ন": "PM"}
-    date_and_time = bd_date_and_time.translate(time_map)
-    for bn, en in day_map.items():
-        date_and_time = date_and_time.replace(bn, en)
-    for bn, en in month_map.items():
-        date_and_time = date_and_time.replace(bn, en)
-    for bn, en in period_map.items():
-        date_and_time = date_and_time.replace(bn, en)
-    return date_and_time
-
-
 def compute_news_article_fingerprint(title: str | None, body: str | None) -> str:
     text = (title or "") + "\n" + (body or "")
     return hashlib.sha256(text.encode("utf-8")).hexdigest()
@@ -92,6 +51,48 @@ def send_email(
     attachment_path: str | None = None,
     starttls: bool = True,
 ) -> None:
+    msg = build_email_message(
+        email_subject=email_subject,
+        email_body=email_body,
+        from_addr=from_addr,
+        to_addr=to_addr,
+        cc_addr=cc_addr,
+        attachment_path=attachment_path,
+    )
+    # aggregate recipients
+    recipients = list(to_addr)
+    if cc_addr:
+        recipients += cc_addr
+    if bcc_addr:
+        recipients += bcc_addr
+
+    send_emails(smtp_config=smtp_config, messages=[(msg, recipients)], starttls=starttls)
+    return
+
+
+def build_email_message(
+    email_subject: str,
+    email_body: str,
+    from_addr: str,
+    to_addr: list[str],
+    cc_addr: list[str] | None = None,
+    attachment_path: str | None = None,
+    max_attachment_bytes: int = MAX_ATTACHMENT_BYTES,
+) -> EmailMessage:
+    """Build a plain text email message with an optional file attachment
+
+    Args:
+        email_subject (str): the email subject
+        email_body (str): the plain text email body
+        from_addr (str): the sender address
+        to_addr (list[str]): the "To" addresses
+        cc_addr (list[str] | None, optional): the "Cc" addresses. Defaults to None.
+        attachment_path (str | None, optional): the file to attach. Defaults to None.
+        max_attachment_bytes (int, optional): the largest attachment accepted. Defaults to MAX_ATTACHMENT_BYTES.
+
+    Returns:
+        EmailMessage: the email message
+    """
     msg = EmailMessage()
     msg["Subject"] = email_subject
     msg["From"] = from_addr
@@ -103,25 +104,52 @@ def send_email(
     msg.set_content(email_body)
 
     if attachment_path:
-        email_file_attachment(attachment_path, msg)
-    # aggregate recipients
-    recipients = list(to_addr)
-    if cc_addr:
-        recipients += cc_addr
-    if bcc_addr:
-        recipients += bcc_addr
+        email_file_attachment(attachment_path, msg, max_attachment_bytes=max_attachment_bytes)
+    return msg
+
 
-    with smtplib.SMTP(str(smtp_config["host"]), int(smtp_config["port"])) as server:
+def send_emails(
+    smtp_config: Mapping[str, str | int | None],
+    messages: list[tuple[EmailMessage, list[str]]],
+    starttls: bool = True,
+    delivered: Optional[set[int]] = None,
+) -> set[int]:
+    """Send several email messages (e.g. one per recipient group) over a single SMTP connection
+
+    Args:
+        smtp_config (Mapping[str, str | int | None]): host, port, user and password of the SMTP server.
+        Login is skipped when no user is given (e.g. a local aiosmtpd stand-in)
+        messages (list[tuple[EmailMessage, list[str]]]): each message with its envelope recipients
+        starttls (bool, optional): upgrade the connection with STARTTLS. Defaults to True.
+        delivered (Optional[set[int]], optional): indices of the messages already delivered, which are not sent again.
+        It is updated as each message is accepted, so after a failure it holds the messages that went out. Defaults to None.
+
+    Returns:
+        set[int]: indices of the messages delivered
+    """
+    delivered = set() if delivered is None else delivered
+    pending = [index for index in range(len(messages)) if index not in delivered]
+    if not pending:
+        return delivered
+    with smtplib.SMTP(str(smtp_config["host"]), int(smtp_config["port"] or 0), timeout=SMTP_TIMEOUT) as server:
         server.ehlo()
         if starttls:
             server.starttls()
             server.ehlo()
-        server.login(str(smtp_config["user"]), str(smtp_config["password"]))
-        server.send_message(msg, from_addr=from_addr, to_addrs=recipients)
-    return
+        if smtp_config.get("user"):
+            server.login(str(smtp_config["user"]), str(smtp_config["password"]))
+        for index in pending:
+            msg, recipients = messages[index]
+            server.send_message(msg, from_addr=str(msg["From"]), to_addrs=recipients)
+            delivered.add(index)
+    return delivered
+
 
+def email_file_attachment(attachment_path: str, msg: EmailMessage, max_attachment_bytes: int = MAX_ATTACHMENT_BYTES) -> None:
+    attachment_size = os.path.getsize(attachment_path)
+    if attachment_size > max_attachment_bytes:
+        raise ValueError(f"Attachment {attachment_path} is {attachment_size} bytes, larger than the {max_attachment_bytes} bytes allowed")
 
-def email_file_attachment(attachment_path: str, msg: EmailMessage) -> None:
     filename = os.path.basename(attachment_path)
     ctype, encoding = mimetypes.guess_type(attachment_path)
     if ctype is None or encoding is not None:
@@ -0,0 +1,136 @@
+import cProfile
+import itertools
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from types import FrameType
+from typing import Any, Generator, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ENV = "BND_PROFILE"
+
+_settings: dict[str, Any] = {"enabled": False}
+_active = threading.local()
+_sequence = itertools.count()
+
+
+def configure_profiling(profiling_config: Optional[Mapping[str, Any]]) -> None:
+    """Set the profiling settings of this process. The `BND_PROFILE` environment variable takes precedence
+    over the config: `0` disables profiling, `all` profiles every stage, anything else is a comma separated list of stages.
+
+    Args:
+        profiling_config (Optional[Mapping[str, Any]]): the profiling config (see src.conf.ProfilingConfig)
+    """
+    global _settings
+    settings = dict(profiling_config or {"enabled": False})
+    env_value = os.getenv(PROFILE_ENV, "").strip()
+    if env_value:
+        settings["enabled"] = env_value.lower() not in ("0", "false", "no", "off")
+        if settings["enabled"] and env_value.lower() not in ("1", "true", "yes", "on", "all"):
+            settings["stages"] = [stage.strip() for stage in env_value.split(",") if stage.strip()]
+        elif env_value.lower() == "all":
+            settings["stages"] = []
+    _settings = settings
+    if settings["enabled"]:
+        logger.info(f"Profiling enabled for {settings.get('stages') or 'all stages'}. Profiles are written to {settings.get('output_dir')}")
+
+
+def is_profiled(stage: str) -> bool:
+    if not _settings["enabled"]:
+        return False
+    stages = _settings.get("stages")
+    return not stages or stage in stages
+
+
+class StackSampler:
+    """Samples the call stack of a single thread at a fixed interval and counts identical stacks.
+    The counts are written in the collapsed stack format understood by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[self._collapse(frame)] += 1
+
+    @staticmethod
+    def _collapse(frame: Optional[FrameType]) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def write(self, path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+@contextmanager
+def profile_stage(stage: str, tag: str = "") -> Generator[None]:
+    """Profile a stage if profiling is enabled for it. When it is not, this costs a dictionary lookup.
+    Artifacts are written as `<output_dir>/<stage>[-<tag>]-<pid>-<timestamp>-<seq>.pstats|.collapsed`.
+    A stage nested in an already profiled stage is part of the outer profile and is not profiled again.
+
+    Args:
+        stage (str): the stage (or task) name matched against the configured stages
+        tag (str, optional): extra part of the artifact name, e.g. the site name. Defaults to "".
+    """
+    if not is_profiled(stage) or getattr(_active, "stage", None) is not None:
+        yield
+        return
+
+    _active.stage = stage
+    profiler = cProfile.Profile() if _settings.get("deterministic", True) else None
+    sampler = (
+        StackSampler(thread_id=threading.get_ident(), interval=_settings.get("sample_interval", 0.005)) if _settings.get("sampling", True) else None
+    )
+    if sampler is not None:
+        sampler.start()
+    if profiler is not None:
+        try:
+            profiler.enable()
+        except ValueError:  # another profiler is already active in this process
+            logger.warning(f"Could not start the deterministic profiler for {stage}. Only sampling it")
+            profiler = None
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        if sampler is not None:
+            sampler.stop()
+        _active.stage = None
+
+        output_dir = Path(_settings.get("output_dir") or "./profiles")
+        output_dir.mkdir(parents=True, exist_ok=True)
+        name = "-".join(
+            part for part in (stage, tag.lower().replace(" ", "_"), str(os.getpid()), time.strftime("%Y%m%d_%H%M%S"), str(next(_sequence))) if part
+        )
+        if profiler is not None:
+            profiler.dump_stats(output_dir / f"{name}.pstats")
+        if sampler is not None:
+            sampler.write(output_dir / f"{name}.collapsed")
+        logger.info(f"Profile of {stage} written to {output_dir / name}.*")
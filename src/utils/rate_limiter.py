@@ -0,0 +1,206 @@
+import logging
+import threading
+import time
+import urllib.request
+from typing import Any, Callable, Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+ROBOTS_TIMEOUT = 10  # seconds
+ROBOTS_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+REDIS_KEY_PREFIX = "bnd:rate_limit:"
+REDIS_RETRY_AFTER = 60  # seconds on the in-process buckets after Redis failed, before trying it again
+
+# Refills the bucket of a domain and takes a token if there is one. Returns the seconds to wait for
+# the next token ("0" if one was taken). The Redis clock is used, so every worker sees the same time
+_BUCKET_REFILL_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(now - ts, 0) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 60)
+return tostring(wait)
+"""
+
+_redis_url = ""
+_redis_script: Optional[Any] = None  # registered Lua script, None until first use
+_redis_down_until = 0.0  # monotonic time until which this process uses the in-process buckets
+_limiters: dict[str, "DomainRateLimiter"] = {}
+_limiters_lock = threading.Lock()
+
+
+def configure_rate_limiting(redis_url: str) -> None:
+    """Sets the Redis server shared by every worker. Without one (or while it is unreachable), the
+    buckets are kept in-process, so only the tasks of the same worker share them
+
+    Args:
+        redis_url (str): redis:// URL, e.g. the Celery result backend. Empty keeps the buckets in-process
+    """
+    global _redis_url, _redis_script, _redis_down_until
+    _redis_url = redis_url if redis_url.startswith(("redis://", "rediss://", "unix://")) else ""
+    _redis_script = None
+    _redis_down_until = 0.0
+
+
+def _get_redis_script() -> Optional[Any]:
+    global _redis_script, _redis_down_until
+    if not _redis_url or time.monotonic() < _redis_down_until:
+        return None
+    if _redis_script is None:
+        try:
+            import redis
+
+            client = redis.Redis.from_url(_redis_url, socket_timeout=2, socket_connect_timeout=2)
+            _redis_script = client.register_script(_BUCKET_REFILL_SCRIPT)
+        except ImportError:
+            logger.warning("redis is not installed. Rate limits are kept per worker process")
+            _redis_down_until = float("inf")
+    return _redis_script
+
+
+def robots_crawl_delay(base_url: str, timeout: float = ROBOTS_TIMEOUT) -> Optional[float]:
+    """Seconds between requests asked for by the robots.txt of a site (Crawl-delay or Request-rate)
+
+    Args:
+        base_url (str): the site URL
+        timeout (float, optional): the request timeout in seconds. Defaults to ROBOTS_TIMEOUT.
+
+    Returns:
+        Optional[float]: the delay, None if robots.txt asks for none or could not be read
+    """
+    parsed = urlparse(base_url)
+    robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+    try:
+        request = urllib.request.Request(robots_url, headers={"User-Agent": ROBOTS_USER_AGENT})
+        with urllib.request.urlopen(request, timeout=timeout) as response:  # nosec: B310
+            lines = response.read().decode("utf-8", errors="replace").splitlines()
+    except (OSError, ValueError) as e:
+        logger.info(f"robots.txt of {parsed.netloc} could not be read: {e}")
+        return None
+
+    parser = RobotFileParser(robots_url)
+    parser.parse(lines)
+    delays = []
+    crawl_delay = parser.crawl_delay("*")
+    if crawl_delay:
+        delays.append(float(crawl_delay))
+    request_rate = parser.request_rate("*")
+    if request_rate and request_rate.requests:
+        delays.append(request_rate.seconds / request_rate.requests)
+    return max(delays) if delays else None
+
+
+class DomainRateLimiter:
+    """Token bucket of a domain. Tokens refill at `rate` per second up to `burst`, and every request
+    to the domain takes one. The bucket lives in Redis when configured, so all the tasks hitting a
+    portal (e.g. a retry task and a main task on other workers) share it.
+    """
+
+    def __init__(self, domain: str, requests_per_minute: float, burst: int = 1) -> None:
+        """
+        Args:
+            domain (str): the domain (netloc) the bucket is for
+            requests_per_minute (float): the sustained request rate. 0 or less means unlimited
+            burst (int, optional): requests allowed back to back after an idle period. Defaults to 1.
+        """
+        self.domain = domain
+        self.rate = requests_per_minute / 60
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _try_acquire_local(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def try_acquire(self) -> float:
+        """Takes a token if one is available, without waiting
+
+        Returns:
+            float: 0 if a token was taken, else the seconds until the next one
+        """
+        global _redis_down_until
+        if self.rate <= 0:
+            return 0.0
+        script = _get_redis_script()
+        if script is not None:
+            try:
+                return float(script(keys=[f"{REDIS_KEY_PREFIX}{self.domain}"], args=[self.rate, self.burst]))
+            except Exception as e:
+                logger.warning(f"Redis rate limiter unavailable ({e}). Using in-process rate limits for {REDIS_RETRY_AFTER} seconds")
+                _redis_down_until = time.monotonic() + REDIS_RETRY_AFTER
+        return self._try_acquire_local()
+
+    def acquire(self, while_waiting: Optional[Callable[[], None]] = None) -> float:
+        """Waits for a token. While waiting, the caller's pending work is done first, and only the
+        rest of the wait is slept
+
+        Args:
+            while_waiting (Optional[Callable[[], None]], optional): work to do instead of idling, called once
+            if there is a wait. Defaults to None.
+
+        Returns:
+            float: the seconds spent waiting
+        """
+        started_at = time.perf_counter()
+        wait = self.try_acquire()
+        if wait > 0 and while_waiting is not None:
+            token_at = started_at + wait
+            while_waiting()
+            time.sleep(max(token_at - time.perf_counter(), 0))
+            wait = self.try_acquire()
+        while wait > 0:
+            # Another worker may have taken the token we waited for
+            time.sleep(wait)
+            wait = self.try_acquire()
+        waited = time.perf_counter() - started_at
+        metrics.rate_limit_wait_seconds.labels(domain=self.domain).observe(waited)
+        return waited
+
+
+def get_rate_limiter(base_url: str, requests_per_minute: float, burst: int = 1, respect_robots: bool = False) -> DomainRateLimiter:
+    """The rate limiter of a domain, shared by everything in this process that hits it
+
+    Args:
+        base_url (str): a URL of the site
+        requests_per_minute (float): the configured request rate. 0 or less means unlimited
+        burst (int, optional): requests allowed back to back. Defaults to 1.
+        respect_robots (bool, optional): lower the rate to the Crawl-delay of the site's robots.txt. Defaults to False.
+
+    Returns:
+        DomainRateLimiter: the rate limiter
+    """
+    domain = urlparse(base_url).netloc
+    with _limiters_lock:
+        if domain not in _limiters:
+            if respect_robots:
+                delay = robots_crawl_delay(base_url)
+                if delay:
+                    robots_rpm = 60 / delay
+                    requests_per_minute = min(requests_per_minute, robots_rpm) if requests_per_minute > 0 else robots_rpm
+                    logger.info(f"robots.txt of {domain} asks for {delay:.1f}s between requests")
+            _limiters[domain] = DomainRateLimiter(domain=domain, requests_per_minute=requests_per_minute, burst=burst)
+            logger.info(f"Rate limit of {domain}: {requests_per_minute or 'unlimited'} requests per minute, burst {burst}")
+        return _limiters[domain]
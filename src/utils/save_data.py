@@ -1,12 +1,15 @@
-import contextlib
+import gzip
+import io
 import json
+import logging
 import os
 import re
+from bisect import bisect_right
 from copy import deepcopy
 from datetime import date
-from typing import Any, Optional
+from itertools import accumulate
+from typing import Any, Iterator, Optional, cast
 
-from docx import Document
 from docx.document import Document as DocumentClass
 from docx.opc.oxml import BaseOxmlElement
 from docx.oxml import OxmlElement
@@ -15,26 +18,193 @@ from docx.parts.story import StoryPart
 from docx.text.paragraph import Paragraph
 from docxtpl import DocxTemplate
 
+from .article import Article
 
-def save_raw_data(data: list[dict[str, str | list[str]]], save_location: str, filename: str) -> None:
-    """Save compiled news data as JSON
+logger = logging.getLogger(__name__)
+
+# crude-but-useful URL regex
+URL_RE = re.compile(r"(https?://[^\s\)\]\>]+)")
+HYPERLINK_RELTYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/hyperlink"
+
+# Compressed framing supported by the raw data writer, keyed by file suffix
+RAW_COMPRESSION_SUFFIX = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+
+class RawDataWriter:
+    """Append-only JSON Lines sink for raw news data. Every record is written as soon as it
+    is produced, so a crash late in the run only loses the records after the last fsync.
+
+    Files are named ``<stem>.<part>.jsonl[.gz|.zst]`` and rotated once the current part
+    grows beyond ``max_bytes`` on disk. Compressed parts are flushed as complete frames
+    (gzip sync flush / zstd frame end) on every fsync, so partially written parts stay readable.
+    """
+
+    def __init__(
+        self,
+        save_location: str,
+        filename: str,
+        compression: Optional[str] = None,
+        fsync_every: int = 50,
+        max_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        """
+        Args:
+            save_location (str): the folder location where the parts will be saved
+            filename (str): the base filename. A trailing ``.jsonl``/``.json`` is stripped
+            compression (Optional[str], optional): ``gzip``, ``zstd`` or None. Defaults to None.
+            fsync_every (int, optional): number of records between fsyncs. Defaults to 50.
+            max_bytes (int, optional): on-disk size of a part before rotation. Defaults to 64 MiB.
+        """
+        if compression not in RAW_COMPRESSION_SUFFIX:
+            raise ValueError(f"Unsupported raw data compression: {compression}")
+        if not os.path.exists(save_location):
+            os.makedirs(save_location)
+
+        self.save_location = save_location
+        self.stem = re.sub(r"\.jsonl?$", "", filename)
+        self.compression = compression
+        self.fsync_every = max(fsync_every, 1)
+        self.max_bytes = max_bytes
+        self.records_written = 0
+
+        self._part = len(_list_raw_parts(save_location, self.stem))
+        self.first_part = self._part  # parts written by this writer, see read_raw_data(first_part=...)
+        self._pending = 0
+        self._raw: Optional[io.BufferedWriter] = None
+        self._stream: Optional[io.BufferedIOBase] = None
+        self._open_part()
+
+    @property
+    def current_path(self) -> str:
+        return os.path.join(self.save_location, f"{self.stem}.{self._part:05d}.jsonl{RAW_COMPRESSION_SUFFIX[self.compression]}")
+
+    def _open_part(self) -> None:
+        self._raw = open(self.current_path, "ab")
+        if self.compression == "gzip":
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode="ab")
+        elif self.compression == "zstd":
+            self._stream = _zstd_module().ZstdCompressor().stream_writer(self._raw, closefd=False)
+        else:
+            self._stream = self._raw
+
+    def _close_part(self) -> None:
+        if self._stream is None or self._raw is None:
+            return
+        self.flush()
+        if self._stream is not self._raw:
+            self._stream.close()
+        self._raw.close()
+        self._stream, self._raw = None, None
+
+    def write(self, record: dict[str, Any]) -> None:
+        """Append a single record to the current part
+
+        Args:
+            record (dict[str, Any]): a JSON serializable record
+        """
+        if self._stream is None:
+            raise ValueError("RawDataWriter is closed")
+        self._stream.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.records_written += 1
+        self._pending += 1
+        if self._pending >= self.fsync_every:
+            self.flush()
+            if self._raw is not None and self._raw.tell() >= self.max_bytes:
+                self._close_part()
+                self._part += 1
+                self._open_part()
+
+    def flush(self) -> None:
+        """Flush the compression frame and fsync the current part to disk"""
+        if self._stream is None or self._raw is None:
+            return
+        if self.compression == "zstd":
+            self._stream.flush(_zstd_module().FLUSH_FRAME)  # type: ignore[call-arg]
+        else:
+            self._stream.flush()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._pending = 0
+
+    def close(self) -> None:
+        self._close_part()
+
+    def __enter__(self) -> "RawDataWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def read_raw_data(save_location: str, filename: str, first_part: int = 0) -> Iterator[dict[str, Any]]:
+    """Lazily stream records written by RawDataWriter back, part by part. A truncated
+    tail (e.g. from a crashed run) ends the stream of that part instead of raising.
 
     Args:
-        data (list[dict[str, str | list[str]]]): the compiled news data
-        save_location (str): the folder location where file will be saved
-        filename (str): as name suggests
+        save_location (str): the folder location where the parts were saved
+        filename (str): the base filename given to the writer
+        first_part (int, optional): skip the parts before it, e.g. RawDataWriter.first_part to read only what one writer wrote. Defaults to 0.
+
+    Yields:
+        Iterator[dict[str, Any]]: the raw records in the order they were written
     """
+    stem = re.sub(r"\.jsonl?$", "", filename)
+    for path in _list_raw_parts(save_location, stem)[first_part:]:
+        if path.endswith(".gz"):
+            stream: io.BufferedIOBase = gzip.GzipFile(path, "rb")
+        elif path.endswith(".zst"):
+            stream = _zstd_module().ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True, closefd=True)
+        else:
+            stream = open(path, "rb")
+        with stream:
+            try:
+                for line in _iter_lines(stream) if path.endswith(".zst") else stream:
+                    if line.strip():
+                        yield json.loads(line)
+            except (EOFError, json.JSONDecodeError, _zstd_errors()):
+                logger.warning(f"Truncated raw data part found at {path}. Remaining records of the part are skipped")
+
+
+def _iter_lines(stream: io.BufferedIOBase, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+    # zstd stream readers do not support line iteration, so lines are split manually
+    buffer = b""
+    while chunk := stream.read(chunk_size):
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        yield from lines
+    if buffer:
+        yield buffer
+
+
+def _list_raw_parts(save_location: str, stem: str) -> list[str]:
     if not os.path.exists(save_location):
-        os.makedirs(save_location)
-    with open(os.path.join(save_location, filename), "w") as f:
-        json.dump(data, f)
+        return []
+    part_re = re.compile(rf"^{re.escape(stem)}\.\d{{5}}\.jsonl(\.gz|\.zst)?$")
+    return sorted(os.path.join(save_location, f) for f in os.listdir(save_location) if part_re.match(f))
+
+
+def _zstd_module() -> Any:
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("zstd compressed raw data requires the 'zstandard' package (the zstd extra)") from e
+    return zstandard
+
+
+def _zstd_errors() -> type[Exception]:
+    try:
+        import zstandard
+    except ImportError:
+        return EOFError
+    return cast(type[Exception], zstandard.ZstdError)
 
 
-def save_processsed_data(data: dict[str, list[dict[str, str | list[str]]]], save_location: str, filename: str, template: str) -> None:
-    """Save compiled news data as DOCX
+def save_processsed_data(data: dict[str, list[Article]], save_location: str, filename: str, template: str) -> None:
+    """Save compiled news data as DOCX. The template is rendered and its plaintext URLs are
+    converted to hyperlinks in memory, so the document is written to disk only once.
 
     Args:
-        data (dict[str, list[dict[str, str | list[str]]]]): the compiled news data
+        data (dict[str, list[Article]]): the compiled news data
         save_location (str): the folder location where file will be saved
         filename (str): as name suggests
         template (str): .DOCX template filepath to use for compiling news data
@@ -42,34 +212,27 @@ def save_processsed_data(data: dict[str, list[dict[str, str | list[str]]]], save
     if not os.path.exists(save_location):
         os.makedirs(save_location)
 
-    filepath = os.path.join(save_location, filename)
-    tmp_path = filepath.replace(".docx", ".tmp.docx")
-
     tpl = DocxTemplate(template_file=template)
     tpl.render(context={"news": data, "header_date": date.today().strftime("%A, %d %B, %Y")})
-    tpl.save(tmp_path)
-
-    doc = Document(tmp_path)
-    _walk_and_replace(doc)
-    doc.save(filepath)
 
-    # cleanup tmp
-    with contextlib.suppress(OSError):
-        os.remove(tmp_path)
+    # docxtpl keeps the rendered python-docx document in memory until it is saved
+    _walk_and_replace(tpl.docx)
+    tpl.save(os.path.join(save_location, filename))
 
 
-def _add_hyperlink(document_part: StoryPart, url: str, text: str, rPr_copy: Optional[Any] = None) -> BaseOxmlElement:
+def _add_hyperlink(
+    document_part: StoryPart, url: str, text: str, rPr_copy: Optional[Any] = None, rel_cache: Optional[dict[str, str]] = None
+) -> BaseOxmlElement:
     """
     Build a <w:hyperlink> element with a child <w:r> containing rPr_copy (if given)
     and a <w:t> text node for `text`.
     Returns the hyperlink OxmlElement.
     """
     # create relationship id for hyperlink target
-    r_id = document_part.relate_to(
-        url,
-        reltype="http://schemas.openxmlformats.org/officeDocument/2006/relationships/hyperlink",
-        is_external=True,
-    )
+    if rel_cache is None:
+        r_id = document_part.relate_to(url, reltype=HYPERLINK_RELTYPE, is_external=True)
+    else:
+        r_id = _relate_hyperlink_cached(document_part, url, rel_cache)
 
     hyperlink = OxmlElement("w:hyperlink")
     hyperlink.set(qn("r:id"), r_id)
@@ -91,15 +254,29 @@ def _add_hyperlink(document_part: StoryPart, url: str, text: str, rPr_copy: Opti
     return hyperlink
 
 
-def _process_paragraph_replace_urls(paragraph: Paragraph) -> None:
+def _relate_hyperlink_cached(document_part: StoryPart, url: str, rel_cache: dict[str, str]) -> str:
+    """python-docx's relate_to() scans every existing relationship (and again for the next rId)
+    per call, which is quadratic over a digest with thousands of links. Hyperlink rIds are
+    looked up in rel_cache (url -> rId) instead and new relationships are added directly.
+    """
+    if url in rel_cache:
+        return rel_cache[url]
+    rels = document_part.rels
+    next_idx = len(rels) + 1
+    while f"rId{next_idx}" in rels:
+        next_idx += 1
+    r_id = f"rId{next_idx}"
+    rels.add_relationship(HYPERLINK_RELTYPE, url, r_id, is_external=True)
+    rel_cache[url] = r_id
+    return r_id
+
+
+def _process_paragraph_replace_urls(paragraph: Paragraph, rel_cache: Optional[dict[str, str]] = None) -> None:
     # sourcery skip: low-code-quality
     """
     Replace URL substrings inside a paragraph with actual hyperlinks.
     Preserves surrounding text segments.
     """
-    # crude-but-useful URL regex
-    URL_RE = re.compile(r"(https?://[^\s\)\]\>]+)")
-
     # gather runs and their text
     runs = list(paragraph.runs)
     if not runs:
@@ -107,34 +284,29 @@ def _process_paragraph_replace_urls(paragraph: Paragraph) -> None:
 
     run_texts = [r.text or "" for r in runs]
     full_text = "".join(run_texts)
-    if not URL_RE.search(full_text):
+    # Find URL matches in the concatenated text
+    matches = list(URL_RE.finditer(full_text))
+    if not matches:
         return  # nothing to do
 
-    # Build a per-character mapping to original run index
-    char_run_idx: list[int] = []
-    for idx, txt in enumerate(run_texts):
-        char_run_idx.extend([idx] * len(txt))
+    # Start offset of each run in the concatenated text, to map a character back to its run
+    run_starts = list(accumulate((len(txt) for txt in run_texts[:-1]), initial=0))
+
+    def source_run_idx(char_idx: int) -> int | None:
+        return bisect_right(run_starts, char_idx) - 1 if char_idx < len(full_text) else None
 
-    # Find URL matches in the concatenated text
-    matches = list(URL_RE.finditer(full_text))
     # Build segments: (text_segment, is_url, src_run_idx)
     parts: list[tuple[str, bool, int | None]] = []
     last_end = 0
     for m in matches:
         if m.start() > last_end:
             # non-url segment
-            seg_text = full_text[last_end : m.start()]
-            src_idx = char_run_idx[last_end] if last_end < len(char_run_idx) else None
-            parts.append((seg_text, False, src_idx))
+            parts.append((full_text[last_end : m.start()], False, source_run_idx(last_end)))
         # url segment
-        url_text = m.group(0)
-        src_idx = char_run_idx[m.start()] if m.start() < len(char_run_idx) else None
-        parts.append((url_text, True, src_idx))
+        parts.append((m.group(0), True, source_run_idx(m.start())))
         last_end = m.end()
     if last_end < len(full_text):
-        seg_text = full_text[last_end:]
-        src_idx = char_run_idx[last_end] if last_end < len(char_run_idx) else None
-        parts.append((seg_text, False, src_idx))
+        parts.append((full_text[last_end:], False, source_run_idx(last_end)))
 
     # Remove all original runs
     for r in list(paragraph.runs):
@@ -151,7 +323,7 @@ def _process_paragraph_replace_urls(paragraph: Paragraph) -> None:
                 src_r = runs[src_idx]
                 # src_r._element.rPr may be missing
                 rPr_copy = getattr(src_r._element, "rPr", None)
-            hyperlink_el = _add_hyperlink(paragraph.part, seg_text, seg_text, rPr_copy=rPr_copy)
+            hyperlink_el = _add_hyperlink(paragraph.part, seg_text, seg_text, rPr_copy=rPr_copy, rel_cache=rel_cache)
             paragraph._p.append(hyperlink_el)
         else:
             # non-url: create a run and copy formatting from source run if available
@@ -171,6 +343,8 @@ def _process_paragraph_replace_urls(paragraph: Paragraph) -> None:
 
 
 def _walk_and_replace(doc: DocumentClass) -> None:
+    # url -> rId of the hyperlink relationships already present in the document
+    rel_cache = {rel.target_ref: r_id for r_id, rel in doc.part.rels.items() if rel.is_external and rel.reltype == HYPERLINK_RELTYPE}
     # Paragraphs in body
     for para in doc.paragraphs:
-        _process_paragraph_replace_urls(para)
+        _process_paragraph_replace_urls(para, rel_cache=rel_cache)
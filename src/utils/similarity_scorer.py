@@ -1,9 +1,27 @@
+import time
+from functools import cache
+from typing import Any
+
+import numpy as np
 from sentence_transformers import SentenceTransformer
 from sklearn.cluster import AgglomerativeClustering
 from transformers import pipeline
 
-translation_pipeline = pipeline("translation", model="Helsinki-NLP/opus-mt-bn-en")
-similarity_model = SentenceTransformer("all-mpnet-base-v2")
+from . import metrics, tracing
+
+# Cosine distance under which two news are treated as the same story
+SIMILARITY_DISTANCE_THRESHOLD = 0.3
+
+
+# Models are loaded on first use, so importing src.utils (e.g. in scraper workers) does not load them
+@cache
+def get_translation_pipeline() -> Any:
+    return pipeline("translation", model="Helsinki-NLP/opus-mt-bn-en")
+
+
+@cache
+def get_similarity_model() -> SentenceTransformer:
+    return SentenceTransformer("all-mpnet-base-v2")
 
 
 def get_translation(sentence_list: list[str]) -> list[str]:
@@ -18,10 +36,46 @@ def get_translation(sentence_list: list[str]) -> list[str]:
     """
     # Removing empty strings for sentence_list
     sentence_list = [sentence.strip() for sentence in sentence_list if sentence]
-    model_output: list[dict[str, str]] = translation_pipeline(sentence_list)
+    start = time.perf_counter()
+    with tracing.span("model.translation", items=len(sentence_list)):
+        model_output: list[dict[str, str]] = get_translation_pipeline()(sentence_list)
+    metrics.model_batch_seconds.labels(model="translation").observe(time.perf_counter() - start)
+    metrics.model_batch_items.labels(model="translation").inc(len(sentence_list))
     return [x["translation_text"] for x in model_output]
 
 
+def get_sentence_embeddings(sentence_list: list[str]) -> np.ndarray:
+    """Returns the L2 normalized Sentence Transformer embedding of each sentence
+
+    Args:
+        sentence_list (list[str]): list of sentences
+
+    Returns:
+        np.ndarray: embeddings with shape (len(sentence_list), embedding_dim)
+    """
+    start = time.perf_counter()
+    with tracing.span("model.embedding", items=len(sentence_list)):
+        embeddings = np.asarray(get_similarity_model().encode(sentences=sentence_list, normalize_embeddings=True))
+    metrics.model_batch_seconds.labels(model="embedding").observe(time.perf_counter() - start)
+    metrics.model_batch_items.labels(model="embedding").inc(len(sentence_list))
+    return embeddings
+
+
+def cluster_embeddings(embeddings: np.ndarray) -> list[int]:
+    """Cluster embeddings of similar contexts using agglomerative clustering
+
+    Args:
+        embeddings (np.ndarray): the sentence embeddings
+
+    Returns:
+        list[int]: the cluster label of each embedding
+    """
+    if len(embeddings) < 2:
+        return [0] * len(embeddings)
+    clustering = AgglomerativeClustering(n_clusters=None, distance_threshold=SIMILARITY_DISTANCE_THRESHOLD, metric="cosine", linkage="average")
+    return [int(label) for label in clustering.fit_predict(embeddings)]
+
+
 def find_similar_sentences(sentence_dict: dict[str, str]) -> dict[str, dict[str, str]]:
     """Using Sentence Transformer, sentences with similar contexts will be found.
     It will be done by turning each sentence into an embedding and then
@@ -33,11 +87,7 @@ def find_similar_sentences(sentence_dict: dict[str, str]) -> dict[str, dict[str,
     Returns:
         dict[str, dict[str, str]]: the key is a number, the value is a dict of similar sentences, each with unique id
     """
-    embeddings = similarity_model.encode(sentences=list(sentence_dict.values()))
-
-    # Checking similarity score using Agglomerative clustering
-    clustering = AgglomerativeClustering(n_clusters=None, distance_threshold=0.3, metric="cosine", linkage="average")
-    labels = clustering.fit_predict(embeddings)
+    labels = cluster_embeddings(get_sentence_embeddings(list(sentence_dict.values())))
 
     clusters: dict[str, dict[str, str]] = {}
     for id, sentence, label in zip(sentence_dict.keys(), sentence_dict.values(), labels):
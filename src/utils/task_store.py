@@ -0,0 +1,67 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAX_AGE_DAYS = 7  # snapshots not used for this long are removed
+
+
+def save_config_snapshot(store_location: str, snapshot: dict[str, Any]) -> str:
+    """Saves the resolved config a run sends its tasks, so a task message only carries the snapshot
+    id instead of the whole config. Snapshots are content addressed, so an unchanged config is saved once
+
+    Args:
+        store_location (str): the folder shared by the orchestrator and the workers
+        snapshot (dict[str, Any]): the JSON serializable config
+
+    Returns:
+        str: the snapshot id
+    """
+    data = json.dumps(snapshot, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    snapshot_id = hashlib.sha256(data).hexdigest()[:16]
+    path = os.path.join(store_location, f"{snapshot_id}.json")
+    if not os.path.exists(path):
+        os.makedirs(store_location, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        logger.info(f"Config snapshot {snapshot_id} saved to {store_location}")
+    prune_config_snapshots(store_location=store_location)
+    return snapshot_id
+
+
+def load_config_snapshot(store_location: str, snapshot_id: str) -> dict[str, Any]:
+    """Loads a config snapshot saved by save_config_snapshot
+
+    Args:
+        store_location (str): the folder shared by the orchestrator and the workers
+        snapshot_id (str): the snapshot id
+
+    Returns:
+        dict[str, Any]: the config
+    """
+    path = os.path.join(store_location, f"{snapshot_id}.json")
+    with open(path, "rb") as f:
+        snapshot: dict[str, Any] = json.load(f)
+    # A snapshot in use (e.g. by the crawls of continuous mode) is never pruned
+    os.utime(path)
+    return snapshot
+
+
+def prune_config_snapshots(store_location: str, max_age_days: float = SNAPSHOT_MAX_AGE_DAYS) -> None:
+    """Removes the snapshots not saved or loaded in max_age_days
+
+    Args:
+        store_location (str): the folder shared by the orchestrator and the workers
+        max_age_days (float, optional): the age in days. Defaults to SNAPSHOT_MAX_AGE_DAYS.
+    """
+    expires_before = time.time() - max_age_days * 86400
+    for filename in os.listdir(store_location):
+        path = os.path.join(store_location, filename)
+        if filename.endswith(".json") and os.path.getmtime(path) < expires_before:
+            os.remove(path)
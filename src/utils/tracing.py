@@ -0,0 +1,257 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import urllib.parse
+import urllib.request
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from pathlib import Path
+from typing import Any, Generator, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kind and status codes
+SPAN_KIND_INTERNAL = 1
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_trace_context: ContextVar[Optional[tuple[str, str]]] = ContextVar("trace_context", default=None)  # (trace id, current span id)
+
+
+class Span:
+    """A single timed operation of a trace. The trace id is the run id of the digest run"""
+
+    __slots__ = ("trace_id", "span_id", "parent_span_id", "name", "attributes", "start_ns", "end_ns", "error", "_token")
+
+    def __init__(self, name: str, trace_id: str, parent_span_id: str, attributes: dict[str, Any]) -> None:
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_span_id = parent_span_id
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.error: Optional[str] = None
+        self._token: Optional[Token] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        """Ends the span and hands it to the exporter
+
+        Args:
+            error (Optional[BaseException], optional): the exception that ended the operation, if any. Defaults to None.
+        """
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        if self._token is not None:
+            try:
+                _trace_context.reset(self._token)
+            except ValueError:  # ended in another context than it was started in
+                pass
+            self._token = None
+        if _exporter is not None:
+            _exporter.add(self)
+
+    def to_otlp(self) -> dict[str, Any]:
+        span: dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": STATUS_ERROR, "message": self.error} if self.error else {"code": STATUS_OK},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+def _otlp_attributes(attributes: Mapping[str, Any]) -> list[dict[str, Any]]:
+    otlp_attributes = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            otlp_value: dict[str, Any] = {"boolValue": value}
+        elif isinstance(value, int):
+            otlp_value = {"intValue": str(value)}
+        elif isinstance(value, float):
+            otlp_value = {"doubleValue": value}
+        else:
+            otlp_value = {"stringValue": str(value)}
+        otlp_attributes.append({"key": key, "value": otlp_value})
+    return otlp_attributes
+
+
+class SpanExporter:
+    """Buffers finished spans and exports them in batches as OTLP/JSON, to a JSON Lines file
+    (one ExportTraceServiceRequest per line, the layout of the OpenTelemetry Collector file exporter)
+    and/or to an OTLP/HTTP endpoint
+    """
+
+    def __init__(self, output_dir: str, otlp_endpoint: str, service_name: str, batch_size: int) -> None:
+        if otlp_endpoint and urllib.parse.urlparse(otlp_endpoint).scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported OTLP endpoint: {otlp_endpoint}. Only http(s) endpoints are supported")
+        self.path = Path(output_dir) / f"spans-{os.getpid()}.jsonl" if output_dir else None
+        self.otlp_endpoint = otlp_endpoint
+        self.service_name = service_name
+        self.batch_size = max(batch_size, 1)
+        self._spans: list[Span] = []
+        self._lock = threading.Lock()
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+            if len(self._spans) < self.batch_size:
+                return
+            spans, self._spans = self._spans, []
+        self._export(spans)
+
+    def flush(self) -> None:
+        with self._lock:
+            spans, self._spans = self._spans, []
+        if spans:
+            self._export(spans)
+
+    def _export(self, spans: list[Span]) -> None:
+        payload = json.dumps(
+            {
+                "resourceSpans": [
+                    {
+                        "resource": {"attributes": _otlp_attributes({"service.name": self.service_name, "process.pid": os.getpid()})},
+                        "scopeSpans": [{"scope": {"name": "bangla_news_digest"}, "spans": [span.to_otlp() for span in spans]}],
+                    }
+                ]
+            },
+            ensure_ascii=False,
+        )
+        if self.path is not None:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(payload + "\n")
+        if self.otlp_endpoint:
+            request = urllib.request.Request(
+                self.otlp_endpoint, data=payload.encode("utf-8"), headers={"Content-Type": "application/json"}, method="POST"
+            )
+            try:
+                # the endpoint scheme is checked to be http(s) in __init__
+                with urllib.request.urlopen(request, timeout=5):  # nosec B310
+                    pass
+            except OSError as e:
+                logger.warning(f"Could not export {len(spans)} spans to {self.otlp_endpoint}: {e}")
+
+
+_exporter: Optional[SpanExporter] = None
+
+
+def configure_tracing(tracing_config: Optional[Mapping[str, Any]]) -> None:
+    """Set up the span exporter of this process. Without an enabled config, spans are not recorded at all
+
+    Args:
+        tracing_config (Optional[Mapping[str, Any]]): the tracing config (see src.conf.TracingConfig)
+    """
+    global _exporter
+    if _exporter is not None:
+        _exporter.flush()
+    if not tracing_config or not tracing_config["enabled"]:
+        _exporter = None
+        return
+    _exporter = SpanExporter(
+        output_dir=tracing_config["output_dir"],
+        otlp_endpoint=tracing_config["otlp_endpoint"],
+        service_name=tracing_config["service_name"],
+        batch_size=tracing_config["batch_size"],
+    )
+    logger.info(f"Tracing enabled. Spans are exported to {_exporter.path or _exporter.otlp_endpoint}")
+
+
+def flush_spans() -> None:
+    if _exporter is not None:
+        _exporter.flush()
+
+
+atexit.register(flush_spans)
+
+
+def new_run_id() -> str:
+    """Returns:
+    str: a new run id, which is also the trace id of every span of the run
+    """
+    return uuid.uuid4().hex
+
+
+def attach(trace_id: str, parent_span_id: str = "") -> Token:
+    """Makes the given trace the current one, e.g. in a Celery task of the run
+
+    Args:
+        trace_id (str): the trace (run) id
+        parent_span_id (str, optional): the span the following spans are children of. Defaults to "".
+
+    Returns:
+        Token: the token to detach the trace with
+    """
+    return _trace_context.set((trace_id, parent_span_id))
+
+
+def detach(token: Token) -> None:
+    _trace_context.reset(token)
+
+
+def current_trace_context() -> dict[str, str]:
+    """Returns:
+    dict[str, str]: the current trace id and span id, to be propagated through task headers. Empty outside a trace
+    """
+    context = _trace_context.get()
+    return {"trace_id": context[0], "parent_span_id": context[1]} if context else {}
+
+
+def start_span(name: str, **attributes: Any) -> Optional[Span]:
+    """Starts a span as the child of the current span and makes it the current span. Prefer `span`,
+    this is for operations that start and end in different callbacks (e.g. Celery signals)
+
+    Args:
+        name (str): the span name
+
+    Returns:
+        Optional[Span]: the span, or None when tracing is disabled or there is no trace
+    """
+    if _exporter is None:
+        return None
+    context = _trace_context.get()
+    if context is None:
+        return None
+    new_span = Span(name=name, trace_id=context[0], parent_span_id=context[1], attributes=attributes)
+    new_span._token = _trace_context.set((context[0], new_span.span_id))
+    return new_span
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Generator[Optional[Span]]:
+    """Records the enclosed operation as a span of the current trace. Costs a global lookup when tracing is disabled
+
+    Args:
+        name (str): the span name, e.g. `page.load`
+        **attributes: the span attributes, e.g. site and url
+    """
+    if _exporter is None:
+        yield None
+        return
+    current = start_span(name, **attributes)
+    try:
+        yield current
+    except BaseException as e:
+        if current is not None:
+            current.end(error=e)
+            current = None
+        raise
+    finally:
+        if current is not None:
+            current.end()
@@ -1,5 +1,7 @@
 import json
 
+from . import metrics
+
 
 # TODO: Save to Redis instead of json file
 def read_from_vault(website_name: str, vault_location: str) -> dict[str, list[str]]:
@@ -33,6 +35,7 @@ def save_to_vault(website_name: str, news_cat: str, vault_location: str, link_li
         data[website_name][news_cat].extend(link_list)
     else:
         data[website_name][news_cat] = link_list
+    metrics.vault_links.labels(site=website_name).set(sum(len(links) for links in data[website_name].values()))
 
     with open(vault_location, "w") as f:
         json.dump(data, f)
@@ -49,6 +52,7 @@ def clear_from_vault(website_name: str, vault_location: str) -> None:
         data: dict[str, dict[str, list[str]]] = json.load(f)
 
     data[website_name] = {}
+    metrics.vault_links.labels(site=website_name).set(0)
 
     with open(vault_location, "w") as f:
         json.dump(data, f)
@@ -0,0 +1,192 @@
+import atexit
+import json
+import logging
+import os
+import random
+import socket
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional, cast
+
+from fake_useragent import UserAgent
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILENAME = "driver_cache.json"
+# Used when the user agent pool can neither be read from the cache nor generated
+FALLBACK_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+# A lock file without a readable owner is only reclaimed after this long, as its owner may still be writing it
+LOCK_WRITE_GRACE_SECONDS = 60
+
+# session id of the driver -> the profile it uses
+_profile_locks: dict[str, Path] = {}
+
+
+class DriverCache:
+    """On disk cache of what a worker needs to start a browser: the resolved driver binary paths,
+    a pool of user agents and one reusable profile (user-data-dir, with its HTTP cache) per browser and site.
+    Entries older than the TTL are resolved again.
+    """
+
+    def __init__(self, cache_dir: str, ttl_hours: float) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl_hours * 3600
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._path = self.cache_dir / CACHE_FILENAME
+
+    def _read(self) -> dict[str, Any]:
+        try:
+            with open(self._path, "r", encoding="utf-8") as f:
+                return cast(dict[str, Any], json.load(f))
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, data: dict) -> None:
+        # Written atomically, as several workers may share the cache
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self._path)
+
+    def _is_fresh(self, entry: dict[str, Any]) -> bool:
+        return time.time() - float(entry.get("cached_at", 0)) < self.ttl
+
+    def driver_path(self, driver_name: str, install: Callable[[], str]) -> str:
+        """Returns the driver binary path, installing (or resolving) it only when the cached path is stale or gone
+
+        Args:
+            driver_name (str): the browser name, e.g. chrome
+            install (Callable[[], str]): resolves the driver path, e.g. ChromeDriverManager().install
+
+        Returns:
+            str: the driver binary path
+        """
+        data = self._read()
+        entry: Optional[dict[str, Any]] = data.get("driver_paths", {}).get(driver_name)
+        if entry is not None and self._is_fresh(entry) and os.path.exists(entry["path"]):
+            return str(entry["path"])
+
+        path = install()
+        data.setdefault("driver_paths", {})[driver_name] = {"path": path, "cached_at": time.time()}
+        self._write(data)
+        logger.info(f"{driver_name} driver resolved to {path}")
+        return path
+
+    def user_agent(self, pool_size: int) -> str:
+        """Returns a random user agent from the cached pool, refilling the pool when it is stale
+
+        Args:
+            pool_size (int): the number of user agents kept in the pool
+
+        Returns:
+            str: a user agent
+        """
+        data = self._read()
+        entry: Optional[dict[str, Any]] = data.get("user_agents")
+        if entry is None or not (self._is_fresh(entry) and entry["agents"]):
+            try:
+                user_agent = UserAgent()
+                agents = list({user_agent.random for _ in range(pool_size)})
+            except Exception as e:
+                logger.warning(f"Could not generate user agents: {e}")
+                agents = entry["agents"] if entry and entry.get("agents") else [FALLBACK_USER_AGENT]
+            entry = {"agents": agents, "cached_at": time.time()}
+            data["user_agents"] = entry
+            self._write(data)
+        return str(random.choice(entry["agents"]))  # nosec: B311
+
+    def acquire_profile(self, driver_name: str, site_name: str) -> Optional[Path]:
+        """Locks and returns the reusable profile directory of the site. A browser can not share its
+        profile, so when another live process holds it, None is returned and a fresh profile should be used.
+        A stale lock (see _is_stale_lock) is taken over.
+
+        Args:
+            driver_name (str): the browser name
+            site_name (str): the site the browser is going to scrape
+
+        Returns:
+            Optional[Path]: the profile directory, or None if it is in use
+        """
+        profile_dir = self.cache_dir / "profiles" / driver_name / (site_name.lower().replace(" ", "_") or "default")
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        lock_path = profile_dir.with_suffix(".lock")
+        for _ in range(2):
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if not _is_stale_lock(lock_path, max_age=self.ttl):
+                    logger.info(f"Profile {profile_dir} is in use. Starting with a fresh profile")
+                    return None
+                lock_path.unlink(missing_ok=True)
+                continue
+            with os.fdopen(fd, "w") as f:
+                json.dump({"pid": os.getpid(), "host": socket.gethostname()}, f)
+            return profile_dir
+        return None
+
+
+def _is_stale_lock(lock_path: Path, max_age: float) -> bool:
+    """Whether a profile lock can be taken over. Workers on other hosts (or containers) may share the cache,
+    and a PID only identifies a process on the host that wrote it, so a lock is stale when:
+
+    - it is older than max_age, which also covers a PID reused by an unrelated process,
+    - it was written on this host by a process that is gone (e.g. a crashed worker),
+    - its owner can not be read (a process died before writing it) and it is older than LOCK_WRITE_GRACE_SECONDS
+
+    Args:
+        lock_path (Path): the lock file
+        max_age (float): age in seconds after which any lock is stale
+
+    Returns:
+        bool: whether the lock is stale
+    """
+    try:
+        age = time.time() - lock_path.stat().st_mtime
+        content = lock_path.read_text()
+    except FileNotFoundError:
+        return True
+    except OSError:
+        return False
+    if age > max_age:
+        return True
+    try:
+        owner = json.loads(content)
+        pid, host = int(owner["pid"]), str(owner["host"])
+    except (ValueError, TypeError, KeyError):
+        return age > LOCK_WRITE_GRACE_SECONDS
+    if host != socket.gethostname():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        # e.g. PermissionError: the process exists but belongs to another user
+        return False
+    return False
+
+
+def unlock_profile(profile_dir: Path) -> None:
+    profile_dir.with_suffix(".lock").unlink(missing_ok=True)
+
+
+def register_profile_lock(session_id: str, profile_dir: Path) -> None:
+    _profile_locks[session_id] = profile_dir
+
+
+def release_profile_lock(session_id: Optional[str]) -> None:
+    """Unlocks the profile used by the driver session, so the next browser of the site can reuse it
+
+    Args:
+        session_id (Optional[str]): the session id of the driver that has quit
+    """
+    profile_dir = _profile_locks.pop(session_id, None) if session_id else None
+    if profile_dir is not None:
+        unlock_profile(profile_dir)
+
+
+@atexit.register
+def _release_all_profile_locks() -> None:
+    for session_id in list(_profile_locks):
+        release_profile_lock(session_id)
@@ -0,0 +1,148 @@
+import json
+import logging
+from typing import Any, Optional, Sequence, cast
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from src.conf.site_config import InterceptionConfig
+from src.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+# URL patterns (CDP Network.setBlockedURLs syntax, "*" wildcards) for each blockable resource type
+RESOURCE_TYPE_PATTERNS: dict[str, list[str]] = {
+    "image": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico"],
+    "media": ["*.mp4", "*.webm", "*.m3u8", "*.mp3", "*.ogg", "*.m4a"],
+    "font": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "stylesheet": ["*.css"],
+    "iframe": [
+        "*youtube.com/embed/*",
+        "*facebook.com/plugins/*",
+        "*platform.twitter.com/embed*",
+        "*instagram.com/embed*",
+        "*disqus.com/embed*",
+    ],
+    "third_party_script": [
+        "*/analytics.js",
+        "*googletagmanager.com/*",
+        "*googlesyndication.com/*",
+        "*googleads*",
+        "*doubleclick.net/*",
+        "*adservice.google.com/*",
+        "*ads.pubmatic.com/*",
+        "*adnxs.com/*",
+        "*adsafeprotected.com/*",
+        "*connect.facebook.net/*",
+        "*scorecardresearch.com/*",
+        "*taboola.com/*",
+        "*outbrain.com/*",
+    ],
+}
+
+# The policy of a site without an interception block (the former hardcoded block list)
+DEFAULT_INTERCEPTION = InterceptionConfig(block_resource_types=["image", "font", "stylesheet", "third_party_script"])
+
+# Firefox has no URL blocking without an extension; the resource types with an equivalent preference are blocked with it
+FIREFOX_RESOURCE_TYPE_PREFS: dict[str, dict[str, Any]] = {
+    "image": {"permissions.default.image": 2},
+    "media": {"media.autoplay.default": 5, "media.autoplay.blocking_policy": 2},
+    "font": {"gfx.downloadable_fonts.enabled": False, "browser.display.use_document_fonts": 0},
+    "stylesheet": {"permissions.default.stylesheet": 2},
+    "third_party_script": {"privacy.trackingprotection.enabled": True, "privacy.trackingprotection.socialtracking.enabled": True},
+}
+
+# Rough median transfer size of a resource per CDP resource type, to estimate the bytes a blocked request saved
+ESTIMATED_RESOURCE_BYTES: dict[str, int] = {
+    "Image": 25_000,
+    "Media": 500_000,
+    "Font": 30_000,
+    "Stylesheet": 15_000,
+    "Script": 25_000,
+    "Document": 50_000,
+    "Other": 5_000,
+}
+
+
+def blocked_url_patterns(interception: InterceptionConfig) -> list[str]:
+    """Returns:
+    list[str]: the URL patterns blocked by the policy. Patterns in the allowlist are dropped
+    """
+    patterns = [pattern for resource_type in interception.block_resource_types for pattern in RESOURCE_TYPE_PATTERNS.get(resource_type, [])]
+    patterns += list(interception.block_url_patterns)
+    allowed = set(interception.allow_url_patterns)
+    return list(dict.fromkeys(pattern for pattern in patterns if pattern not in allowed))
+
+
+def apply_chrome_interception(driver: WebDriver, interception: InterceptionConfig) -> None:
+    """Blocks the requests of the policy through CDP. The allowlist is sent first as non-blocking patterns,
+    so an allowed URL is loaded even if a block pattern matches it. Chrome versions without pattern
+    exceptions get the block list only.
+
+    Args:
+        driver (WebDriver): a Chrome driver
+        interception (InterceptionConfig): the interception policy of the site
+    """
+    block_patterns = blocked_url_patterns(interception)
+    driver.execute_cdp_cmd("Network.enable", {})
+    if interception.allow_url_patterns:
+        url_patterns = [{"urlPattern": pattern, "block": False} for pattern in interception.allow_url_patterns]
+        url_patterns += [{"urlPattern": pattern, "block": True} for pattern in block_patterns]
+        try:
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urlPatterns": url_patterns})
+            return
+        except WebDriverException:
+            logger.warning("This Chrome version can not allowlist blocked URLs. Only the block list is applied")
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": block_patterns})
+
+
+def firefox_interception_prefs(interception: InterceptionConfig) -> dict[str, Any]:
+    """Returns:
+    dict[str, Any]: the Firefox preferences blocking the resource types of the policy
+    """
+    prefs: dict[str, Any] = {}
+    unsupported = []
+    for resource_type in interception.block_resource_types:
+        if resource_type in FIREFOX_RESOURCE_TYPE_PREFS:
+            prefs.update(FIREFOX_RESOURCE_TYPE_PREFS[resource_type])
+        else:
+            unsupported.append(resource_type)
+    if unsupported or interception.block_url_patterns:
+        logger.info(f"Firefox can not block URL patterns or {unsupported}. Only the other resource types of the policy are blocked")
+    return prefs
+
+
+def account_page_traffic(driver: WebDriver, site_name: str) -> Optional[dict[str, int]]:
+    """Reads the network events of the last page(s) from the Chrome performance log and records the requests
+    blocked, the bytes they would have cost (estimated) and the bytes actually transferred
+
+    Args:
+        driver (WebDriver): a Chrome driver started with the performance log enabled
+        site_name (str): the site label of the metrics
+
+    Returns:
+        Optional[dict[str, int]]: the blocked requests, estimated bytes saved and bytes transferred, None if the log is unavailable
+    """
+    # Only Chromium drivers have logs. Firefox's driver has no get_log at all
+    get_log = getattr(driver, "get_log", None)
+    if get_log is None:
+        return None
+    try:
+        entries = cast(Sequence[dict[str, Any]], get_log("performance"))
+    except (WebDriverException, ValueError):
+        return None
+
+    blocked_requests = saved_bytes = transferred_bytes = 0
+    for entry in entries:
+        message = json.loads(entry["message"])["message"]
+        if message["method"] == "Network.loadingFinished":
+            transferred_bytes += int(message["params"].get("encodedDataLength", 0))
+        elif message["method"] == "Network.loadingFailed" and message["params"].get("blockedReason"):
+            resource_type = message["params"].get("type", "Other")
+            blocked_requests += 1
+            saved_bytes += ESTIMATED_RESOURCE_BYTES.get(resource_type, ESTIMATED_RESOURCE_BYTES["Other"])
+            metrics.requests_blocked.labels(site=site_name, resource_type=resource_type).inc()
+
+    metrics.bytes_blocked_estimate.labels(site=site_name).inc(saved_bytes)
+    metrics.page_bytes_transferred.labels(site=site_name).observe(transferred_bytes)
+    return {"blocked_requests": blocked_requests, "saved_bytes": saved_bytes, "transferred_bytes": transferred_bytes}
@@ -1,5 +1,6 @@
 import logging
 from abc import ABC, abstractmethod
+from typing import Callable, Optional
 
 import undetected_chromedriver as uc
 from fake_useragent import UserAgent
@@ -10,99 +11,150 @@ from selenium.webdriver.remote.webdriver import WebDriver
 from webdriver_manager.chrome import ChromeDriverManager
 from webdriver_manager.firefox import GeckoDriverManager
 
-from src.conf import WebDriverConfig
+from src.conf import InterceptionConfig, PageLoadConfig, WebDriverConfig
+
+from .driver_cache import DriverCache, register_profile_lock, unlock_profile
+from .interception import (
+    DEFAULT_INTERCEPTION,
+    apply_chrome_interception,
+    firefox_interception_prefs,
+)
 
 logger = logging.getLogger(__name__)
 
 
 class LocalDriverBaseClass(ABC):
-    def __init__(self, config: WebDriverConfig) -> None:
+    driver_name = ""
+
+    def __init__(
+        self,
+        config: WebDriverConfig,
+        site_name: str = "",
+        interception: Optional[InterceptionConfig] = None,
+        page_load: Optional[PageLoadConfig] = None,
+    ) -> None:
         """Initializes the local driver base class with a specified driver path.
 
         Sets up the driver path and initializes the driver instance using the subclass implementation.
 
         Args:
             config (dict[str, bool | str]): the web driver config
+            site_name (str, optional): the site the driver is going to scrape. It picks the reusable profile. Defaults to "".
+            interception (Optional[InterceptionConfig], optional): the request interception policy of the site.
+            Defaults to None, which blocks images, fonts, stylesheets and ad/tracker scripts.
+            page_load (Optional[PageLoadConfig], optional): the page load strategy and JavaScript setting of the site.
+            Defaults to None, which loads pages eagerly with JavaScript enabled.
         """
         self.driver_config = config
-        self.driver = self._init_driver()
+        self.interception = interception or DEFAULT_INTERCEPTION
+        self.page_load = page_load or PageLoadConfig()
+        self.cache = DriverCache(cache_dir=config.cache_dir, ttl_hours=config.cache_ttl_hours) if config.cache_dir else None
+        self.profile_dir = self.cache.acquire_profile(self.driver_name, site_name) if self.cache and config.reuse_profile else None
+        try:
+            self.driver = self._init_driver()
+        except Exception:
+            if self.profile_dir is not None:
+                unlock_profile(self.profile_dir)
+            raise
+        if self.profile_dir is not None:
+            # a started driver always has a session id
+            register_profile_lock(session_id=str(self.driver.session_id), profile_dir=self.profile_dir)
 
     @abstractmethod
     def _init_driver(self) -> WebDriver | uc.Chrome:
         """Local driver initialization"""
         return WebDriver()
 
+    def _driver_path(self, install: Callable[[], str]) -> str:
+        return self.cache.driver_path(self.driver_name, install) if self.cache else install()
+
+    def _user_agent(self) -> str:
+        return self.cache.user_agent(self.driver_config.user_agent_pool_size) if self.cache else UserAgent().random
+
 
 class ChromeLocalDriver(LocalDriverBaseClass):
     """Chrome local web driver class. All properties gained from parent web driver class"""
 
-    def __init__(self, config: WebDriverConfig) -> None:
-        super().__init__(config)
+    driver_name = "chrome"
+
+    def __init__(
+        self,
+        config: WebDriverConfig,
+        site_name: str = "",
+        interception: Optional[InterceptionConfig] = None,
+        page_load: Optional[PageLoadConfig] = None,
+    ) -> None:
+        super().__init__(config, site_name, interception, page_load)
         self.__enable_network_filtering()
 
     def _init_driver(self) -> WebDriver | uc.Chrome:
         options = uc.ChromeOptions()
         for config, cfg_val in self.driver_config.options.items():
             options.add_argument(f"--{config}={cfg_val}")
-        options.add_argument(f"user-agent={UserAgent().random}")
-        options.page_load_strategy = "eager"
+        options.add_argument(f"user-agent={self._user_agent()}")
+        options.page_load_strategy = self.page_load.strategy
+        if not self.page_load.javascript:
+            options.add_experimental_option("prefs", {"profile.managed_default_content_settings.javascript": 2})
+        if self.interception.track_traffic:
+            options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
 
-        driver_path = ChromeDriverManager().install()
-        return uc.Chrome(options=options, driver_executable_path=driver_path)
+        driver_path = self._driver_path(ChromeDriverManager().install)
+        return uc.Chrome(options=options, driver_executable_path=driver_path, user_data_dir=str(self.profile_dir) if self.profile_dir else None)
 
     def __enable_network_filtering(self) -> None:
-        """This method will ensure that unnecessary content loading (CSS, PNG, JPG)
-        does not reduce scraping speed.
+        """This method will ensure that unnecessary content loading (images, CSS, fonts, ads)
+        does not reduce scraping speed. What is blocked is set by the interception policy of the site.
         """
-        # self.driver.execute_cdp_cmd("Network.enable", {})
-        self.driver.execute_cdp_cmd(
-            "Network.setBlockedURLs",
-            {
-                "urls": [
-                    "*.png",
-                    "*.jpg",
-                    "*.css",
-                    "*/analytics.js",
-                    "*.woff2",
-                    "*googletagmanager.com/*",
-                    "*googlesyndication.com/*",
-                    "*googleads*",
-                    "*doubleclick.net/*",
-                    "*adservice.google.com/*",
-                    "*ads.pubmatic.com/*",
-                    "*adnxs.com/*",
-                    "*adsafeprotected.com/*",
-                ]
-            },
-        )
+        apply_chrome_interception(driver=self.driver, interception=self.interception)
 
 
 class FirefoxLocalDriver(LocalDriverBaseClass):
     """Firefox local web driver class. All properties gained from parent web driver class"""
 
+    driver_name = "firefox"
+
     def _init_driver(self) -> WebDriver | uc.Chrome:
         options = FirefoxOptions()
         for config, cfg_val in self.driver_config.options.items():
             options.add_argument(f"--{config}={cfg_val}")
-        options.add_argument(f"user-agent: {UserAgent().random}")
-
-        service = FirefoxService(executable_path=GeckoDriverManager().install())
+        options.add_argument(f"user-agent: {self._user_agent()}")
+        if self.profile_dir is not None:
+            options.add_argument("-profile")
+            options.add_argument(str(self.profile_dir))
+        for pref, pref_val in firefox_interception_prefs(self.interception).items():
+            options.set_preference(pref, pref_val)
+        options.page_load_strategy = self.page_load.strategy
+        if not self.page_load.javascript:
+            options.set_preference("javascript.enabled", False)
+        if self.page_load.tabs > 1:
+            # background tabs are opened with window.open
+            options.set_preference("dom.disable_open_during_load", False)
+
+        service = FirefoxService(executable_path=self._driver_path(GeckoDriverManager().install))
         return webdriver.Firefox(options=options, service=service)
 
 
 # Wrapper for loading webdrivers
-def load_webdriver(driver_config: WebDriverConfig) -> WebDriver:
+def load_webdriver(
+    driver_config: WebDriverConfig,
+    site_name: str = "",
+    interception: Optional[InterceptionConfig] = None,
+    page_load: Optional[PageLoadConfig] = None,
+) -> WebDriver:
     """Returns a local driver based on the config set up in default.yaml
 
     Args:
         driver_config (WebDriverConfig): the driver config for the web driver
+        site_name (str, optional): the site the driver is going to scrape. Defaults to "".
+        interception (Optional[InterceptionConfig], optional): the request interception policy of the site. Defaults to None.
+        page_load (Optional[PageLoadConfig], optional): the page load strategy and JavaScript setting of the site. Defaults to None.
 
     Returns:
         WebDriver: Selenium Webdriver with loaded options
     """
     if driver_config.driver_name == "chrome":
         logger.info("Loading Chrome Local Driver")
-        return ChromeLocalDriver(config=driver_config).driver
+        return ChromeLocalDriver(config=driver_config, site_name=site_name, interception=interception, page_load=page_load).driver
     else:
         logger.info("Loading Firefox Local Driver")
-        return FirefoxLocalDriver(config=driver_config).driver
+        return FirefoxLocalDriver(config=driver_config, site_name=site_name, interception=interception, page_load=page_load).driver
@@ -1,9 +1,29 @@
+import logging
+import time
+from typing import Callable, Optional
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.wait import WebDriverWait
 
+from src.conf import InterceptionConfig
+from src.utils import metrics, tracing
+
+from .driver_cache import release_profile_lock
+from .interception import (
+    DEFAULT_INTERCEPTION,
+    account_page_traffic,
+    apply_chrome_interception,
+)
+
+logger = logging.getLogger(__name__)
+
+# Every tab is a renderer process (~100-300 MB), so the tab pool is capped whatever the config says
+MAX_TABS = 6
+
 
 class WebDriverAdapter:
     """The Adapter Layer for the WebDriver. This layer will specifically work on
@@ -11,16 +31,182 @@ class WebDriverAdapter:
     and Scraper specific post extraction logic
     """
 
-    def __init__(self, driver: WebDriver) -> None:
+    def __init__(
+        self,
+        driver: WebDriver,
+        site_name: str = "",
+        started_at: Optional[float] = None,
+        track_traffic: bool = False,
+        ready_timeout: Optional[float] = None,
+        max_tabs: int = 1,
+        interception: Optional[InterceptionConfig] = None,
+    ) -> None:
         self.driver = driver
+        self.site_name = site_name  # only used to label metrics and spans
+        self.started_at = started_at  # time.perf_counter() at task start, to measure the cold start until the first page load
+        # record blocked requests and transferred bytes of each page, from the Chrome performance log
+        self.track_traffic = track_traffic and hasattr(driver, "get_log")
+        if track_traffic and not self.track_traffic:
+            logger.warning(f"Traffic of {site_name} is not tracked. Only Chrome drivers have the performance log")
+        # With the "none" page load strategy, driver.get returns right after navigating, and a page is
+        # ready once its ready selectors are present (waited for up to ready_timeout seconds)
+        self.ready_timeout = ready_timeout
+        # With more than one tab, the next links are loaded in background tabs while the current page is scraped
+        self.max_tabs = min(max(max_tabs, 1), MAX_TABS)
+        # Chrome blocks requests per tab, so every background tab gets the site's interception policy
+        # (the one load_webdriver applied to the first tab) before it navigates
+        self.interception = interception or DEFAULT_INTERCEPTION
+        self._prefetched: dict[str, str] = {}  # url -> window handle of the background tab loading it
 
-    def retrieve_url(self, url: str) -> None:
+    def retrieve_url(self, url: str, ready_selectors: Optional[list[str]] = None) -> None:
         """Retrieves the intended URL
 
         Args:
             url (str): the intended URL
+            ready_selectors (Optional[list[str]], optional): css selectors of the elements to be scraped from the page.
+            With selector driven readiness, the page is ready once they are present, and the rest of its loading is stopped. Defaults to None.
+        """
+        if self.started_at is not None:
+            metrics.driver_cold_start_seconds.labels(site=self.site_name).observe(time.perf_counter() - self.started_at)
+            self.started_at = None
+        with tracing.span("page.load", site=self.site_name, url=url) as page_span:
+            if self._switch_to_prefetched(url):
+                if page_span is not None:
+                    page_span.set_attribute("prefetched", True)
+                # The tab may still be loading. Its page is ready once the elements to be scraped are there
+                if ready_selectors:
+                    self.wait_until_ready(ready_selectors=ready_selectors, timeout=self.ready_timeout or 30)
+            else:
+                self.driver.get(url)
+                if self.ready_timeout is not None and ready_selectors:
+                    self.wait_until_ready(ready_selectors=ready_selectors, timeout=self.ready_timeout)
+        if self.track_traffic:
+            traffic = account_page_traffic(driver=self.driver, site_name=self.site_name)
+            if traffic is not None and page_span is not None:
+                for key, value in traffic.items():
+                    page_span.set_attribute(key, value)
+
+    def wait_until_ready(self, ready_selectors: list[str], timeout: float) -> bool:
+        """Waits until the page content is complete, then stops loading the rest of the page (ads, trackers, lazy content).
+        The content is complete once the document is parsed (DOMContentLoaded), every ready selector is present and
+        the number of elements they match stayed the same over two polls. A selector like the body paragraphs or the
+        listing links matches many elements, and script rendered content keeps adding to them after the document is parsed.
+        On a timeout loading goes on, and the extraction waits for the elements it needs as usual.
+
+        Args:
+            ready_selectors (list[str]): css selectors of the elements to be scraped from the page
+            timeout (float): seconds to wait for the content
+
+        Returns:
+            bool: whether the page got ready in time
+        """
+        counts_script = (
+            "if (document.readyState === 'loading') { return null; }"
+            "return arguments[0].map(selector => document.querySelectorAll(selector).length);"
+        )
+        last_counts: list[Optional[list[int]]] = [None]
+
+        def content_complete(driver: WebDriver) -> bool:
+            counts = driver.execute_script(counts_script, ready_selectors)
+            complete = bool(counts) and all(counts) and counts == last_counts[0]
+            last_counts[0] = counts
+            return complete
+
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=0.25).until(content_complete)
+        except TimeoutException:
+            return False
+        self.driver.execute_script("window.stop();")
+        return True
+
+    def is_prefetched(self, url: str) -> bool:
+        """Whether the URL is loading (or loaded) in a background tab"""
+        return url in self._prefetched
+
+    def prefetch(self, urls: list[str], max_new: Optional[int] = None, can_request: Optional[Callable[[], bool]] = None) -> None:
+        """Starts loading the upcoming URLs in background tabs, as long as there are free tabs. Loading
+        does not block; retrieve_url switches to the tab of a prefetched URL instead of navigating
+
+        Args:
+            urls (list[str]): the URLs to be retrieved next, in order
+            max_new (Optional[int], optional): the most tabs to open in this call. Defaults to None (as many as there are free tabs).
+            can_request (Optional[Callable[[], bool]], optional): asked before each new tab, e.g. to take a rate limiter
+            token without waiting. A tab is only opened when it returns True. Defaults to None.
         """
-        self.driver.get(url)
+        opened = 0
+        for url in urls:
+            if len(self._prefetched) >= self.max_tabs - 1 or (max_new is not None and opened >= max_new):
+                return
+            if url in self._prefetched:
+                continue
+            if can_request is not None and not can_request():
+                return
+            with tracing.span("page.prefetch", site=self.site_name, url=url):
+                try:
+                    self._prefetched[url] = self._open_background_tab(url)
+                except WebDriverException:
+                    return
+            opened += 1
+
+    def _open_background_tab(self, url: str) -> str:
+        if hasattr(self.driver, "execute_cdp_cmd"):
+            # Chrome: window handles are CDP target ids. The new target starts blank, and CDP commands go to the
+            # target of the current window, so the tab is switched to for its interception policy, then navigated
+            handle = str(self.driver.execute_cdp_cmd("Target.createTarget", {"url": "about:blank", "background": True})["targetId"])
+            previous = self.driver.current_window_handle
+            try:
+                self.driver.switch_to.window(handle)
+                apply_chrome_interception(driver=self.driver, interception=self.interception)
+                # assigning the location does not wait for the page to load
+                self.driver.execute_script("window.location.href = arguments[0];", url)
+            except WebDriverException:
+                self._close_tab(handle)
+                raise
+            finally:
+                self.driver.switch_to.window(previous)
+            return handle
+        handles = set(self.driver.window_handles)
+        self.driver.execute_script("window.open(arguments[0], '_blank');", url)
+        new_handles = set(self.driver.window_handles) - handles
+        if not new_handles:
+            raise WebDriverException("The background tab was not opened (popup blocked)")
+        return new_handles.pop()
+
+    def _switch_to_prefetched(self, url: str) -> bool:
+        """Closes the current tab and switches to the background tab of the URL, if it was prefetched
+
+        Returns:
+            bool: whether the URL was prefetched
+        """
+        handle = self._prefetched.pop(url, None)
+        if handle is None:
+            return False
+        previous = self.driver.current_window_handle
+        try:
+            self.driver.switch_to.window(handle)
+        except WebDriverException:
+            # The tab is gone (e.g. crashed). Falling back to a normal navigation in the current tab
+            return False
+        self._close_tab(previous)
+        return True
+
+    def _close_tab(self, handle: str) -> None:
+        try:
+            if hasattr(self.driver, "execute_cdp_cmd"):
+                self.driver.execute_cdp_cmd("Target.closeTarget", {"targetId": handle})
+                return
+            current = self.driver.current_window_handle
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+            self.driver.switch_to.window(current)
+        except WebDriverException:
+            return
+
+    def close_prefetched(self) -> None:
+        """Closes the background tabs of the prefetched URLs that were not retrieved"""
+        for handle in self._prefetched.values():
+            self._close_tab(handle)
+        self._prefetched.clear()
 
     def browser_refresh(self) -> None:
         """This function will simply perform a refresh on
@@ -40,20 +226,37 @@ class WebDriverAdapter:
         Returns:
             list[WebElement]: the list of web elements
         """
-        if cloudflare_css_selector:
-            WebDriverWait(self.driver, 30, poll_frequency=5).until(
-                EC.invisibility_of_element_located(
-                    (
-                        By.CSS_SELECTOR,
-                        cloudflare_css_selector,
+        start = time.perf_counter()
+        outcome = "found"
+        wait_span = tracing.start_span("element.wait", site=self.site_name, selector=element_css_selector)
+        try:
+            if cloudflare_css_selector:
+                WebDriverWait(self.driver, 30, poll_frequency=5).until(
+                    EC.invisibility_of_element_located(
+                        (
+                            By.CSS_SELECTOR,
+                            cloudflare_css_selector,
+                        )
                     )
                 )
-            )
 
-        return (
-            WebDriverWait(self.driver, 30, poll_frequency=5).until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, element_css_selector))) or []
-        )
+            return (
+                WebDriverWait(self.driver, 30, poll_frequency=5).until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, element_css_selector)))
+                or []
+            )
+        except TimeoutException:
+            outcome = "timeout"
+            raise
+        finally:
+            metrics.element_wait_seconds.labels(site=self.site_name, outcome=outcome).observe(time.perf_counter() - start)
+            if wait_span is not None:
+                wait_span.set_attribute("outcome", outcome)
+                wait_span.end()
 
     def quit(self) -> None:
-        """Gracefully quitting the web driver instance"""
-        self.driver.close()
+        """Gracefully quitting the web driver instance. The browser process is ended as well,
+        so its profile can be reused by the next driver of the site
+        """
+        session_id = self.driver.session_id
+        self.driver.quit()
+        release_profile_lock(session_id)
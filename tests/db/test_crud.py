@@ -0,0 +1,125 @@
+from datetime import datetime
+from typing import Any, Iterator, Optional
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+
+from src.db import ensure_tables, upsert_articles_batch
+from src.db.crud import ArticleCursor, list_articles_page, search_articles
+from src.db.models import SEARCH_TABLE, NewsArticle
+
+
+def row(id: str, url: str, title: str = "শিরোনাম", body: str = "") -> dict[str, Any]:
+    return {
+        "id": id,
+        "url": url,
+        "title": title,
+        "body": body,
+        "fingerprint": f"fingerprint-{url}",
+        "published_at": datetime(2026, 10, 19, 8),
+        "source": "Example",
+        "source_url": "https://example.com",
+        "category": "Bangladesh",
+        "scraped_at": datetime(2026, 10, 19, 9),
+        "language": "Bangla",
+    }
+
+
+@pytest.fixture
+def session() -> Iterator[Session]:
+    engine = create_engine("sqlite://")
+    ensure_tables(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def test_upsert_counts_only_the_inserted_rows(session: Session) -> None:
+    assert upsert_articles_batch(session, [row("1", "https://example.com/1"), row("2", "https://example.com/2")]) == 2
+    # a retried batch, with one article scraped since
+    assert (
+        upsert_articles_batch(session, [row("1", "https://example.com/1"), row("2", "https://example.com/2"), row("3", "https://example.com/3")]) == 1
+    )
+
+
+def test_ensure_tables_drops_the_superseded_indexes() -> None:
+    engine = create_engine("sqlite://")
+    ensure_tables(engine)
+    with engine.begin() as connection:
+        connection.execute(text(f"CREATE INDEX ix_articles_published_at ON {NewsArticle.__tablename__} (published_at)"))
+        connection.execute(text(f"CREATE INDEX ix_articles_source_published ON {NewsArticle.__tablename__} (source, published_at)"))
+
+    ensure_tables(engine)
+
+    indexes = {index["name"] for index in inspect(engine).get_indexes(NewsArticle.__tablename__)}
+    assert "ix_articles_published_at" not in indexes and "ix_articles_source_published" not in indexes
+    assert "ix_articles_published_id" in indexes
+    engine.dispose()
+
+
+@pytest.mark.parametrize("order_by_newest", [True, False])
+def test_list_articles_page_returns_every_article_once(session: Session, order_by_newest: bool) -> None:
+    rows = []
+    for i in range(11):
+        article = row(f"{i:02d}", f"https://example.com/{i}")
+        # several articles share a publishing time, and three have none
+        article["published_at"] = datetime(2026, 10, 19, i // 3) if i < 8 else None
+        rows.append(article)
+    upsert_articles_batch(session, rows)
+
+    ids: list[str] = []
+    after: Optional[ArticleCursor] = None
+    while True:
+        page, after = list_articles_page(session, limit=3, after=after, order_by_newest=order_by_newest)
+        ids += [article.id for article in page]
+        if after is None:
+            break
+
+    dated = sorted((article for article in rows if article["published_at"] is not None), key=lambda article: (article["published_at"], article["id"]))
+    undated = sorted(article["id"] for article in rows if article["published_at"] is None)
+    if order_by_newest:
+        expected = [article["id"] for article in reversed(dated)] + list(reversed(undated))
+    else:
+        expected = [article["id"] for article in dated] + undated
+    assert ids == expected
+
+
+def search_ids(session: Session, query: str) -> list[str]:
+    articles, _ = search_articles(session, query)
+    return sorted(article.id for article, _ in articles)
+
+
+def test_search_tells_bangla_words_apart_by_their_vowel_signs(session: Session) -> None:
+    upsert_articles_batch(
+        session,
+        [
+            row("1", "https://example.com/1", title="রাম বাড়ি ফিরেছে"),
+            row("2", "https://example.com/2", title="হোটেলের রুম ভাড়া বেড়েছে"),
+            row("3", "https://example.com/3", title="বন্যা", body="ঢাকার রাস্তায় জলাবদ্ধতা, রামের দোকান বন্ধ"),
+        ],
+    )
+
+    assert search_ids(session, "রাম") == ["1", "3"]
+    assert search_ids(session, "রুম") == ["2"]
+    # an inflected form: the genitive ঢাকার is found by ঢাকা
+    assert search_ids(session, "ঢাকা") == ["3"]
+    assert search_ids(session, "ঢাকা রাস্তা") == ["3"]
+
+
+def test_index_of_an_older_tokenizer_is_built_again() -> None:
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(title, body, content='bd_news_digest_articles', content_rowid='rowid', "
+                "tokenize='unicode61 remove_diacritics 0')"
+            )
+        )
+    ensure_tables(engine)
+    with Session(engine) as session:
+        upsert_articles_batch(session, [row("1", "https://example.com/1", title="রুম")])
+
+        assert search_ids(session, "রাম") == []
+        assert search_ids(session, "রুম") == ["1"]
+    engine.dispose()
@@ -0,0 +1,93 @@
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from src.db import BatchedArticleWriter, ensure_tables, writer
+from src.utils import Article
+
+
+def article(i: int) -> Article:
+    return Article(
+        id=str(i),
+        title="শিরোনাম",
+        body="প্রথম বাক্য।",
+        summary_points=["প্রথম বাক্য।"],
+        published_at="2026-10-19 08:00:00",
+        fingerprint=f"fingerprint-{i}",
+        source="Example",
+        source_url="https://example.com",
+        category="Bangladesh",
+        scraped_at="2026-10-19 09:00:00",
+        date="October 19, 2026",
+        language="Bangla",
+        url=f"https://example.com/news/{i}",
+    )
+
+
+@pytest.fixture
+def engine(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Engine]:
+    engine = create_engine(f"sqlite:///{tmp_path / 'articles.db'}")
+    ensure_tables(engine)
+    monkeypatch.setattr(writer, "get_engine", lambda cfg: engine)
+    yield engine
+    engine.dispose()
+
+
+def new_writer(**kwargs: Any) -> BatchedArticleWriter:
+    return BatchedArticleWriter(database_config=None, name="Example", **kwargs)  # type: ignore[arg-type]
+
+
+def wait_until(condition: Callable[[], bool], timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_a_full_batch_is_flushed_without_waiting(engine: Engine) -> None:
+    with new_writer(batch_size=2, flush_interval=60) as db_writer:
+        db_writer.write(article(1))
+        db_writer.write(article(2))
+
+        assert wait_until(lambda: db_writer.rows_written == 2)
+
+
+def test_a_partial_batch_is_flushed_after_the_interval(engine: Engine) -> None:
+    with new_writer(batch_size=100, flush_interval=0.1) as db_writer:
+        db_writer.write(article(1))
+
+        assert wait_until(lambda: db_writer.rows_written == 1)
+
+
+def test_a_failed_batch_is_retried(engine: Engine, monkeypatch: pytest.MonkeyPatch) -> None:
+    attempts: list[int] = []
+
+    def upsert_articles_batch(session: Session, rows: list[dict[str, Any]], batch_size: int) -> int:
+        attempts.append(len(rows))
+        if len(attempts) == 1:
+            raise OSError("connection lost")
+        return len(rows)
+
+    monkeypatch.setattr(writer, "upsert_articles_batch", upsert_articles_batch)
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
+
+    with new_writer(max_retries=1) as db_writer:
+        db_writer.write(article(1))
+
+    assert attempts == [1, 1]
+    assert (db_writer.rows_written, db_writer.rows_failed) == (1, 0)
+
+
+def test_rows_inserted_skips_the_stored_articles(engine: Engine) -> None:
+    with new_writer() as db_writer:
+        db_writer.write(article(1))
+    with new_writer() as db_writer:
+        db_writer.write(article(1))
+        db_writer.write(article(2))
+
+    assert (db_writer.rows_written, db_writer.rows_inserted) == (2, 1)
@@ -0,0 +1,147 @@
+import io
+import urllib.request
+from datetime import datetime
+from typing import Any, Iterator
+from urllib.error import URLError
+
+import pytest
+from defusedxml import DefusedXmlException
+
+from src.conf import FeedConfig, ScraperSiteConfig
+from src.conf.site_config import ScraperSiteSelectorConfig
+from src.news_scrapers import feed_discovery
+from src.news_scrapers.feed_discovery import (
+    FeedEntry,
+    discover_links_from_feeds,
+    fetch_feed,
+    map_category,
+    parse_feed,
+)
+from src.utils import CircuitBreaker
+
+RSS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel>
+  <item><title>One</title><link>https://example.com/bangladesh/1</link>
+    <pubDate>Mon, 19 Oct 2026 08:00:00 +0000</pubDate><category>Bangladesh</category></item>
+  <item><title>Two</title><link>https://example.com/sports/2</link></item>
+</channel></rss>"""
+
+ATOM = b"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <entry><link rel="alternate" href="https://example.com/world/3"/><link rel="self" href="https://example.com/feed/3"/>
+    <published>2026-10-19T10:00:00Z</published><category term="World"/></entry>
+</feed>"""
+
+SITEMAP_INDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://example.com/sitemap-1.xml</loc><lastmod>2026-10-18</lastmod></sitemap>
+</sitemapindex>"""
+
+ENTITY_BOMB = b"""<?xml version="1.0"?>
+<!DOCTYPE rss [<!ENTITY a "aaaaaaaaaa"><!ENTITY b "&a;&a;&a;&a;&a;&a;&a;&a;&a;&a;">]>
+<rss><channel><item><link>&b;</link></item></channel></rss>"""
+
+
+def site_config() -> ScraperSiteConfig:
+    return ScraperSiteConfig(
+        name="example",
+        base_url="https://example.com",
+        url_list={"Bangladesh": "https://example.com/bangladesh", "Sports": "https://example.com/sports/"},
+        selectors=ScraperSiteSelectorConfig(news_link_list="a", datetime="time", title="h1", body="p", cloudflare=None),
+        feeds=[FeedConfig(url="https://example.com/rss.xml"), FeedConfig(url="https://example.com/broken.xml")],
+    )
+
+
+def test_parse_feed_reads_rss_entries() -> None:
+    entries = list(parse_feed(io.BytesIO(RSS)))
+
+    assert [entry.url for entry in entries] == ["https://example.com/bangladesh/1", "https://example.com/sports/2"]
+    assert entries[0].categories == ["Bangladesh"]
+    assert entries[0].published_at is not None and entries[0].published_at.tzinfo is None
+    assert entries[1].published_at is None
+
+
+def test_parse_feed_reads_atom_alternate_links() -> None:
+    (entry,) = parse_feed(io.BytesIO(ATOM))
+
+    assert entry.url == "https://example.com/world/3"
+    assert entry.categories == ["World"]
+
+
+def test_parse_feed_marks_sitemap_index_entries() -> None:
+    (entry,) = parse_feed(io.BytesIO(SITEMAP_INDEX))
+
+    assert entry.is_sitemap
+    assert entry.published_at == datetime(2026, 10, 18)
+
+
+def test_parse_feed_refuses_entity_expansion() -> None:
+    with pytest.raises(DefusedXmlException):
+        list(parse_feed(io.BytesIO(ENTITY_BOMB)))
+
+
+def test_fetch_feed_calls_before_request_for_every_sitemap(monkeypatch: pytest.MonkeyPatch) -> None:
+    documents = {"https://example.com/sitemap.xml": SITEMAP_INDEX, "https://example.com/sitemap-1.xml": RSS}
+    events: list[str] = []
+
+    def urlopen(request: urllib.request.Request, timeout: float) -> io.BytesIO:
+        events.append(f"fetch {request.full_url}")
+        return io.BytesIO(documents[request.full_url])
+
+    def before_request() -> None:
+        events.append("acquire")
+
+    monkeypatch.setattr(urllib.request, "urlopen", urlopen)
+
+    entries = list(fetch_feed("https://example.com/sitemap.xml", before_request=before_request))
+
+    assert len(entries) == 2
+    assert events == ["acquire", "fetch https://example.com/sitemap.xml", "acquire", "fetch https://example.com/sitemap-1.xml"]
+
+
+def test_map_category_by_feed_category_then_by_path() -> None:
+    url_list = site_config().url_list
+
+    assert map_category(FeedEntry(url="https://example.com/x/1", categories=["bangladesh"]), url_list) == "Bangladesh"
+    assert map_category(FeedEntry(url="https://example.com/sports/cricket/2"), url_list) == "Sports"
+    assert map_category(FeedEntry(url="https://example.com/sportsman/3"), url_list) is None
+
+
+def test_discovery_skips_a_feed_that_fails_midway(monkeypatch: pytest.MonkeyPatch) -> None:
+    def fetch_feed(url: str, **kwargs: Any) -> Iterator[FeedEntry]:
+        if url.endswith("rss.xml"):
+            yield from parse_feed(io.BytesIO(RSS))
+            return
+        yield FeedEntry(url="https://example.com/bangladesh/9")
+        raise URLError("connection reset")
+
+    monkeypatch.setattr(feed_discovery, "fetch_feed", fetch_feed)
+
+    news_links = discover_links_from_feeds(site_config(), since=datetime(2026, 10, 1))
+
+    # the entries read from the broken feed before it failed are dropped; its categories fall back to the browser
+    assert news_links == {"Bangladesh": ["https://example.com/bangladesh/1"], "Sports": ["https://example.com/sports/2"]}
+
+
+def test_discovery_drops_entries_older_than_since(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(feed_discovery, "fetch_feed", lambda url, **kwargs: parse_feed(io.BytesIO(RSS)) if url.endswith("rss.xml") else iter([]))
+
+    news_links = discover_links_from_feeds(site_config(), since=datetime(2026, 10, 20))
+
+    assert news_links == {"Sports": ["https://example.com/sports/2"]}
+
+
+def test_discovery_records_feeds_on_the_circuit_breaker(monkeypatch: pytest.MonkeyPatch) -> None:
+    def fetch_feed(url: str, **kwargs: Any) -> Iterator[FeedEntry]:
+        raise URLError("connection refused")
+        yield
+
+    monkeypatch.setattr(feed_discovery, "fetch_feed", fetch_feed)
+    circuit_breaker = CircuitBreaker("example", failure_threshold=1, reset_timeout=60)
+
+    news_links = discover_links_from_feeds(site_config(), since=datetime(2026, 10, 1), circuit_breaker=circuit_breaker)
+
+    # the first failure opens the circuit, so the second feed is not fetched at all
+    assert news_links == {}
+    assert circuit_breaker.consecutive_failures == 1
+    assert not circuit_breaker.allow_request()
@@ -0,0 +1,145 @@
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Callable, Optional
+
+import pytest
+
+from src import pipelines
+from src.utils import Article, CircuitBreaker
+
+
+class NotModifiedCache:
+    def is_not_modified(self, url: str, **kwargs: Any) -> bool:
+        return True
+
+
+def test_vault_is_retried_when_every_listing_is_skipped(monkeypatch: pytest.MonkeyPatch) -> None:
+    retries: list[str] = []
+
+    def extract_from_unscraped(scraper: Any, vault_location: str, on_article: Any, max_retries: int = 5) -> int:
+        retries.append(vault_location)
+        return 1
+
+    monkeypatch.setattr(pipelines, "extract_from_unscraped", extract_from_unscraped)
+    site_config = SimpleNamespace(name="Example", base_url="https://example.com", url_list={"Bangladesh": "https://example.com/bangladesh"})
+    articles: list[Article] = []
+
+    compiled = pipelines.data_extraction_pipeline(
+        scraper=SimpleNamespace(site_config=site_config),  # type: ignore[arg-type]
+        vault_location="vault",
+        max_retries=1,
+        on_article=articles.append,
+        validator_cache=NotModifiedCache(),  # type: ignore[arg-type]
+    )
+
+    assert retries == ["vault"]
+    assert compiled == 1
+
+
+class FailingScraper:
+    def __init__(self) -> None:
+        self.site_config = SimpleNamespace(name="Example", base_url="https://example.com", selectors=SimpleNamespace(news_link_list="a"))
+
+    def get_url(self, url: str, **kwargs: Any) -> None:
+        raise TimeoutError("listing page timed out")
+
+
+class UnlimitedRateLimiter:
+    def acquire(self, while_waiting: Optional[Callable[[], Any]] = None) -> None:
+        pass
+
+    def try_acquire(self) -> float:
+        return 1.0
+
+
+class FakeAdapter:
+    def __init__(self) -> None:
+        self.driver = SimpleNamespace(delete_all_cookies=lambda: None, execute_script=lambda script: None)
+
+    def is_prefetched(self, url: str) -> bool:
+        return False
+
+    def prefetch(self, urls: list[str], can_request: Callable[[], bool]) -> None:
+        pass
+
+    def close_prefetched(self) -> None:
+        pass
+
+
+def test_sink_failure_hands_the_link_to_the_vault(monkeypatch: pytest.MonkeyPatch) -> None:
+    vaulted: list[str] = []
+    circuit_breaker = CircuitBreaker("Example", failure_threshold=1, reset_timeout=60)
+    monkeypatch.setattr(pipelines, "site_rate_limiter", lambda scraper: UnlimitedRateLimiter())
+    monkeypatch.setattr(pipelines, "site_circuit_breaker", lambda scraper: circuit_breaker)
+    monkeypatch.setattr(pipelines, "extract_from_single_news_link", lambda scraper, news_link: ("শিরোনাম", datetime.now(), "প্রথম বাক্য।"))
+    monkeypatch.setattr(pipelines, "save_to_vault", lambda website_name, news_cat, vault_location, link_list: vaulted.extend(link_list))
+    scraper = SimpleNamespace(site_config=SimpleNamespace(name="Example", base_url="https://example.com"), adapter=FakeAdapter())
+    articles: list[Article] = []
+
+    def on_article(article: Article) -> None:
+        if article.url.endswith("/1"):
+            raise OSError("disk full")
+        articles.append(article)
+
+    compiled = pipelines.compile_extracted_data(
+        scraper=scraper,  # type: ignore[arg-type]
+        news_links=["https://example.com/news/1", "https://example.com/news/2"],
+        news_cat="Bangladesh",
+        vault_location="vault",
+        on_article=on_article,
+    )
+
+    assert compiled == 1
+    assert [article.url for article in articles] == ["https://example.com/news/2"]
+    assert vaulted == ["https://example.com/news/1"]
+    # the site served both pages, so the sink failure does not count against it
+    assert circuit_breaker.allow_request()
+
+
+def test_failed_listing_page_skips_its_category() -> None:
+    scraper = FailingScraper()
+
+    news_links = pipelines.extract_news_links_list(scraper=scraper, url="https://example.com/bangladesh", max_retries=1)  # type: ignore[arg-type]
+
+    assert news_links == []
+
+
+def test_empty_body_keeps_the_placeholder_summary() -> None:
+    assert pipelines.segment_news_body("") == (["।"], [])
+    assert pipelines.news_summary_generator("   ") == ["।"]
+
+
+def test_one_sentence_body_is_its_own_summary() -> None:
+    summary_points, lead_sentences = pipelines.segment_news_body("ঢাকায় আজ বৃষ্টি হয়েছে")
+
+    assert summary_points == ["ঢাকায় আজ বৃষ্টি হয়েছে।"]
+    assert lead_sentences == summary_points
+
+
+def test_lead_sentences_are_those_of_the_first_paragraph() -> None:
+    summary_points, lead_sentences = pipelines.segment_news_body("প্রথম বাক্য। দ্বিতীয় বাক্য?\nপরের অনুচ্ছেদ।\nশেষ।")
+
+    assert summary_points == ["প্রথম বাক্য। দ্বিতীয় বাক্য?", "পরের অনুচ্ছেদ।"]
+    assert lead_sentences == ["প্রথম বাক্য।", "দ্বিতীয় বাক্য?"]
+
+
+def test_article_from_db_row_with_an_empty_body() -> None:
+    row = {
+        "id": "1",
+        "title": "শিরোনাম",
+        "body": None,
+        "published_at": None,
+        "fingerprint": "f",
+        "source": "Example",
+        "source_url": "https://example.com",
+        "category": "Bangladesh",
+        "scraped_at": None,
+        "language": "Bangla",
+        "url": "https://example.com/bangladesh/1",
+    }
+
+    article = pipelines.article_from_db_row(row)
+
+    assert article.summary_points[0] == "।"
+    assert article.lead_sentences == []
+    assert Article.from_dict(article.to_dict()) == article
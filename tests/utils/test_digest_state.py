@@ -0,0 +1,60 @@
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.utils import Article, DigestState, digest_state
+
+# one embedding per story. The second story is orthogonal to the first, so it never joins its cluster
+STORY_EMBEDDINGS = {"flood": [1.0, 0.0], "election": [0.0, 1.0]}
+
+
+def article(id: str, source: str) -> Article:
+    return Article(
+        id=id,
+        title=id,
+        body="",
+        summary_points=["।"],
+        published_at="2026-10-19 08:00:00",
+        fingerprint=id,
+        source=source,
+        source_url=f"https://{source}.com",
+        category="Bangladesh",
+        scraped_at="2026-10-19 09:00:00",
+        date="October 19, 2026",
+        language="Bangla",
+        url=f"https://{source}.com/{id}",
+    )
+
+
+@pytest.fixture(autouse=True)
+def fake_embeddings(monkeypatch: pytest.MonkeyPatch) -> None:
+    def get_sentence_embeddings(sentence_list: list[str]) -> np.ndarray:
+        return np.asarray([STORY_EMBEDDINGS[sentence] for sentence in sentence_list], dtype=np.float32)
+
+    monkeypatch.setattr(digest_state, "get_sentence_embeddings", get_sentence_embeddings)
+
+
+def test_sites_are_deduplicated_as_they_arrive(tmp_path: Path) -> None:
+    state = DigestState(state_location=str(tmp_path), digest_date=date(2026, 10, 19))
+    first_site = [article("a1", "alo"), article("a2", "alo")]
+    second_site = [article("b1", "kaler"), article("b2", "kaler")]
+
+    assert state.add_articles(news_list=first_site, sentence_dict={"a1": "flood", "a2": "election"}) == first_site
+    # both stories of the second site were already in the digest
+    assert state.add_articles(news_list=second_site, sentence_dict={"b1": "election", "b2": "flood"}) == []
+    assert state.digest_articles == first_site
+
+
+def test_saved_state_keeps_clustering_later_runs(tmp_path: Path) -> None:
+    state = DigestState(state_location=str(tmp_path), digest_date=date(2026, 10, 19))
+    state.add_articles(news_list=[article("a1", "alo")], sentence_dict={"a1": "flood"})
+    state.save()
+
+    reloaded = DigestState.load(state_location=str(tmp_path), digest_date=date(2026, 10, 19))
+    added = reloaded.add_articles(news_list=[article("b1", "kaler"), article("b2", "kaler")], sentence_dict={"b1": "flood", "b2": "election"})
+
+    assert [news.id for news in added] == ["b2"]
+    assert [news.id for news in reloaded.digest_articles] == ["a1", "b2"]
+    assert reloaded.links_of("kaler") == ["https://kaler.com/b1", "https://kaler.com/b2"]
@@ -0,0 +1,46 @@
+import io
+import urllib.request
+from email.message import Message
+from pathlib import Path
+from typing import Any
+from urllib.error import HTTPError
+
+import pytest
+
+from src.utils import ListingValidatorCache
+
+URL = "https://example.com/bangladesh"
+
+
+def raise_http_error(code: int) -> Any:
+    def urlopen(request: urllib.request.Request, timeout: float) -> Any:
+        raise HTTPError(URL, code, "error", Message(), io.BytesIO())
+
+    return urlopen
+
+
+def test_probe_waits_for_the_rate_limiter(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[str] = []
+
+    def urlopen(request: urllib.request.Request, timeout: float) -> Any:
+        calls.append("request")
+        return raise_http_error(304)(request, timeout)
+
+    monkeypatch.setattr(urllib.request, "urlopen", urlopen)
+    cache = ListingValidatorCache(cache_location=str(tmp_path), site_name="Example")
+
+    assert cache.is_not_modified(URL, before_request=lambda: calls.append("token"))
+    assert calls == ["token", "request"]
+
+
+def test_http_error_stops_probing_for_the_day(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(urllib.request, "urlopen", raise_http_error(403))
+    cache = ListingValidatorCache(cache_location=str(tmp_path), site_name="Example")
+
+    assert not cache.is_not_modified(URL)
+    cache.commit(URL)
+
+    probes: list[str] = []
+    reloaded = ListingValidatorCache(cache_location=str(tmp_path), site_name="Example")
+    assert not reloaded.is_not_modified(URL, before_request=lambda: probes.append(URL))
+    assert probes == []
@@ -0,0 +1,94 @@
+import smtplib
+import socket
+from email.message import EmailMessage
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import SMTP, Envelope, Session
+
+from src.utils.other_utils import build_email_message, send_emails
+
+
+class RecordingHandler:
+    """aiosmtpd handler keeping the envelope recipients of every accepted message. Recipients in
+    `unavailable` are refused with a transient 4xx reply"""
+
+    def __init__(self) -> None:
+        self.delivered: list[list[str]] = []
+        self.unavailable: set[str] = set()
+
+    async def handle_RCPT(self, server: SMTP, session: Session, envelope: Envelope, address: str, rcpt_options: list[str]) -> str:
+        if address in self.unavailable:
+            return "450 Mailbox unavailable"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server: SMTP, session: Session, envelope: Envelope) -> str:
+        self.delivered.append(list(envelope.rcpt_tos))
+        return "250 Message accepted for delivery"
+
+
+# the stand-in server's handler and the smtp_config to reach it
+SMTPServer = tuple[RecordingHandler, dict[str, str | int | None]]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+@pytest.fixture
+def smtp_server() -> Iterator[SMTPServer]:
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    yield handler, {"host": controller.hostname, "port": controller.port, "user": None, "password": None}
+    controller.stop()
+
+
+def _messages(groups: list[list[str]]) -> list[tuple[EmailMessage, list[str]]]:
+    return [(build_email_message("Digest", "Body", "digest@example.com", to_addr=["team@example.com"]), group) for group in groups]
+
+
+def test_send_emails_delivers_every_group(smtp_server: SMTPServer) -> None:
+    handler, smtp_config = smtp_server
+    groups = [["a@example.com"], ["b@example.com", "c@example.com"]]
+
+    delivered = send_emails(smtp_config=smtp_config, messages=_messages(groups), starttls=False)
+
+    assert delivered == {0, 1}
+    assert handler.delivered == groups
+
+
+def test_send_emails_resumes_after_a_failed_group(smtp_server: SMTPServer) -> None:
+    handler, smtp_config = smtp_server
+    groups = [["a@example.com"], ["b@example.com"], ["c@example.com"]]
+    messages = _messages(groups)
+    handler.unavailable.add("b@example.com")
+
+    delivered: set[int] = set()
+    with pytest.raises(smtplib.SMTPRecipientsRefused):
+        send_emails(smtp_config=smtp_config, messages=messages, starttls=False, delivered=delivered)
+    assert delivered == {0}
+
+    # the retry skips the group the failed attempt already reached
+    handler.unavailable.clear()
+    assert send_emails(smtp_config=smtp_config, messages=messages, starttls=False, delivered=delivered) == {0, 1, 2}
+    assert handler.delivered == groups
+
+
+def test_send_emails_without_pending_groups_does_not_connect() -> None:
+    smtp_config: dict[str, str | int | None] = {"host": "127.0.0.1", "port": 1, "user": None, "password": None}
+    assert send_emails(smtp_config=smtp_config, messages=_messages([["a@example.com"]]), starttls=False, delivered={0}) == {0}
+
+
+def test_build_email_message_rejects_large_attachments(tmp_path: Path) -> None:
+    attachment = tmp_path / "digest.docx"
+    attachment.write_bytes(b"0" * 2048)
+    with pytest.raises(ValueError):
+        build_email_message(
+            "Digest", "Body", "digest@example.com", to_addr=["a@example.com"], attachment_path=str(attachment), max_attachment_bytes=1024
+        )
@@ -0,0 +1,52 @@
+from typing import Any, Iterator
+
+import fakeredis
+import pytest
+import redis
+
+from src.utils import DomainRateLimiter, configure_rate_limiting
+
+
+@pytest.fixture
+def fake_redis(monkeypatch: pytest.MonkeyPatch) -> Iterator[fakeredis.FakeServer]:
+    server = fakeredis.FakeServer()
+
+    def from_url(url: str, **kwargs: Any) -> fakeredis.FakeRedis:
+        return fakeredis.FakeRedis(server=server)
+
+    monkeypatch.setattr(redis.Redis, "from_url", from_url)
+    configure_rate_limiting("redis://localhost:6379/0")
+    yield server
+    configure_rate_limiting("")
+
+
+def test_local_bucket_allows_the_burst_then_asks_to_wait() -> None:
+    limiter = DomainRateLimiter(domain="example.com", requests_per_minute=60, burst=2)
+
+    assert limiter.try_acquire() == 0
+    assert limiter.try_acquire() == 0
+    assert limiter.try_acquire() == pytest.approx(1, abs=0.05)
+
+
+def test_unlimited_rate_never_waits() -> None:
+    limiter = DomainRateLimiter(domain="example.com", requests_per_minute=0)
+
+    assert all(limiter.try_acquire() == 0 for _ in range(100))
+
+
+def test_redis_bucket_is_shared_by_every_worker(fake_redis: fakeredis.FakeServer) -> None:
+    # two limiters of the same domain stand for the tasks of two worker processes
+    first = DomainRateLimiter(domain="example.com", requests_per_minute=30, burst=1)
+    second = DomainRateLimiter(domain="example.com", requests_per_minute=30, burst=1)
+
+    assert first.try_acquire() == 0
+    assert second.try_acquire() == pytest.approx(2, abs=0.05)
+    assert DomainRateLimiter(domain="example.org", requests_per_minute=30, burst=1).try_acquire() == 0
+
+
+def test_unreachable_redis_falls_back_to_the_local_bucket(fake_redis: fakeredis.FakeServer) -> None:
+    fake_redis.connected = False
+    limiter = DomainRateLimiter(domain="example.com", requests_per_minute=60, burst=1)
+
+    assert limiter.try_acquire() == 0
+    assert limiter.try_acquire() == pytest.approx(1, abs=0.05)
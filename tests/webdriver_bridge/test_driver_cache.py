@@ -0,0 +1,74 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from src.webdriver_bridge.driver_cache import (
+    LOCK_WRITE_GRACE_SECONDS,
+    DriverCache,
+    unlock_profile,
+)
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> DriverCache:
+    return DriverCache(cache_dir=str(tmp_path), ttl_hours=1)
+
+
+def _lock_path(cache: DriverCache) -> Path:
+    return cache.cache_dir / "profiles" / "chrome" / "prothom_alo.lock"
+
+
+def _write_lock(cache: DriverCache, content: str, age: float = 0) -> None:
+    lock_path = _lock_path(cache)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    lock_path.write_text(content)
+    mtime = time.time() - age
+    os.utime(lock_path, (mtime, mtime))
+
+
+def _dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_profile_is_locked_until_unlocked(cache: DriverCache) -> None:
+    profile_dir = cache.acquire_profile("chrome", "Prothom Alo")
+    assert profile_dir is not None
+    assert json.loads(_lock_path(cache).read_text()) == {"pid": os.getpid(), "host": socket.gethostname()}
+    # held by this (live) process
+    assert cache.acquire_profile("chrome", "Prothom Alo") is None
+
+    unlock_profile(profile_dir)
+    assert cache.acquire_profile("chrome", "Prothom Alo") == profile_dir
+
+
+def test_lock_of_a_dead_process_is_taken_over(cache: DriverCache) -> None:
+    _write_lock(cache, json.dumps({"pid": _dead_pid(), "host": socket.gethostname()}))
+    assert cache.acquire_profile("chrome", "Prothom Alo") is not None
+    assert json.loads(_lock_path(cache).read_text())["pid"] == os.getpid()
+
+
+def test_lock_of_another_host_is_kept(cache: DriverCache) -> None:
+    # the PID means nothing on this host, so the lock is only stale once it expires
+    _write_lock(cache, json.dumps({"pid": _dead_pid(), "host": f"not-{socket.gethostname()}"}))
+    assert cache.acquire_profile("chrome", "Prothom Alo") is None
+
+
+def test_expired_lock_is_taken_over(cache: DriverCache) -> None:
+    _write_lock(cache, json.dumps({"pid": os.getpid(), "host": f"not-{socket.gethostname()}"}), age=cache.ttl + 1)
+    assert cache.acquire_profile("chrome", "Prothom Alo") is not None
+
+
+def test_unreadable_lock_is_taken_over_after_the_grace_period(cache: DriverCache) -> None:
+    _write_lock(cache, "")
+    assert cache.acquire_profile("chrome", "Prothom Alo") is None
+
+    _write_lock(cache, "", age=LOCK_WRITE_GRACE_SECONDS + 1)
+    assert cache.acquire_profile("chrome", "Prothom Alo") is not None
@@ -0,0 +1,70 @@
+from typing import Any, Optional
+
+from src.webdriver_bridge.webdriver_adapter import WebDriverAdapter
+
+
+class FakeDriver:
+    """Replays the element counts the readiness script sees on each poll, and records window.stop calls"""
+
+    def __init__(self, polls: list[Optional[list[int]]]) -> None:
+        self.polls = polls
+        self.stopped_after: Optional[int] = None
+        self.scripts_run = 0
+
+    def execute_script(self, script: str, *args: Any) -> Any:
+        if script == "window.stop();":
+            self.stopped_after = self.scripts_run
+            return None
+        self.scripts_run += 1
+        return self.polls[min(self.scripts_run, len(self.polls)) - 1]
+
+
+def test_wait_until_ready_waits_for_the_content_to_stop_changing() -> None:
+    # document still loading, then the first paragraph only, then the whole body
+    driver = FakeDriver(polls=[None, [1, 1, 1], [1, 1, 6], [1, 1, 6]])
+    adapter = WebDriverAdapter(driver=driver)  # type: ignore[arg-type]
+
+    assert adapter.wait_until_ready(ready_selectors=["time", "h1", "article p"], timeout=5)
+    assert driver.stopped_after == 4
+
+
+def test_wait_until_ready_does_not_stop_a_page_missing_a_selector() -> None:
+    driver = FakeDriver(polls=[[1, 0, 3]])
+    adapter = WebDriverAdapter(driver=driver)  # type: ignore[arg-type]
+
+    assert not adapter.wait_until_ready(ready_selectors=["time", "h1", "article p"], timeout=1)
+    assert driver.stopped_after is None
+
+
+class FakeChromeDriver:
+    """Records the CDP commands and scripts sent to each tab, in order"""
+
+    def __init__(self) -> None:
+        self.current_window_handle = "first"
+        self.calls: list[tuple[str, str]] = []
+        self.switch_to = self
+
+    def window(self, handle: str) -> None:
+        self.current_window_handle = handle
+
+    def execute_cdp_cmd(self, cmd: str, params: dict[str, Any]) -> dict[str, Any]:
+        self.calls.append((self.current_window_handle, cmd))
+        if cmd == "Target.createTarget":
+            assert params["url"] == "about:blank"
+            return {"targetId": "background"}
+        return {}
+
+    def execute_script(self, script: str, *args: Any) -> None:
+        self.calls.append((self.current_window_handle, script))
+
+
+def test_background_tabs_are_intercepted_before_they_navigate() -> None:
+    driver = FakeChromeDriver()
+    adapter = WebDriverAdapter(driver=driver, max_tabs=2)  # type: ignore[arg-type]
+
+    adapter.prefetch(["https://example.com/news/1"])
+
+    assert adapter.is_prefetched("https://example.com/news/1")
+    assert driver.current_window_handle == "first"
+    background = [call for handle, call in driver.calls if handle == "background"]
+    assert background == ["Network.enable", "Network.setBlockedURLs", "window.location.href = arguments[0];"]